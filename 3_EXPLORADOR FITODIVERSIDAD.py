@@ -4,12 +4,25 @@ import re
 from PIL import Image
 import pydeck as pdk
 
+from aucca.arranque import css, imagen
+from aucca.camas import planificar
+from aucca.catalogo import MESES
+from aucca.clima import riesgo_siembra
+from aucca.consultas import obtener_motor
+from aucca.cosecha import calendario_cosecha
+from aucca.fichas import ficha
+from aucca.recarga import obtener_servicio
+from aucca.rotacion import ESTACIONES, planificar_rotacion
+from aucca.sol import sol_huerta
+from aucca.ui import (exportar_seleccion, filtro_clima, filtro_disponibilidad, filtro_fuentes, filtros_rangos,
+                      navegador_taxonomico)
+
 
 
 
 # Function to load and configure the page
 def structure_and_format():
-    im = Image.open("images/logo_aucca.png")
+    im = imagen("images/logo_aucca.png")
     st.set_page_config(page_title="Plantas Aucca", layout="wide", initial_sidebar_state="expanded")
     # st.sidebar.image(im, use_container_width=True)
     # st.logo(im)
@@ -17,10 +30,7 @@ def structure_and_format():
     st.logo(im, size="large", link=None, icon_image=im)
     
     
-    css_path = "style.css"
-
-    with open(css_path) as css:
-        st.markdown(f'<style>{css.read()}</style>', unsafe_allow_html=True)
+    st.markdown(f'<style>{css()}</style>', unsafe_allow_html=True)
     
     # Hide Streamlit footer and menu
     hide_streamlit_style = """
@@ -42,85 +52,72 @@ def structure_and_format():
 
 structure_and_format()
 
-# Function to load plant list
-@st.cache_data
-def load_listado_plantas_aucca():
-    return pd.read_csv("plantas_aucca_02_02_25.csv", sep=';', encoding='latin1')
-
-
-
+# Function to load plant list (live-reloaded catalogue, queried through the engine)
+motor = obtener_motor()
 
-# Load the plant list
-plantas_list = load_listado_plantas_aucca()
 
+# Presentation cleaning, applied to the rows the engine returns
+def preparar_plantas(df):
+    plantas_list = df.replace("", pd.NA)
 
-# CLEANING
-# Trim whitespace in 'Disponible Nov 2024', 'Familia', and 'Propiedades' columns
-def espacios(value):
-    return value.strip() if isinstance(value, str) else value
-plantas_list[['Disponible Nov 2024', 'Familia', 'Propiedades','Categoria']] = plantas_list[['Disponible Nov 2024', 'Familia', 'Propiedades','Categoria']].applymap(espacios)
-plantas_list['Disponible Nov 2024'] = plantas_list['Disponible Nov 2024'].fillna("No especificado").astype(str)
+    # CLEANING
+    # Trim whitespace in 'Disponible Nov 2024', 'Familia', and 'Propiedades' columns
+    def espacios(value):
+        return value.strip() if isinstance(value, str) else value
+    plantas_list[['Disponible Nov 2024', 'Familia', 'Propiedades','Categoria']] = plantas_list[['Disponible Nov 2024', 'Familia', 'Propiedades','Categoria']].applymap(espacios)
+    plantas_list['Disponible Nov 2024'] = plantas_list['Disponible Nov 2024'].fillna("No especificado").astype(str)
 
-def clean_properties(value):
-    if isinstance(value, str):
-        # Split by multiple delimiters, strip whitespace, and convert each word to lowercase
-        words = [word.strip().lower() for word in re.split(r'[,\-]', value)]
-        # Join words back into a single string, separated by commas
-        return ', '.join(words)
-    return value
-# plantas_list['Familia'] = plantas_list['Familia'].apply(clean_properties)
-plantas_list['Propiedades'] = plantas_list['Propiedades'].apply(clean_properties)
-plantas_list["Nombre total"] = plantas_list["Nombre vulgar"].fillna('') + " (" + plantas_list["Nombre Científico"].fillna('') + ")"
-plantas_list = plantas_list.rename(columns={"Meses UNIRCADENAS": 'Meses Siembra (Chile)'})
+    def clean_properties(value):
+        if isinstance(value, str):
+            # Split by multiple delimiters, strip whitespace, and convert each word to lowercase
+            words = [word.strip().lower() for word in re.split(r'[,\-]', value)]
+            # Join words back into a single string, separated by commas
+            return ', '.join(words)
+        return value
+    # plantas_list['Familia'] = plantas_list['Familia'].apply(clean_properties)
+    plantas_list['Propiedades'] = plantas_list['Propiedades'].apply(clean_properties)
+    plantas_list["Nombre total"] = plantas_list["Nombre vulgar"].fillna('') + " (" + plantas_list["Nombre Científico"].fillna('') + ")"
+    plantas_list = plantas_list.rename(columns={"Meses UNIRCADENAS": 'Meses Siembra (Chile)'})
 
-nombres_list = [
-    "Nombre vulgar",
-    "Nombre Científico",
-    "Familia",
-    "Categoria",
-    'Nombre total']
+    nombres_list = [
+        "Nombre vulgar",
+        "Nombre Científico",
+        "Familia",
+        "Categoria",
+        'Nombre total']
 
-caracteristicas_list = ["Fijador de Nitrógeno",
-    "Acumulador Dinámico",
-    "Propiedades",
-    "Minerales",
-    "Observaciones",]
+    caracteristicas_list = ["Fijador de Nitrógeno",
+        "Acumulador Dinámico",
+        "Propiedades",
+        "Minerales",
+        "Observaciones",]
 
-info_siembra_list = [
-    "Época de siembra (CHILE)",
-    "Meses Siembra (Chile)",
-    "Método",
-    "Profundidad de Siembra",
-    "Tiempo de germinar",
-    "Transplante",
-    "Distancia entre (Plantas)",
-    "Distancia entre (hileras)",
-    "Tiempo para cosechar", ]
+    info_siembra_list = [
+        "Época de siembra (CHILE)",
+        "Meses Siembra (Chile)",
+        "Método",
+        "Profundidad de Siembra",
+        "Tiempo de germinar",
+        "Transplante",
+        "Distancia entre (Plantas)",
+        "Distancia entre (hileras)",
+        "Tiempo para cosechar", ]
 
-diponibilidad_list = [
-    "lat",
-    "lon",
-    "Disponible Nov 2024",
-    'Zona',
-    'ruta mapa']
+    diponibilidad_list = [
+        "lat",
+        "lon",
+        "Disponible Nov 2024",
+        'Zona',
+        'ruta mapa']
 
-plantas_list[caracteristicas_list] = plantas_list[caracteristicas_list].fillna("Sin información").astype(str)
-plantas_list['Familia'] = plantas_list['Familia'].fillna("Sin información").astype(str)
-all_variables_list = nombres_list + caracteristicas_list + info_siembra_list + diponibilidad_list
-plantas_list =  plantas_list[all_variables_list]
+    plantas_list[caracteristicas_list] = plantas_list[caracteristicas_list].fillna("Sin información").astype(str)
+    plantas_list['Familia'] = plantas_list['Familia'].fillna("Sin información").astype(str)
+    all_variables_list = nombres_list + caracteristicas_list + info_siembra_list + diponibilidad_list
+    plantas_list =  plantas_list[all_variables_list]
+    return plantas_list
 
-total_filas = plantas_list.shape[0]
 
-
-plantas_df = plantas_list.copy()
-
-
-# Function to get unique words from a column
-def get_unique_words_from_column(df, column_name):
-    all_properties = df[column_name].dropna().tolist()
-    all_words = [word.strip() for prop in all_properties for word in re.split(r'[,\-;]', prop)]
-    unique_words = sorted(set(all_words))
-    return unique_words
+total_filas = motor.total()
 
 
 
@@ -136,61 +133,61 @@ st.title("EXPLORADOR DE FITODIVERSIDAD Y GUÍA DE CULTIVO AGROECOLÓGICO (CHILE)
 
 
 # LEVEL 1: Filter based on Disponibilidad
-disponible_opciones = sorted(plantas_df['Disponible Nov 2024'].dropna().astype(str).unique())
-disponible_seleccionado = st.sidebar.selectbox("Disponibilidad en Aucca", ["Todas"] + disponible_opciones)
-
-# Apply first-level filter
-if disponible_seleccionado == "Todas":
-    plantas_df_2 = plantas_df.copy()
-else:
-    plantas_df_2 = plantas_df[plantas_df['Disponible Nov 2024'] == disponible_seleccionado]
+filtros = {}
+# Latest nursery snapshot by default, or the date chosen in the sidebar
+disponible_seleccionado = filtro_disponibilidad(filtros)
+filtro_fuentes(filtros)
+filtro_clima(filtros)
     
 
 # Meses de siembra (Multi-selection)
-unique_properties_words_meses = get_unique_words_from_column(plantas_df_2, 'Meses Siembra (Chile)')
+unique_properties_words_meses = motor.opciones('Meses Siembra (Chile)', filtros)
 meses_seleccion = st.sidebar.multiselect("Meses Siembra (Chile)", ["Todas"] + unique_properties_words_meses)
 if "Todas" not in meses_seleccion and meses_seleccion:
-    plantas_df_2 = plantas_df_2[
-    plantas_df_2['Meses Siembra (Chile)'].apply(
-        lambda x: any(item in str(x) for item in meses_seleccion) if pd.notna(x) else False
-    )
-]
+    filtros['Meses Siembra (Chile)'] = meses_seleccion
 
 # st.sidebar.markdown("Nivel 2")
 
 # LEVEL 2: Additional filters
 
 # Categoria (Multi-selection)
-categoria_opciones = get_unique_words_from_column(plantas_df_2, 'Categoria')
+categoria_opciones = motor.opciones('Categoria', filtros)
 categoria_seleccionada = st.sidebar.multiselect("Categoría", ["Todas"] + categoria_opciones)
 
 if "Todas" not in categoria_seleccionada and categoria_seleccionada:
-    plantas_df_2 = plantas_df_2[plantas_df_2['Categoria'].isin(categoria_seleccionada)]
+    filtros['Categoria'] = categoria_seleccionada
 
 # Fijador de Nitrógeno
-nitrogeno_opciones = sorted(plantas_df_2['Fijador de Nitrógeno'].dropna().astype(str).unique())
+nitrogeno_opciones = motor.opciones('Fijador de Nitrógeno', filtros)
 nitro_seleccionada = st.sidebar.selectbox("Fijador de Nitrógeno", ["Todas"] + nitrogeno_opciones)
 if nitro_seleccionada != "Todas":
-    plantas_df_2 = plantas_df_2[plantas_df_2['Fijador de Nitrógeno'] == nitro_seleccionada]
+    filtros['Fijador de Nitrógeno'] = [nitro_seleccionada]
 
 # Acumulador Dinámico (Multi-selection)
-unique_properties_words_acumulador = get_unique_words_from_column(plantas_df_2, 'Acumulador Dinámico')
+unique_properties_words_acumulador = motor.opciones('Acumulador Dinámico', filtros)
 acumulador_seleccion = st.sidebar.multiselect("Acumulador Dinámico", ["Todas"] + unique_properties_words_acumulador)
 if "Todas" not in acumulador_seleccion and acumulador_seleccion:
-    plantas_df_2 = plantas_df_2[plantas_df_2['Acumulador Dinámico'].dropna().apply(lambda x: any(item in x for item in acumulador_seleccion))]
+    filtros['Acumulador Dinámico'] = acumulador_seleccion
 
 # Propiedades (Multi-selection)
-unique_properties_words_propiedades = get_unique_words_from_column(plantas_df_2, 'Propiedades')
+unique_properties_words_propiedades = motor.opciones('Propiedades', filtros)
 propiedades_seleccion = st.sidebar.multiselect("Propiedades Medicinales", ["Todas"] + unique_properties_words_propiedades)
 if "Todas" not in propiedades_seleccion and propiedades_seleccion:
-    plantas_df_2 = plantas_df_2[plantas_df_2['Propiedades'].dropna().apply(lambda x: any(item in x for item in propiedades_seleccion))]
+    filtros['Propiedades'] = propiedades_seleccion
+
+# Texto libre (full-text index on Propiedades / Observaciones / nombres)
+texto_libre = st.sidebar.text_input("Buscar en propiedades y observaciones", value="").strip()
+
+# Rangos numéricos (profundidad, germinación, distancias, cosecha)
+rangos = filtros_rangos(motor)
 
-# # Familia
-# familia_opciones = sorted(plantas_df_2['Familia'].dropna().astype(str).unique())
-# familia_seleccionada = st.sidebar.selectbox("Familia", ["Todas"] + familia_opciones)
-# if familia_seleccionada != "Todas":
-#     plantas_df_2 = plantas_df_2[plantas_df_2['Familia'] == familia_seleccionada]
+consulta = {"texto": texto_libre or None, "rangos": rangos}
 
+# Familia (drill-down Categoría -> Familia -> especie, with counts)
+navegador_taxonomico(motor, filtros, consulta)
+plantas_filtradas = motor.filtrar(filtros, **consulta)
+exportar_seleccion(plantas_filtradas, filtros, consulta)
+plantas_df_2 = preparar_plantas(plantas_filtradas)
 
 # Display the filtered DataFrame
 nombre_vulgar_selection_words = sorted(plantas_df_2['Nombre vulgar'].unique())
@@ -238,6 +235,27 @@ with st.expander("Ver base de datos"):
         hide_index=True
     )
 
+# CALENDAR: when can the filtered plants be harvested?
+with st.expander("🗓️ Calendario de cosecha"):
+    calendario = calendario_cosecha(obtener_servicio().catalogo)
+    col_siembra, col_cosecha = st.columns(2)
+    mes_siembra = col_siembra.selectbox("Mes de siembra", ["Cualquiera"] + MESES)
+    mes_cosecha = col_cosecha.selectbox("Mes de cosecha", ["Todos"] + MESES)
+    mes_siembra = None if mes_siembra == "Cualquiera" else mes_siembra
+
+    tabla_cosecha = calendario.tabla(plantas_df_2["Nombre total"], mes_siembra)
+    if mes_cosecha != "Todos":
+        tabla_cosecha = tabla_cosecha[tabla_cosecha[mes_cosecha] != ""]
+    if tabla_cosecha.empty:
+        st.write("No hay plantas con siembra y tiempo de cosecha conocidos para esta selección.")
+    else:
+        st.dataframe(tabla_cosecha)
+
+    perennes = calendario.perennes(plantas_df_2["Nombre total"])
+    if not perennes.empty:
+        st.markdown("**Cultivos de largo plazo** (la primera cosecha tarda un año o más):")
+        st.dataframe(perennes, hide_index=True)
+
 
 # FILTER 4: by "Nombre total"
 nombre_vulgar_selection = st.selectbox("Planta específica para leer en detalle", ["Selecciona una planta"] + nombre_total_selection_words)
@@ -257,47 +275,47 @@ if nombre_vulgar_selection != "Selecciona una planta":
         col1, col2 = st.columns(2)
        
         with col1:
-            st.markdown("## 🌿 Identificación")
-            nombres_list = ["Nombre vulgar", "Nombre Científico", "Familia", "Categoria"]
-            for field in nombres_list:
-                st.markdown(f"**{field}:** {planta_seleccionada_df.iloc[0][field] if pd.notna(planta_seleccionada_df.iloc[0][field]) else 'No disponible'}")
-
-            st.markdown("## 🌱 Características Servicios Ecosistémicos")
-            caracteristicas_list = ["Fijador de Nitrógeno", "Acumulador Dinámico", "Minerales", "Propiedades"]
-            for field in caracteristicas_list:
-                st.markdown(f"**{field}:** {planta_seleccionada_df.iloc[0][field] if pd.notna(planta_seleccionada_df.iloc[0][field]) else 'No disponible'}")
-
-            st.markdown("## 📚 Guía para Cultivo")
-            info_siembra_list = [
-                "Época de siembra (CHILE)", "Método", "Profundidad de Siembra",
-                "Tiempo de germinar", "Transplante", "Distancia entre (Plantas)",
-                "Distancia entre (hileras)", "Tiempo para cosechar", "Observaciones"
-            ]
-            for field in info_siembra_list:
-                st.markdown(f"**{field}:** {planta_seleccionada_df.iloc[0][field] if pd.notna(planta_seleccionada_df.iloc[0][field]) else 'No disponible'}")
+            # Pre-rendered card, sent as a single element
+            servicio = obtener_servicio()
+            clave = servicio.catalogo.clave_de(planta_seleccionada_df.iloc[0])
+            tarjeta = ficha(servicio.catalogo, planta_seleccionada_df.iloc[0], "explorador")
+            if servicio.clima is not None:
+                clima = riesgo_siembra(servicio.catalogo, servicio.clima).seccion(clave, "explorador")
+                if clima:
+                    tarjeta += "\n\n" + clima
+            sol = sol_huerta(servicio.catalogo).seccion(clave, "explorador")
+            if sol:
+                tarjeta += "\n\n" + sol
+            st.markdown(tarjeta)
 
         with col2:
             st.markdown("## 📍 Localización en Aucca")
             # Check if latitude and longitude are numbers and not empty
-            if pd.to_numeric(planta_seleccionada_df['lat'], errors='coerce').notna().all() and pd.to_numeric(planta_seleccionada_df['lon'], errors='coerce').notna().all():
+            # The SQLite engine returns coordinates as text
+            punto_df = planta_seleccionada_df[['lat', 'lon']].apply(pd.to_numeric, errors='coerce')
+            if punto_df['lat'].notna().all() and punto_df['lon'].notna().all():
                 # Define the map using pydeck with a satellite map style
                 map_layer = pdk.Deck(
                     map_style='mapbox://styles/mapbox/satellite-v9',  # Using the satellite style
                     initial_view_state={
-                        "latitude": planta_seleccionada_df['lat'].mean(),
-                        "longitude": planta_seleccionada_df['lon'].mean(),
+                        "latitude": punto_df['lat'].mean(),
+                        "longitude": punto_df['lon'].mean(),
                         "zoom": 18.5,
                         "pitch": 0,
                     },
                     layers=[
                         pdk.Layer(
                             'ScatterplotLayer',
-                            data=planta_seleccionada_df,
+                            data=punto_df.assign(
+                                nombre=planta_seleccionada_df['Nombre vulgar'],
+                                sol=sol_huerta(servicio.catalogo).tooltip(clave)),
                             get_position='[lon, lat]',
                             get_color='[255, 165, 0, 160]',  # Orange color
                             get_radius=1,  # Small radius for the markers
+                            pickable=True,
                         )
-                    ]
+                    ],
+                    tooltip={"text": "{nombre}\n{sol}"},
                 )
                 st.pydeck_chart(map_layer)
             else:
@@ -306,6 +324,51 @@ if nombre_vulgar_selection != "Selecciona una planta":
                 st.image(mapa_zona_img,  use_container_width=True)
     else:
         st.write("")
-
 else:
-    st.write("")
\ No newline at end of file
+    st.write("")
+
+
+# BED PLANNER: rows and spacing from the catalogue's "Distancia entre" fields
+with st.expander("🧮 Planificador de camas"):
+    col_largo, col_ancho, col_camas = st.columns(3)
+    largo_cama = col_largo.number_input("Largo de cada cama (cm)", min_value=20, max_value=5000, value=300, step=10)
+    ancho_cama = col_ancho.number_input("Ancho de cada cama (cm)", min_value=20, max_value=500, value=120, step=10)
+    n_camas = col_camas.number_input("Número de camas", min_value=1, max_value=100, value=1, step=1)
+    elegidas = st.multiselect(
+        "Plantas a sembrar",
+        nombre_total_selection_words,
+        default=[nombre_vulgar_selection] if nombre_vulgar_selection in nombre_total_selection_words else [],
+    )
+    if elegidas:
+        plan = planificar(obtener_servicio().catalogo, elegidas, largo_cama, ancho_cama, n_camas)
+        st.dataframe(plan.conteo())
+        if plan.sin_lugar:
+            st.write("No caben en las camas: " + ", ".join(plan.sin_lugar))
+        st.markdown(" · ".join(f'<span style="color:{color}">●</span> {nombre}'
+                               for nombre, color in plan.leyenda().items()), unsafe_allow_html=True)
+        for cama in range(n_camas):
+            st.image(plan.imagen(cama), caption=f"Cama {cama + 1} ({largo_cama} x {ancho_cama} cm)")
+
+
+# ROTATION PLANNER: the filtered bed crops over N beds and K seasons
+with st.expander("🔄 Rotación de cultivos"):
+    col_camas_rot, col_temporadas, col_inicio = st.columns(3)
+    camas_rotacion = col_camas_rot.number_input("Camas", min_value=1, max_value=200, value=40, step=1)
+    n_temporadas = col_temporadas.number_input("Temporadas", min_value=2, max_value=12, value=4, step=1)
+    estacion_inicio = col_inicio.selectbox("Desde", [e for e, _ in ESTACIONES])
+    rotacion = planificar_rotacion(obtener_servicio().catalogo, nombre_total_selection_words,
+                                   camas_rotacion, n_temporadas, estacion_inicio)
+    if len(rotacion.nombres) == 1:
+        st.write("No hay hortalizas ni legumbres de temporada entre las plantas filtradas.")
+    else:
+        resumen_rotacion = rotacion.resumen()
+        st.caption(f"{len(rotacion.nombres) - 1} hortalizas y legumbres de temporada entre las plantas filtradas. "
+                   "Evita repetir familia en la misma cama, pone fijadoras de nitrógeno antes de los cultivos "
+                   "exigentes y solo siembra cada cultivo en una temporada con meses de siembra.")
+        c1, c2, c3 = st.columns(3)
+        c1.metric("Fijadoras antes de exigentes", resumen_rotacion["fijadoras antes de exigentes"])
+        c2.metric("Misma familia seguida", resumen_rotacion["misma familia seguida"])
+        c3.metric("Camas en descanso", resumen_rotacion["camas en descanso"])
+        st.dataframe(rotacion.tabla(), use_container_width=True)
+        for aviso in rotacion.avisos():
+            st.write(aviso)
\ No newline at end of file
@@ -0,0 +1,92 @@
+import altair as alt
+import streamlit as st
+
+from aucca.arranque import css, imagen
+from aucca.catalogo import MESES
+from aucca.panel import MES_SIEMBRA, panel_zonas
+from aucca.recarga import obtener_servicio
+
+
+# ======================
+# PAGE CONFIGURATION
+# ======================
+def structure_and_format():
+    im = imagen("images/logo_aucca.png")
+    st.set_page_config(page_title="Panel por Zona", layout="wide", initial_sidebar_state="expanded")
+    st.logo(im, size="large", link=None, icon_image=im)
+    st.markdown(f"<style>{css()}</style>", unsafe_allow_html=True)
+    st.markdown("""
+    <style>
+    #MainMenu {visibility: hidden;}
+    footer {visibility: hidden;}
+    </style>
+    """, unsafe_allow_html=True)
+
+
+structure_and_format()
+
+# ======================
+# AGGREGATES (once per catalogue version; the charts only get these rows)
+# ======================
+catalogo = obtener_servicio().catalogo
+panel = panel_zonas(catalogo)
+
+st.sidebar.header("Panel por Zona")
+zonas = st.sidebar.multiselect("Zonas", panel.zonas, default=[])
+disponibles = st.sidebar.multiselect("Disponibilidad (Nov 2024)", panel.disponibles, default=[])
+top = st.sidebar.slider("Propiedades medicinales por zona", min_value=5, max_value=30, value=12)
+
+st.title("🗺️ Composición de la huerta por zona")
+
+totales = panel.totales(zonas, disponibles)
+if totales.empty:
+    st.info("No hay plantas para esta selección.")
+    st.stop()
+
+cols = st.columns(len(totales))
+for col, (_, fila) in zip(cols, totales.iterrows()):
+    col.metric(fila["Zona"], int(fila["plantas"]), help=f"{int(fila['con ubicación'])} con coordenadas")
+
+orden_zonas = list(totales["Zona"])
+
+
+def barras_apiladas(df, titulo, leyenda):
+    return alt.Chart(df, title=titulo).mark_bar().encode(
+        y=alt.Y("Zona:N", sort=orden_zonas, title=None),
+        x=alt.X("plantas:Q", title="Plantas"),
+        color=alt.Color("valor:N", title=leyenda),
+        tooltip=["Zona", alt.Tooltip("valor:N", title=leyenda), "plantas"],
+    )
+
+
+c1, c2 = st.columns(2)
+with c1:
+    st.altair_chart(barras_apiladas(panel.tabla("Categoría", zonas, disponibles),
+                                    "Categorías por zona", "Categoría"), use_container_width=True)
+with c2:
+    if "Fijador de nitrógeno" in panel.tablas:
+        st.altair_chart(barras_apiladas(panel.tabla("Fijador de nitrógeno", zonas, disponibles),
+                                        "Fijadoras de nitrógeno por zona", "Fija nitrógeno"),
+                        use_container_width=True)
+
+meses = panel.tabla(MES_SIEMBRA, zonas, disponibles)
+st.altair_chart(alt.Chart(meses, title="Plantas que se siembran cada mes").mark_bar().encode(
+    x=alt.X("valor:N", sort=MESES, title=None),
+    xOffset=alt.XOffset("Zona:N", sort=orden_zonas),
+    y=alt.Y("plantas:Q", title="Plantas"),
+    color=alt.Color("Zona:N", sort=orden_zonas),
+    tooltip=["Zona", alt.Tooltip("valor:N", title="Mes"), "plantas"],
+), use_container_width=True)
+
+if "Propiedades medicinales" in panel.tablas:
+    propiedades = panel.tabla("Propiedades medicinales", zonas, disponibles, top=top)
+    st.altair_chart(alt.Chart(propiedades, title="Propiedades medicinales más frecuentes").mark_rect().encode(
+        x=alt.X("Zona:N", sort=orden_zonas, title=None),
+        y=alt.Y("valor:N", sort="-color", title=None),
+        color=alt.Color("plantas:Q", title="Plantas"),
+        tooltip=["Zona", alt.Tooltip("valor:N", title="Propiedad"), "plantas"],
+    ), use_container_width=True)
+
+st.caption(f"Gráficos construidos con agregados por zona de la versión {catalogo.version} "
+           f"del catálogo ({len(panel.zonas)} zonas × {len(panel.disponibles)} estados de disponibilidad), "
+           f"no con la tabla de plantas.")
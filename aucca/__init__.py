@@ -0,0 +1 @@
+"""Lógica compartida por las páginas de la app AUCCA (catálogo, conocimiento, índices)."""
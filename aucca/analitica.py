@@ -0,0 +1,177 @@
+"""Local log of the questions asked to the assistant, and a report over it.
+
+    python -m aucca.analitica [--top 15] [--desde 2025-04-01]
+
+Each routed query is queued by the page and written by a background thread, so
+a rerun never waits on the disk. The report lists the most asked questions,
+the ones with no answer and the latency per routing stage.
+"""
+import argparse
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+import streamlit as st
+
+from aucca.texto import normalizar_texto
+
+log = logging.getLogger(__name__)
+
+RUTA_LOG = os.path.join("datos", "consultas.sqlite")
+LOTE = 64  # rows per INSERT batch
+CALENTAR_TOP = 20  # popular questions replayed at startup
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS consultas (
+    ts REAL NOT NULL,
+    consulta TEXT NOT NULL,
+    texto TEXT NOT NULL,
+    etapa TEXT NOT NULL,
+    tipo TEXT NOT NULL,
+    resultados INTEGER NOT NULL,
+    latencia_ms REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS consultas_consulta ON consultas (consulta);
+"""
+
+
+def conectar(ruta=RUTA_LOG):
+    os.makedirs(os.path.dirname(ruta) or ".", exist_ok=True)
+    con = sqlite3.connect(ruta)
+    con.executescript(ESQUEMA)
+    return con
+
+
+# ======================
+# ASYNC WRITER
+# `registrar` only puts a tuple on a queue; one daemon thread owns the SQLite
+# connection and drains the queue in batches.
+# ======================
+class RegistroConsultas:
+    def __init__(self, ruta=RUTA_LOG):
+        self.ruta = ruta
+        self.cola = queue.Queue()
+        self._hilo = threading.Thread(target=self._escribir, name="aucca-analitica", daemon=True)
+        self._hilo.start()
+
+    def registrar(self, texto, etapa, tipo, resultados, latencia_ms):
+        # Grouped by the normalized text; the raw one is kept to replay it as typed.
+        self.cola.put((time.time(), normalizar_texto(texto), texto, etapa, tipo,
+                       int(resultados), float(latencia_ms)))
+
+    def _escribir(self):
+        con = conectar(self.ruta)
+        while True:
+            lote = [self.cola.get()]
+            while len(lote) < LOTE:
+                try:
+                    lote.append(self.cola.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                with con:
+                    con.executemany("INSERT INTO consultas VALUES (?, ?, ?, ?, ?, ?, ?)", lote)
+            except sqlite3.Error:
+                log.exception("No se pudieron guardar %d consultas", len(lote))
+            for _ in lote:
+                self.cola.task_done()
+
+    def esperar(self):
+        """Block until everything queued so far is on disk (CLI / tests)."""
+        self.cola.join()
+
+
+@st.cache_resource
+def obtener_registro():
+    return RegistroConsultas()
+
+
+# ======================
+# REPORT
+# ======================
+def leer_log(ruta=RUTA_LOG, desde=None):
+    if not os.path.exists(ruta):
+        return pd.DataFrame(columns=["ts", "consulta", "texto", "etapa", "tipo", "resultados", "latencia_ms"])
+    with sqlite3.connect(ruta) as con:
+        if desde is None:
+            return pd.read_sql_query("SELECT * FROM consultas", con)
+        ts = pd.Timestamp(desde).timestamp()
+        return pd.read_sql_query("SELECT * FROM consultas WHERE ts >= ?", con, params=(ts,))
+
+
+def consultas_populares(n=CALENTAR_TOP, ruta=RUTA_LOG):
+    """Most asked questions that got an answer, most frequent first."""
+    if not os.path.exists(ruta):
+        return []
+    with sqlite3.connect(ruta) as con:
+        # SQLite returns the bare `texto` of the MAX(ts) row: the latest spelling.
+        filas = con.execute("SELECT texto, MAX(ts) FROM consultas WHERE tipo != 'ninguno' "
+                            "GROUP BY consulta ORDER BY COUNT(*) DESC, MAX(ts) DESC LIMIT ?", (n,)).fetchall()
+    return [f[0] for f in filas]
+
+
+def informe(df, top=15):
+    total = len(df)
+    mas = df.groupby("consulta").size().sort_values(ascending=False).head(top)
+    sin = (df[df["tipo"] == "ninguno"].groupby("consulta").size()
+           .sort_values(ascending=False).head(top))
+    etapas = (df.groupby("etapa")["latencia_ms"]
+              .agg(consultas="size", media="mean", p95=lambda s: s.quantile(0.95), maxima="max")
+              .sort_values("p95", ascending=False).round(1))
+    return {"total": total, "mas_consultadas": mas, "sin_resultado": sin, "etapas": etapas}
+
+
+# ======================
+# CACHE WARMING
+# ======================
+def calentar(preguntas, responder, hablar=None):
+    """Replay popular questions off the page (answer cache, then spoken audio)."""
+    hechas = 0
+    for q in preguntas:
+        try:
+            respuesta = responder(q)
+        except Exception as e:
+            # A reload mid-way, a bad log row... warming is best effort.
+            log.warning("No se pudo precalentar %r: %s", q, e)
+            continue
+        hechas += 1
+        if hablar and respuesta["tipo"] == "concepto":
+            try:
+                hablar(respuesta["principal"])
+            except Exception as e:
+                # gTTS needs the network: without it, skip the audio for the rest.
+                log.warning("Audio no precalentado (%s)", e)
+                hablar = None
+    log.info("Precalentadas %d de %d consultas frecuentes", hechas, len(preguntas))
+    return hechas
+
+
+def calentar_en_segundo_plano(preguntas, responder, hablar=None):
+    hilo = threading.Thread(target=calentar, args=(preguntas, responder, hablar),
+                            name="aucca-calentar", daemon=True)
+    hilo.start()
+    return hilo
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Informe de las consultas al asistente de AUCCA.")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--desde", default=None, help="fecha ISO desde la que contar")
+    parser.add_argument("--log", default=RUTA_LOG)
+    args = parser.parse_args(argv)
+    datos = informe(leer_log(args.log, args.desde), args.top)
+    print(f"{datos['total']} consultas registradas\n")
+    print("Más consultadas:")
+    print(datos["mas_consultadas"].to_string() if len(datos["mas_consultadas"]) else "  (ninguna)")
+    print("\nSin resultado:")
+    print(datos["sin_resultado"].to_string() if len(datos["sin_resultado"]) else "  (ninguna)")
+    print("\nLatencia por etapa (ms):")
+    print(datos["etapas"].to_string() if len(datos["etapas"]) else "  (sin datos)")
+
+
+if __name__ == "__main__":
+    main()
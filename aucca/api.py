@@ -0,0 +1,380 @@
+"""Headless JSON API over the catalogue, the sidebar filters and the assistant.
+
+    python -m aucca.api [--puerto 8600] [--procesos 1]
+    python -m aucca.api --benchmark [--segundos 5] [--clientes 4]
+
+Endpoints (GET, JSON, gzip when asked for, ETag + If-None-Match):
+
+    /api/estado                          versions and size of the loaded catalogue
+    /api/plantas?q=tomate&categoria=…    plant search with the sidebar filters
+    /api/opciones?columna=Categoria      filter options left under the other filters
+    /api/calendario?siembra=Marzo        sowing and harvest months of the selection
+    /api/preguntar?q=…                   the Inicio assistant (spelling + router)
+
+Filters are repeated parameters, like the sidebar multiselects:
+`categoria=frutales&categoria=hortalizas`, and ranges are `rango_cosecha=0,60`.
+The process runs the same live-reload service as the Streamlit app, so partner
+catalogues, CSV edits and docx edits show up here without a restart.
+"""
+import argparse
+import hashlib
+import http.client
+import json
+import logging
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import numpy as np
+import tornado.httpserver
+import tornado.ioloop
+import tornado.netutil
+import tornado.process
+import tornado.web
+
+from aucca.analitica import RegistroConsultas
+from aucca.asistente import corrector, responder
+from aucca.catalogo import COLUMNAS_FILTRO, MESES
+from aucca.consultas import MOTOR, MotorPandas
+from aucca.cosecha import calendario_cosecha
+from aucca.cultivo import ETIQUETAS_RANGO
+from aucca.recarga import ServicioRecarga
+from aucca.texto import normalizar_texto
+
+log = logging.getLogger(__name__)
+
+PUERTO = 8600
+LIMITE = 50  # plants per page
+MAX_LIMITE = 500
+ESPERA_INACTIVA = 75  # seconds an idle keep-alive connection is kept open
+
+# Query parameter -> sidebar filter column.
+PARAMETROS_FILTRO = {
+    "disponible": "Disponible Nov 2024",
+    "mes": "Meses Siembra (Chile)",
+    "categoria": "Categoria",
+    "familia": "Familia",
+    "fijador": "Fijador de Nitrógeno",
+    "acumulador": "Acumulador Dinámico",
+    "propiedad": "Propiedades",
+    "zona": "Zona",
+    "fuente": "Fuentes",
+}
+
+
+# ======================
+# SHARED STATE (one per server process)
+# Every request reads `servicio.catalogo` / `servicio.conocimiento` /
+# `servicio.contenido` once, so it answers from a single snapshot even if a
+# reload swaps them mid-request.
+# ======================
+class Contexto:
+    def __init__(self, directorio="."):
+        self.servicio = ServicioRecarga(directorio).iniciar()
+        self.registro = RegistroConsultas()
+        self.motor_sql = None
+        if MOTOR == "sqlite":
+            from aucca.motor_sql import MotorSQL
+
+            self.motor_sql = MotorSQL().seguir(self.servicio)
+        self._huella = (None, None)
+
+    def instantanea(self):
+        catalogo, conocimiento = self.servicio.catalogo, self.servicio.conocimiento
+        contenido = self.servicio.contenido
+        motor = self.motor_sql or MotorPandas(catalogo, conocimiento)
+        return catalogo, conocimiento, contenido, motor
+
+    def huella(self, catalogo, conocimiento, contenido):
+        # Content fingerprints, not versions: every worker process gives the same ETag.
+        versiones, huella = self._huella
+        actuales = (catalogo.version, conocimiento.version, contenido.version)
+        if versiones != actuales:
+            huella = f"{catalogo.huella}|{conocimiento.huella}|{contenido.huella}|{MOTOR}"
+            self._huella = (actuales, huella)
+        return huella
+
+
+# ======================
+# HANDLERS
+# The ETag depends only on the snapshots and the request URI, so a client
+# revalidating an unchanged answer gets its 304 before anything is computed.
+# ======================
+class BaseHandler(tornado.web.RequestHandler):
+    def initialize(self, contexto):
+        self.contexto = contexto
+
+    def prepare(self):
+        self.catalogo, self.conocimiento, self.contenido, self.motor = self.contexto.instantanea()
+        self.set_header("Cache-Control", "no-cache")
+        self.set_etag_header()
+        if self.check_etag_header():
+            self.set_status(304)
+            self.finish()
+
+    def compute_etag(self):
+        huella = self.contexto.huella(self.catalogo, self.conocimiento, self.contenido)
+        return '"%s"' % hashlib.sha1(f"{huella}|{self.request.uri}".encode("utf-8")).hexdigest()
+
+    def escribir_json(self, datos):
+        self.set_header("Content-Type", "application/json; charset=UTF-8")
+        self.write(datos if isinstance(datos, str) else json.dumps(datos, ensure_ascii=False))
+
+    def write_error(self, status_code, **kwargs):
+        self.escribir_json({"error": self._reason, "estado": status_code})
+
+    # ----- sidebar-equivalent parameters -----
+    def filtros(self):
+        filtros = {}
+        for parametro, col in PARAMETROS_FILTRO.items():
+            valores = [v for v in self.get_arguments(parametro) if v]
+            if valores:
+                filtros[col] = valores
+        return filtros
+
+    def consulta(self):
+        rangos = {}
+        for prefijo in ETIQUETAS_RANGO:
+            valor = self.get_argument(f"rango_{prefijo}", None)
+            if valor is None:
+                continue
+            try:
+                lo, hi = (float(x) for x in valor.split(","))
+            except ValueError:
+                raise tornado.web.HTTPError(400, reason=f"rango_{prefijo} debe ser 'min,max'")
+            rangos[prefijo] = (lo, hi)
+        return {"texto": self.get_argument("texto", None) or None, "rangos": rangos}
+
+    def entero(self, nombre, defecto, maximo=None):
+        try:
+            valor = int(self.get_argument(nombre, defecto))
+        except ValueError:
+            raise tornado.web.HTTPError(400, reason=f"{nombre} debe ser un entero")
+        return max(0, min(valor, maximo) if maximo else valor)
+
+
+class EstadoHandler(BaseHandler):
+    async def get(self):
+        self.escribir_json({"plantas": self.motor.total(), "motor": MOTOR,
+                            "version_catalogo": self.catalogo.version,
+                            "version_conocimiento": self.conocimiento.version})
+
+
+class PlantasHandler(BaseHandler):
+    async def get(self):
+        q = normalizar_texto(self.get_argument("q", ""))
+        df = self.motor.filtrar(self.filtros(), nombre=q or None, **self.consulta())
+        campos = [c for c in self.get_argument("campos", "").split(",") if c]
+        if campos:
+            faltan = [c for c in campos if c not in df.columns]
+            if faltan:
+                raise tornado.web.HTTPError(400, reason=f"Campos desconocidos: {', '.join(faltan)}")
+            df = df[campos]
+        desde = self.entero("desde", 0)
+        limite = self.entero("limite", LIMITE, MAX_LIMITE)
+        # pandas writes the records (NaN -> null) without a round trip through dicts.
+        registros = df.iloc[desde:desde + limite].to_json(orient="records", force_ascii=False)
+        self.escribir_json(f'{{"total":{len(df)},"desde":{desde},"plantas":{registros}}}')
+
+
+class OpcionesHandler(BaseHandler):
+    async def get(self):
+        filtros = self.filtros()
+        pedidas = self.get_arguments("columna") or [c for c in COLUMNAS_FILTRO if c in self.catalogo.bitmaps]
+        desconocidas = [c for c in pedidas if c not in self.catalogo.bitmaps]
+        if desconocidas:
+            raise tornado.web.HTTPError(400, reason=f"Columnas sin filtro: {', '.join(desconocidas)}")
+        # Like the sidebar: a column's options ignore its own selection.
+        self.escribir_json({col: self.motor.opciones(col, {c: v for c, v in filtros.items() if c != col})
+                            for col in pedidas})
+
+
+class CalendarioHandler(BaseHandler):
+    async def get(self):
+        siembra = self.get_argument("siembra", None)
+        if siembra is not None and siembra.capitalize() not in MESES:
+            raise tornado.web.HTTPError(400, reason=f"Mes desconocido: {siembra}")
+        nombres = self.motor.filtrar(self.filtros(), **self.consulta())["Nombre total"].tolist()
+        calendario = calendario_cosecha(self.catalogo)
+        pos = calendario.posiciones(nombres)
+        etiquetas = calendario.nombres[pos]
+        if siembra is None:
+            sembrar, cosechar = calendario.siembra[pos], calendario.matriz[pos]
+        else:
+            s = MESES.index(siembra.capitalize())
+            sembrar = np.zeros_like(calendario.siembra[pos])
+            sembrar[:, s] = calendario.siembra[pos, s]
+            cosechar = calendario.proyeccion[pos, s]
+        self.escribir_json({
+            "siembra": {m: etiquetas[sembrar[:, i]].tolist() for i, m in enumerate(MESES)},
+            "cosecha": {m: etiquetas[cosechar[:, i]].tolist() for i, m in enumerate(MESES)},
+            "perennes": calendario.perennes(nombres).to_dict(orient="records"),
+        })
+
+
+class PreguntarHandler(BaseHandler):
+    async def get(self):
+        q = self.get_argument("q", "").strip()
+        if not q:
+            raise tornado.web.HTTPError(400, reason="Falta la pregunta (q)")
+        filtros, consulta = self.filtros(), self.consulta()
+        base = self.contenido.base(self.conocimiento)
+        base_conocimiento, knowledge, sinonimos = base.preguntas, base.temas, base.sinonimos
+        inicio = time.perf_counter()
+        corregida = corrector(self.contexto.servicio, base_conocimiento, sinonimos).corregir(q)
+        respuesta = responder(corregida, self.motor, filtros, consulta, base_conocimiento, knowledge,
+                              self.contexto.servicio, sinonimos)
+        latencia_ms = (time.perf_counter() - inicio) * 1000
+        self.contexto.registro.registrar(q, respuesta["etapa"], respuesta["tipo"],
+                                         len(respuesta["plantas"]), latencia_ms)
+        plantas = [p if isinstance(p, str) else p["Nombre total"] for p in respuesta["plantas"]]
+        self.escribir_json({"consulta": q, "corregida": corregida, "etapa": respuesta["etapa"],
+                            "tipo": respuesta["tipo"], "clave": respuesta["clave"], "plantas": plantas,
+                            "principal": respuesta["principal"], "relacionado": respuesta["relacionado"]})
+
+
+def crear_app(contexto):
+    rutas = [
+        (r"/api/estado", EstadoHandler),
+        (r"/api/plantas", PlantasHandler),
+        (r"/api/opciones", OpcionesHandler),
+        (r"/api/calendario", CalendarioHandler),
+        (r"/api/preguntar", PreguntarHandler),
+    ]
+    return tornado.web.Application([(r, h, {"contexto": contexto}) for r, h in rutas],
+                                   compress_response=True)
+
+
+def servir(puerto=PUERTO, procesos=1, directorio="."):
+    sockets = tornado.netutil.bind_sockets(puerto, address="127.0.0.1" if procesos == 1 else "")
+    if procesos != 1:
+        # One event loop per core; the catalogue is loaded after the fork in each one.
+        tornado.process.fork_processes(procesos)
+    servidor = tornado.httpserver.HTTPServer(crear_app(Contexto(directorio)),
+                                             idle_connection_timeout=ESPERA_INACTIVA)
+    servidor.add_sockets(sockets)
+    log.info("API de AUCCA en el puerto %d (pid %d)", puerto, os.getpid())
+    tornado.ioloop.IOLoop.current().start()
+
+
+# ======================
+# THROUGHPUT BENCHMARK
+# One server process on a free port, several client processes each holding a
+# keep-alive connection and cycling through typical requests. Run twice: full
+# answers, then revalidations with If-None-Match (304, no body).
+# ======================
+RUTAS_BENCHMARK = [
+    "/api/plantas?q=tomate",
+    "/api/plantas?categoria=hortalizas%20y%20verduras&mes=marzo&limite=20",
+    "/api/plantas?texto=digestivo&campos=Nombre%20total,Categoria",
+    "/api/opciones?columna=Categoria&mes=marzo",
+    "/api/calendario?categoria=hortalizas%20y%20verduras",
+    "/api/preguntar?q=compostaje",
+    "/api/preguntar?q=lonbricultura",
+]
+
+
+def _puerto_libre():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _pedir(conexion, ruta, cabeceras):
+    conexion.request("GET", ruta, headers=cabeceras)
+    respuesta = conexion.getresponse()
+    cuerpo = respuesta.read()
+    return respuesta.status, respuesta.getheader("ETag"), len(cuerpo)
+
+
+def _cliente(args):
+    puerto, segundos, revalidar, desfase = args
+    conexion = http.client.HTTPConnection("127.0.0.1", puerto)
+    cabeceras = {"Accept-Encoding": "gzip"}
+    etags = {}
+    if revalidar:
+        for ruta in RUTAS_BENCHMARK:
+            etags[ruta] = _pedir(conexion, ruta, cabeceras)[1]
+    latencias, estados, octetos = [], {}, 0
+    fin = time.perf_counter() + segundos
+    i = desfase
+    while time.perf_counter() < fin:
+        ruta = RUTAS_BENCHMARK[i % len(RUTAS_BENCHMARK)]
+        i += 1
+        extra = {"If-None-Match": etags[ruta]} if revalidar else {}
+        t = time.perf_counter()
+        estado, _, n = _pedir(conexion, ruta, {**cabeceras, **extra})
+        latencias.append(time.perf_counter() - t)
+        estados[estado] = estados.get(estado, 0) + 1
+        octetos += n
+    conexion.close()
+    return latencias, estados, octetos
+
+
+def _esperar_servidor(puerto, proceso, limite=120):
+    fin = time.time() + limite
+    while time.time() < fin:
+        if proceso.poll() is not None:
+            raise RuntimeError("El servidor de la API terminó al iniciar")
+        try:
+            conexion = http.client.HTTPConnection("127.0.0.1", puerto, timeout=2)
+            if _pedir(conexion, "/api/estado", {})[0] == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("El servidor de la API no respondió a tiempo")
+
+
+def benchmark(segundos=5, clientes=4):
+    puerto = _puerto_libre()
+    proceso = subprocess.Popen([sys.executable, "-m", "aucca.api", "--puerto", str(puerto)],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    resultados = {}
+    try:
+        _esperar_servidor(puerto, proceso)
+        # Warm the answer cache and the per-snapshot indexes before timing.
+        _cliente((puerto, 0.5, False, 0))
+        with multiprocessing.Pool(clientes) as pool:
+            for modo, revalidar in [("completas", False), ("revalidadas (304)", True)]:
+                partes = pool.map(_cliente, [(puerto, segundos, revalidar, k) for k in range(clientes)])
+                latencias = np.concatenate([np.asarray(p[0]) for p in partes]) * 1000
+                estados = {}
+                for p in partes:
+                    for e, n in p[1].items():
+                        estados[e] = estados.get(e, 0) + n
+                resultados[modo] = {
+                    "peticiones/s": round(len(latencias) / segundos, 1),
+                    "p50 ms": round(float(np.percentile(latencias, 50)), 2),
+                    "p95 ms": round(float(np.percentile(latencias, 95)), 2),
+                    "bytes/respuesta": round(sum(p[2] for p in partes) / max(len(latencias), 1)),
+                    "estados": estados,
+                }
+    finally:
+        proceso.terminate()
+        proceso.wait()
+    return resultados
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="API JSON del catálogo y el asistente de AUCCA.")
+    parser.add_argument("--puerto", type=int, default=PUERTO)
+    parser.add_argument("--procesos", type=int, default=1, help="0: uno por núcleo")
+    parser.add_argument("--benchmark", action="store_true", help="mide peticiones/s de un proceso servidor")
+    parser.add_argument("--segundos", type=float, default=5)
+    parser.add_argument("--clientes", type=int, default=4)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+    if not args.benchmark:
+        servir(args.puerto, args.procesos)
+        return
+    print(f"1 proceso servidor (motor {MOTOR}), {args.clientes} clientes keep-alive, "
+          f"{args.segundos:g} s por modo, {os.cpu_count()} núcleo(s) en la máquina")
+    for modo, datos in benchmark(args.segundos, args.clientes).items():
+        print(f"{modo:>18}: " + ", ".join(f"{k} {v}" for k, v in datos.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""Concurrent startup load of the app's independent resources.
+
+    python -m aucca.arranque [--repeticiones 3]
+
+Prints the time to first render (catalogue ready) of the old one-after-another
+startup against the thread-pool one, and how long each resource took.
+"""
+import argparse
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+from PIL import Image
+
+from aucca.catalogo import Catalogo, fuente_plantas
+from aucca.clima import CSV_CLIMA, Clima, leer_clima
+from aucca.conocimiento import DOCX_TALLER, Conocimiento, leer_secciones
+from aucca.contenido import DIR_CONTENIDO, Contenido, leer_contenido
+from aucca.federacion import DIR_FUENTES, leer_catalogo
+
+log = logging.getLogger(__name__)
+
+CSS = "style.css"
+IMAGENES = ["images/logo_aucca.png", "images/queltehue.png",
+            "images/patron_sol_aucca.png", "images/temperatura_viento_lluvia_aucca.png"]
+# The reload service holds these; pages also wait for the decorations.
+RECURSOS_DATOS = ("catalogo", "conocimiento", "contenido", "clima")
+RECURSOS = RECURSOS_DATOS + ("imagenes", "css")
+
+
+def cargar_catalogo(directorio="."):
+    return Catalogo(leer_catalogo(fuente_plantas(directorio), os.path.join(directorio, DIR_FUENTES)))
+
+
+def cargar_conocimiento(directorio="."):
+    return Conocimiento(leer_secciones(os.path.join(directorio, DOCX_TALLER)))
+
+
+def cargar_contenido(directorio="."):
+    return Contenido(leer_contenido(os.path.join(directorio, DIR_CONTENIDO)))
+
+
+def cargar_clima(directorio="."):
+    # Optional: without a climate file the sowing-risk filter and card line are hidden.
+    ruta = os.path.join(directorio, CSV_CLIMA)
+    return Clima(leer_clima(ruta)) if os.path.exists(ruta) else None
+
+
+def cargar_imagenes(directorio="."):
+    imagenes = {}
+    for ruta in IMAGENES:
+        completa = os.path.join(directorio, ruta)
+        if os.path.exists(completa):
+            im = Image.open(completa)
+            im.load()  # decode here, not on the script thread
+            imagenes[ruta] = im
+    return imagenes
+
+
+def cargar_css(directorio="."):
+    with open(os.path.join(directorio, CSS), encoding="utf-8") as f:
+        return f.read()
+
+
+CARGADORES = {
+    "catalogo": cargar_catalogo,
+    "conocimiento": cargar_conocimiento,
+    "contenido": cargar_contenido,
+    "clima": cargar_clima,
+    "imagenes": cargar_imagenes,
+    "css": cargar_css,
+}
+
+
+# ======================
+# STARTUP ORCHESTRATOR
+# Every resource is a future on a small pool, submitted at once. Pages ask for
+# one with `obtener` (blocks only on that one) or poll `listo`, so the sidebar
+# and the query box render as soon as the catalogue is in, while the docx is
+# still being parsed.
+# ======================
+class Arranque:
+    def __init__(self, directorio=".", recursos=RECURSOS):
+        self.directorio = directorio
+        self.inicio = time.perf_counter()
+        self.duraciones = {}  # resource -> (seconds loading, seconds since start when ready)
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=len(recursos), thread_name_prefix="aucca-arranque")
+        self.futuros = {nombre: self._pool.submit(self._cargar, nombre) for nombre in recursos}
+        self._pool.shutdown(wait=False)
+
+    def _cargar(self, nombre):
+        t = time.perf_counter()
+        try:
+            return CARGADORES[nombre](self.directorio)
+        finally:
+            fin = time.perf_counter()
+            with self._lock:
+                self.duraciones[nombre] = (fin - t, fin - self.inicio)
+            log.info("Recurso %s listo en %.0f ms", nombre, (fin - t) * 1000)
+
+    def listo(self, nombre):
+        futuro = self.futuros[nombre]
+        return futuro.done() and futuro.exception() is None
+
+    def obtener(self, nombre, timeout=None):
+        # Re-raises the loader's exception, like the old synchronous load did.
+        return self.futuros[nombre].result(timeout)
+
+    def estado(self):
+        estados = {}
+        for nombre, futuro in self.futuros.items():
+            if not futuro.done():
+                estados[nombre] = "cargando"
+            else:
+                estados[nombre] = "error" if futuro.exception() is not None else "listo"
+        return estados
+
+    def esperar(self):
+        for futuro in self.futuros.values():
+            futuro.exception()
+        return self
+
+
+@st.cache_resource(show_spinner=False)
+def obtener_arranque():
+    return Arranque()
+
+
+def imagen(ruta):
+    """Startup-loaded image (or read now if it is not one of them)."""
+    imagenes = obtener_arranque().obtener("imagenes")
+    return imagenes[ruta] if ruta in imagenes else Image.open(ruta)
+
+
+def css():
+    return obtener_arranque().obtener("css")
+
+
+# ======================
+# MEASUREMENT
+# ======================
+def medir_secuencial(directorio="."):
+    # The old startup: logo and CSS, then the service loading the CSV and the
+    # docx in its constructor, all on the script thread before the sidebar.
+    inicio = time.perf_counter()
+    cargar_css(directorio)
+    cargar_imagenes(directorio)
+    cargar_catalogo(directorio)
+    cargar_conocimiento(directorio)
+    total = time.perf_counter() - inicio
+    return total, total
+
+
+def medir_paralelo(directorio="."):
+    inicio = time.perf_counter()
+    arranque = Arranque(directorio)
+    arranque.obtener("catalogo")
+    arranque.obtener("css")
+    arranque.obtener("imagenes")
+    primer_render = time.perf_counter() - inicio
+    arranque.esperar()
+    return primer_render, time.perf_counter() - inicio, arranque.duraciones
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mide el arranque de la app AUCCA.")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--directorio", default=".")
+    args = parser.parse_args(argv)
+    medir_secuencial(args.directorio)  # imports, OS file cache
+    secuencial = min((medir_secuencial(args.directorio) for _ in range(args.repeticiones)), key=lambda m: m[0])
+    paralelo = min((medir_paralelo(args.directorio) for _ in range(args.repeticiones)), key=lambda m: m[0])
+    print(f"{'':>12} {'primer render':>14} {'todo cargado':>13}")
+    print(f"{'secuencial':>12} {secuencial[0] * 1000:>11.0f} ms {secuencial[1] * 1000:>10.0f} ms")
+    print(f"{'paralelo':>12} {paralelo[0] * 1000:>11.0f} ms {paralelo[1] * 1000:>10.0f} ms")
+    print("\nPor recurso (carga / listo desde el inicio):")
+    for nombre, (carga, listo) in sorted(paralelo[2].items(), key=lambda x: x[1][1]):
+        print(f"  {nombre:<13} {carga * 1000:>7.0f} ms {listo * 1000:>7.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
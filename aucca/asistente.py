@@ -0,0 +1,255 @@
+from collections import OrderedDict
+import difflib
+import hashlib
+import os
+import re
+import threading
+
+from aucca.exportar import firma_filtros
+from aucca.indices import IndiceOrtografico, IndicePasajes
+from aucca.texto import normalizar_texto
+
+MESES_CONSULTA = ["enero", "febrero", "marzo", "abril", "mayo", "junio", "julio", "agosto",
+                  "septiembre", "octubre", "noviembre", "diciembre"]
+
+# Concept approach based on keywords (first category with a keyword in the query wins).
+PALABRAS_CATEGORIA = {
+    "biofiltro": ["biofiltro"],
+    "baño": ["baño", "seco"],
+    "compost": ["compost", "lombricultura"],
+    "general": ["aucca", "ubicacion", "mision", "historia", "objetivos", "talleres", "beneficiarios", "contacto"],
+    "taller": ["agricultura", "revolucion", "transgenicos", "huerta"],
+}
+
+SIN_RESPUESTA = ("Lo siento, no tengo información sobre eso. "
+                 "Puedes preguntar por agroecología, compostaje, baños secos, biofiltros o escribir el nombre de una planta.")
+
+MAX_RESPUESTAS = 256  # routed answers kept in memory
+DIR_AUDIO = os.path.join("datos", "tts")
+
+
+def _relacionadas(pares):
+    md = ["### 📚 Información relacionada:"]
+    for q, a in pares:
+        md.append(f"**🔹 {q.capitalize()}**\n\n{a}")
+    return "\n\n".join(md)
+
+
+def _respuesta(etapa, tipo, plantas=(), principal="", relacionado="", clave=None):
+    # tipo: "planta" / "plantas" (records), "sugerencias" (names), "concepto", "ninguno"
+    # clave: question (or workshop section) the main answer comes from.
+    return {"etapa": etapa, "tipo": tipo, "plantas": list(plantas),
+            "principal": principal, "relacionado": relacionado, "clave": clave}
+
+
+def _registros(df):
+    # Same dicts as df.to_dict(orient="records") on the all-text catalogue, without
+    # pandas' per-column boxing (a month query returns over a hundred rows).
+    columnas = list(df.columns)
+    return [dict(zip(columnas, fila)) for fila in df.to_numpy(dtype=object).tolist()]
+
+
+def _misma_categoria(knowledge, clave):
+    return next((cat_dict for cat_dict in knowledge.values() if clave in cat_dict), {})
+
+
+def respuesta_concepto(clave, q, knowledge, pasajes, etapa="sugerencia"):
+    """A question's best passages for `q`, and those of the rest of its topic."""
+    return _respuesta(etapa, "concepto", clave=clave,
+                      principal=f"### 🧠 Respuesta principal:\n\n**{clave.capitalize()}**\n\n{pasajes.extracto(clave, q, 2)}",
+                      relacionado=_relacionadas([(k, pasajes.extracto(k, q))
+                                                 for k in _misma_categoria(knowledge, clave) if k != clave]))
+
+
+def frases_conocidas(base_conocimiento, sinonimos):
+    """Normalized question or synonym phrase -> question it stands for."""
+    frases = {normalizar_texto(k): k for k in base_conocimiento}
+    for clave, lista in sinonimos.items():
+        if clave in base_conocimiento:
+            for frase in (lista if isinstance(lista, (list, tuple)) else [lista]):
+                frases.setdefault(normalizar_texto(frase), clave)
+    return frases
+
+
+# ======================
+# QUERY ROUTER ("Enviar" on the Inicio page)
+# Stages are tried in order; the answer records which one matched so the
+# analytics log can tell them apart. Pure: no widgets, so it can be cached and
+# replayed off the page (cache warming).
+# ======================
+def enrutar(q, motor, filtros, consulta, base_conocimiento, knowledge, conocimiento, pasajes=None, frases=None):
+    # Concept answers are cut to their best passage(s) for the query.
+    pasajes = pasajes or IndicePasajes(base_conocimiento)
+    norm_q = normalizar_texto(q)
+
+    # A question as listed, or one of its synonym phrasings: one dict lookup.
+    clave = (frases or {}).get(norm_q)
+    if clave:
+        return respuesta_concepto(clave, q, knowledge, pasajes, etapa="sinonimo")
+
+    # Whole words: "ortiga mayor" is not a question about May.
+    palabras_q = set(norm_q.split())
+    mes = next((m for m in MESES_CONSULTA if m in palabras_q), None)
+    if mes:
+        # Intersect with the sidebar selection for the same column.
+        meses = [m for m in [mes] if m in filtros.get("Meses Siembra (Chile)", [m])]
+        etapa = "mes"
+        pmatches = _registros(motor.filtrar({**filtros, "Meses Siembra (Chile)": meses}, **consulta))
+    elif "frutales" in norm_q:
+        cats = [c for c in ["frutales"] if c in filtros.get("Categoria", [c])]
+        etapa = "categoria"
+        pmatches = _registros(motor.filtrar({**filtros, "Categoria": cats}, **consulta))
+    else:
+        etapa = "nombre"
+        pmatches = _registros(motor.filtrar(filtros, nombre=norm_q, **consulta))
+    if pmatches:
+        return _respuesta(etapa, "planta" if len(pmatches) == 1 else "plantas", pmatches)
+
+    # Fuzzy matching if no exact match is found.
+    all_names = motor.filtrar(filtros, **consulta)["Nombre total"].tolist()
+    fuzzy_matches = difflib.get_close_matches(q, all_names, n=5, cutoff=0.5)
+    if fuzzy_matches:
+        return _respuesta("nombre_difuso", "sugerencias", fuzzy_matches)
+
+    matched_cat = next((cat for cat, kws in PALABRAS_CATEGORIA.items() if any(wd in norm_q for wd in kws)), None)
+    if matched_cat and matched_cat in knowledge:
+        cat_dict = knowledge[matched_cat]
+        first_k = list(cat_dict.keys())[0]
+        return _respuesta("palabra_clave", "concepto", clave=first_k,
+                          principal=f"### 🧠 Respuesta principal:\n\n**{first_k.capitalize()}**\n\n{pasajes.extracto(first_k, q, 2)}",
+                          relacionado=_relacionadas([(k, pasajes.extracto(k, q)) for k in cat_dict if k != first_k]))
+
+    for kb_key in base_conocimiento:
+        if norm_q in normalizar_texto(kb_key):
+            return _respuesta("concepto", "concepto", clave=kb_key,
+                              principal=f"### 🧠 Respuesta principal:\n\n**{kb_key.capitalize()}**\n\n{pasajes.extracto(kb_key, q, 2)}")
+
+    keys_norm = {normalizar_texto(k): k for k in base_conocimiento.keys()}
+    close_concepts = difflib.get_close_matches(norm_q, list(keys_norm.keys()), n=1, cutoff=0.5)
+    if close_concepts:
+        best_match = keys_norm[close_concepts[0]]
+        related_list = [(k, pasajes.extracto(k, q)) for k in _misma_categoria(knowledge, best_match) if k != best_match]
+        return _respuesta("concepto_difuso", "concepto", clave=best_match,
+                          principal=f"### 🧠 Quizás quisiste decir:\n\n**{best_match.capitalize()}**\n\n{pasajes.extracto(best_match, q, 2)}",
+                          relacionado=_relacionadas(related_list))
+
+    # Full-text retrieval over the workshop sections.
+    secciones = motor.buscar_secciones(q, n=3)
+    if secciones:
+        titulo = secciones[0]
+        return _respuesta("taller", "concepto", clave=titulo,
+                          principal=f"### 📚 Del taller de huerta:\n\n**{titulo}**\n\n{conocimiento.extracto(titulo, q, 2)}",
+                          relacionado=_relacionadas([(t, conocimiento.extracto(t, q)) for t in secciones[1:]]))
+
+    return _respuesta("sin_resultado", "ninguno", principal=SIN_RESPUESTA)
+
+
+# ======================
+# SPELLING CORRECTION
+# Vocabulary: plant names, question keys, synonym phrases and the workshop text.
+# Rebuilt only when the catalogue or the docx changes (or the page's own lists).
+# ======================
+def vocabulario(catalogo, conocimiento, base_conocimiento, sinonimos):
+    textos = list(catalogo.df["Nombre total"]) + MESES_CONSULTA + list(base_conocimiento)
+    for clave, frases in sinonimos.items():
+        textos.append(clave)
+        textos.extend(frases if isinstance(frases, (list, tuple)) else [frases])
+    for titulo, texto in conocimiento.secciones.items():
+        textos += [titulo, texto]
+    return textos
+
+
+def corrector(servicio, base_conocimiento, sinonimos):
+    catalogo, conocimiento = servicio.catalogo, servicio.conocimiento
+    firma = hash((tuple(base_conocimiento), _firma_sinonimos(sinonimos)))
+    return catalogo.derivado(
+        "ortografia",
+        lambda c: IndiceOrtografico(vocabulario(c, conocimiento, base_conocimiento, sinonimos),
+                                    preferidos=list(c.df["Nombre total"]) + MESES_CONSULTA),
+        firma=(conocimiento.version, firma))
+
+
+def _firma_sinonimos(sinonimos):
+    return hash(tuple((k, tuple(v) if isinstance(v, list) else v) for k, v in sinonimos.items()))
+
+
+def pasajes_respuestas(servicio, base_conocimiento):
+    # Passages of the page's answers, rebuilt with the same triggers as the corrector.
+    catalogo, conocimiento = servicio.catalogo, servicio.conocimiento
+    firma = hash(tuple(base_conocimiento.items()))
+    return catalogo.derivado("pasajes", lambda c: IndicePasajes(base_conocimiento),
+                             firma=(conocimiento.version, firma))
+
+
+def frases_respuestas(servicio, base_conocimiento, sinonimos):
+    catalogo, conocimiento = servicio.catalogo, servicio.conocimiento
+    firma = hash((tuple(base_conocimiento), _firma_sinonimos(sinonimos)))
+    return catalogo.derivado("frases", lambda c: frases_conocidas(base_conocimiento, sinonimos),
+                             firma=(conocimiento.version, firma))
+
+
+# ======================
+# ANSWER CACHE
+# Keyed by normalized query, sidebar selection and snapshot versions
+# (catalogue, docx and assistant content), so a reload or a different filter
+# never serves a stale answer.
+# ======================
+_RESPUESTAS = OrderedDict()
+_LOCK = threading.Lock()
+
+
+def llave_respuesta(q, filtros, consulta, version_catalogo, version_conocimiento, version_contenido):
+    return (normalizar_texto(q), firma_filtros(filtros, **consulta),
+            version_catalogo, version_conocimiento, version_contenido)
+
+
+def responder(q, motor, filtros, consulta, base_conocimiento, knowledge, servicio, sinonimos=None):
+    """Routed answer for `q`, from the cache when the same question was asked before."""
+    llave = llave_respuesta(q, filtros, consulta, servicio.catalogo.version, servicio.conocimiento.version,
+                            servicio.contenido.version)
+    with _LOCK:
+        respuesta = _RESPUESTAS.get(llave)
+        if respuesta is not None:
+            _RESPUESTAS.move_to_end(llave)
+            return respuesta
+    respuesta = enrutar(q, motor, filtros, consulta, base_conocimiento, knowledge, servicio.conocimiento,
+                        pasajes_respuestas(servicio, base_conocimiento),
+                        frases_respuestas(servicio, base_conocimiento, sinonimos or {}))
+    with _LOCK:
+        _RESPUESTAS[llave] = respuesta
+        while len(_RESPUESTAS) > MAX_RESPUESTAS:
+            _RESPUESTAS.popitem(last=False)
+    return respuesta
+
+
+# ======================
+# SPOKEN ANSWERS (gTTS needs the network: audio is kept on disk by text hash)
+# ======================
+def texto_para_voz(md):
+    # Markdown marks and emoji are read out literally by gTTS.
+    return re.sub(r"[#*_`>]|[^\w\s.,;:¿?¡!()%°-]", "", md).strip()
+
+
+def ruta_audio(texto, lang="es", directorio=DIR_AUDIO):
+    h = hashlib.sha1(f"{lang}|{texto}".encode("utf-8")).hexdigest()[:20]
+    return os.path.join(directorio, f"{h}.mp3")
+
+
+def audio_respuesta(texto, lang="es", directorio=DIR_AUDIO):
+    texto = texto_para_voz(texto)
+    ruta = ruta_audio(texto, lang, directorio)
+    if not os.path.exists(ruta):
+        from gtts import gTTS
+
+        os.makedirs(directorio, exist_ok=True)
+        temporal = ruta + ".tmp"
+        try:
+            gTTS(text=texto, lang=lang, slow=False).save(temporal)
+            os.replace(temporal, ruta)
+        except Exception:
+            # Offline or rate-limited: leave no half-written file behind.
+            if os.path.exists(temporal):
+                os.remove(temporal)
+            raise
+    with open(ruta, "rb") as f:
+        return f.read()
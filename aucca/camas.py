@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+
+# Spacing used when the catalogue has no parseable value (cm).
+DISTANCIA_POR_DEFECTO = 30.0
+
+# One colour per plant in the rendered grid (RGB), cycled if there are more plants.
+PALETA = np.array([
+    [46, 139, 87], [255, 165, 0], [199, 55, 161], [65, 105, 225], [210, 105, 30],
+    [154, 205, 50], [220, 20, 60], [72, 209, 204], [218, 165, 32], [123, 104, 238],
+], dtype=np.uint8)
+FONDO = np.array([121, 85, 61], dtype=np.uint8)   # bare soil
+SURCO = np.array([150, 111, 83], dtype=np.uint8)  # row band without a plant
+
+
+def espaciamientos(numericos, posiciones):
+    """In-row and between-row spacing (cm) of the plants at `posiciones`."""
+    def medio(prefijo):
+        lo = numericos[f"{prefijo}_min"].to_numpy(dtype="float64")[posiciones]
+        hi = numericos[f"{prefijo}_max"].to_numpy(dtype="float64")[posiciones]
+        return (lo + hi) / 2
+
+    plantas = medio("distancia_plantas")
+    hileras = medio("distancia_hileras")
+    # A missing value borrows the other spacing before falling back to the default.
+    plantas = np.where(np.isnan(plantas), hileras, plantas)
+    hileras = np.where(np.isnan(hileras), plantas, hileras)
+    plantas = np.nan_to_num(plantas, nan=DISTANCIA_POR_DEFECTO)
+    hileras = np.nan_to_num(hileras, nan=DISTANCIA_POR_DEFECTO)
+    return np.maximum(plantas, 1.0), np.maximum(hileras, 1.0)
+
+
+# ======================
+# BED LAYOUT PLANNER
+# Rows run along the bed length; each row holds one plant and takes its
+# between-row spacing across the bed width. Rows are handed out round-robin
+# (widest plant first in every round) and placed best-fit into the beds, so
+# every chosen plant gets a fair share until no row fits anywhere.
+# The plan is a structured NumPy array, one record per row.
+# ======================
+FILA = np.dtype([("cama", np.int32), ("planta", np.int32), ("y", np.float32),
+                 ("ancho", np.float32), ("paso", np.float32), ("n", np.int32)])
+
+
+class PlanCamas:
+    def __init__(self, nombres, dist_plantas, dist_hileras, largo, ancho, camas=1):
+        self.nombres = list(nombres)
+        self.largo, self.ancho, self.camas = float(largo), float(ancho), int(camas)
+        paso = np.asarray(dist_plantas, dtype=np.float32)
+        anchos = np.asarray(dist_hileras, dtype=np.float32)
+        por_fila = np.floor(self.largo / paso).astype(np.int32)
+
+        libre = np.full(self.camas, self.ancho, dtype=np.float32)
+        activas = np.flatnonzero((por_fila > 0) & (anchos <= self.ancho))
+        activas = activas[np.argsort(-anchos[activas], kind="stable")]
+        filas = []
+        while activas.size:
+            siguen = []
+            for p in activas:
+                cabe = libre >= anchos[p]
+                if not cabe.any():
+                    continue
+                c = int(np.argmin(np.where(cabe, libre, np.inf)))
+                filas.append((c, p, self.ancho - libre[c], anchos[p], paso[p], por_fila[p]))
+                libre[c] -= anchos[p]
+                siguen.append(p)
+            activas = np.array(siguen, dtype=np.intp)
+        self.filas = np.array(filas, dtype=FILA)
+        self.libre = libre
+
+    @property
+    def sin_lugar(self):
+        colocadas = set(self.filas["planta"].tolist())
+        return [n for i, n in enumerate(self.nombres) if i not in colocadas]
+
+    def conteo(self):
+        """Plants per bed (rows: plants, columns: beds)."""
+        tabla = np.zeros((len(self.nombres), self.camas), dtype=np.int64)
+        np.add.at(tabla, (self.filas["planta"], self.filas["cama"]), self.filas["n"])
+        return pd.DataFrame(tabla, index=self.nombres,
+                            columns=[f"Cama {c + 1}" for c in range(self.camas)])
+
+    def grilla(self, cama, celda=5.0):
+        """Plant index per `celda` cm cell of one bed: -1 soil, -2 row band, else plant."""
+        alto = max(1, int(np.ceil(self.ancho / celda)))
+        largo = max(1, int(np.ceil(self.largo / celda)))
+        g = np.full((alto, largo), -1, dtype=np.int16)
+        filas = self.filas[self.filas["cama"] == cama]
+        for f in filas:
+            y0 = int(f["y"] // celda)
+            y1 = max(y0 + 1, int((f["y"] + f["ancho"]) // celda))
+            g[y0:y1] = -2
+            centro = min(alto - 1, int((f["y"] + f["ancho"] / 2) // celda))
+            xs = ((np.arange(f["n"]) + 0.5) * f["paso"] // celda).astype(np.intp)
+            g[centro, np.minimum(xs, largo - 1)] = f["planta"]
+        return g
+
+    def imagen(self, cama, celda=5.0, escala=4):
+        g = self.grilla(cama, celda)
+        rgb = np.empty(g.shape + (3,), dtype=np.uint8)
+        rgb[g == -1] = FONDO
+        rgb[g == -2] = SURCO
+        plantas = g >= 0
+        rgb[plantas] = PALETA[g[plantas] % len(PALETA)]
+        return np.repeat(np.repeat(rgb, escala, axis=0), escala, axis=1)
+
+    def leyenda(self):
+        return {n: "#%02x%02x%02x" % tuple(PALETA[i % len(PALETA)]) for i, n in enumerate(self.nombres)}
+
+
+def planificar(catalogo, nombres, largo, ancho, camas=1):
+    indice = {}
+    for i, n in enumerate(catalogo.df["Nombre total"]):
+        indice.setdefault(n, i)
+    nombres = [n for n in nombres if n in indice]
+    posiciones = np.array([indice[n] for n in nombres], dtype=np.intp)
+    dist_plantas, dist_hileras = espaciamientos(catalogo.numericos_vivos, posiciones)
+    return PlanCamas(nombres, dist_plantas, dist_hileras, largo, ancho, camas)
@@ -0,0 +1,343 @@
+import glob
+import hashlib
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+from aucca.cultivo import IndiceRangos, parsear_cultivo
+from aucca.indices import IndiceSubcadenas
+from aucca.texto import dividir_valores, normalizar_texto, terminos
+
+CSV_PLANTAS = "plantas_aucca_30_03_25.csv"
+PATRON_CSV_PLANTAS = "plantas_aucca_*.csv"
+# Typed snapshot written by `python -m aucca.ingesta` (preferred when newer than the CSVs).
+SNAPSHOT_PLANTAS = os.path.join("datos", "plantas.parquet")
+RENOMBRES = {"Meses UNIRCADENAS": "Meses Siembra (Chile)"}
+
+MESES = ["Enero", "Febrero", "Marzo", "Abril", "Mayo", "Junio", "Julio", "Agosto",
+         "Septiembre", "Octubre", "Noviembre", "Diciembre"]
+
+# Columns with a precomputed filter bitmap. "exacto" keeps the cell as a single
+# option; "dividir" splits it like the sidebar always did (`[,\-;]`, lowercase).
+COLUMNAS_FILTRO = {
+    "Disponible Nov 2024": "exacto",
+    "Meses Siembra (Chile)": "dividir",
+    "Categoria": "dividir",
+    "Familia": "exacto",
+    "Fijador de Nitrógeno": "exacto",
+    "Acumulador Dinámico": "dividir",
+    "Propiedades": "dividir",
+    "Zona": "exacto",
+    "Fuentes": "dividir",  # only present when partner catalogues are merged in
+}
+
+# Pseudo filter column: restricts to a set of row keys (e.g. plants available
+# at a date), so it cascades into the other options like any filter.
+FILTRO_CLAVES = "_claves"
+
+# Tombstoned rows are compacted with a full rebuild past this fraction.
+MAX_FRACCION_BORRADOS = 0.25
+
+
+# ======================
+# LOAD PLANT DATA FROM CSV
+# ======================
+def ultimo_csv_plantas(directorio="."):
+    # plantas_aucca_DD_MM_YY.csv -> newest date wins, mtime breaks ties / odd names.
+    def orden(path):
+        m = re.search(r"(\d{2})_(\d{2})_(\d{2})", os.path.basename(path))
+        fecha = (int(m.group(3)), int(m.group(2)), int(m.group(1))) if m else (0, 0, 0)
+        return fecha, os.path.getmtime(path)
+
+    candidatos = glob.glob(os.path.join(directorio, PATRON_CSV_PLANTAS))
+    if not candidatos:
+        return os.path.join(directorio, CSV_PLANTAS)
+    return max(candidatos, key=orden)
+
+
+def nombre_total(df):
+    return df["Nombre vulgar"] + " (" + df["Nombre Científico"] + ")"
+
+
+def limpiar_plantas(df):
+    df = df.fillna("")
+    df = df.rename(columns=RENOMBRES)
+    for col in ["Disponible Nov 2024", "Familia", "Propiedades", "Categoria", "Nombre vulgar", "Nombre Científico"]:
+        df[col] = df[col].apply(lambda x: x.strip() if isinstance(x, str) else x)
+    df["Nombre total"] = nombre_total(df)
+    return df.reset_index(drop=True)
+
+
+def leer_csv_plantas(path=None):
+    path = path or ultimo_csv_plantas()
+    return limpiar_plantas(pd.read_csv(path, sep=";", encoding="latin1"))
+
+
+def leer_snapshot_plantas(path=SNAPSHOT_PLANTAS):
+    df = pd.read_parquet(path)
+    df = df.drop(columns=[c for c in df.columns if c.startswith("_")])
+    # Same shapes as the CSV path: numbers as float, gaps as "".
+    numericas = df.select_dtypes("number").columns
+    df[numericas] = df[numericas].astype("float64")
+    return limpiar_plantas(df.drop(columns=["Nombre total"], errors="ignore"))
+
+
+def fuente_plantas(directorio="."):
+    csv = ultimo_csv_plantas(directorio)
+    snapshot = os.path.join(directorio, SNAPSHOT_PLANTAS)
+    if os.path.exists(snapshot) and (not os.path.exists(csv)
+                                     or os.path.getmtime(snapshot) >= os.path.getmtime(csv)):
+        return snapshot
+    return csv
+
+
+def leer_plantas(path=None):
+    path = path or fuente_plantas()
+    if path.endswith(".parquet"):
+        return leer_snapshot_plantas(path)
+    return leer_csv_plantas(path)
+
+
+def claves_filas(df):
+    # Row key: normalized "Nombre total", with an ordinal suffix for repeats.
+    base = df["Nombre total"].map(lambda x: " ".join(normalizar_texto(x).split()))
+    orden = base.groupby(base).cumcount()
+    return np.where(orden == 0, base, base + "#" + (orden + 1).astype(str)).astype(object)
+
+
+def hashes_filas(df):
+    return pd.util.hash_pandas_object(df.astype(str), index=False).to_numpy()
+
+
+def tokens_columna(valor, modo):
+    if modo == "dividir":
+        return dividir_valores(valor)
+    return [valor] if isinstance(valor, str) and valor else []
+
+
+# ======================
+# CATALOGUE SNAPSHOT
+# Rows keep a stable position in `filas`; deletions only clear `vivos`. Each
+# filter column is a (tokens, bool[token, row]) bitmap and plant names live in a
+# trigram index, so a CSV edit touches only the changed rows.
+# ======================
+class Catalogo:
+    def __init__(self, df, version=0):
+        self.version = version
+        self.filas = df.reset_index(drop=True)
+        self.claves = claves_filas(self.filas)
+        self.posicion = {k: i for i, k in enumerate(self.claves)}
+        self.hashes = hashes_filas(self.filas)
+        self.vivos = np.ones(len(self.filas), dtype=bool)
+        self.bitmaps = {}
+        for col, modo in COLUMNAS_FILTRO.items():
+            if col not in self.filas.columns:
+                continue
+            tokens, indice = [], {}
+            celdas = [tokens_columna(v, modo) for v in self.filas[col]]
+            for toks in celdas:
+                for t in toks:
+                    if t not in indice:
+                        indice[t] = len(tokens)
+                        tokens.append(t)
+            matriz = np.zeros((len(tokens), len(self.filas)), dtype=bool)
+            for fila, toks in enumerate(celdas):
+                matriz[[indice[t] for t in toks], fila] = True
+            self.bitmaps[col] = (tokens, matriz)
+        self.nombres = IndiceSubcadenas(dict(zip(self.claves, self.filas["Nombre total"])))
+        self.numericos = parsear_cultivo(self.filas)
+        self.rangos = IndiceRangos(self.numericos)
+        self.cambios = None
+        self._df = None
+        self._texto = None
+        self._derivados = {}
+
+    @property
+    def df(self):
+        # Live rows only, in their original order (what the pages filter on).
+        if self._df is None:
+            self._df = self.filas[self.vivos].reset_index(drop=True)
+        return self._df
+
+    @property
+    def claves_vivas(self):
+        return self.claves[self.vivos]
+
+    def clave_de(self, fila):
+        """Row key of a live plant record (repeated names are told apart by content)."""
+        base = " ".join(normalizar_texto(fila.get("Nombre total", "")).split())
+        claves, n = [], 1
+        clave = base
+        while clave in self.posicion:
+            if self.vivos[self.posicion[clave]]:
+                claves.append(clave)
+            n += 1
+            clave = f"{base}#{n}"
+        if len(claves) > 1:
+            for clave in claves:
+                guardada = self.filas.iloc[self.posicion[clave]]
+                if all(str(guardada[c]) == str(fila[c]) for c in self.filas.columns if c in fila):
+                    return clave
+        return claves[0] if claves else None
+
+    @property
+    def huella(self):
+        # Content fingerprint, stable across processes (unlike `version`).
+        h = hashlib.sha1("|".join(self.filas.columns).encode("utf-8"))
+        h.update(self.hashes[self.vivos].tobytes())
+        return h.hexdigest()
+
+    def derivado(self, nombre, construir, firma=None):
+        # Structures computed from this snapshot (harvest calendar, ...), built on
+        # first use and dropped together with the snapshot on the next reload.
+        # `firma` covers inputs besides the snapshot (a file's mtime, the climate
+        # version...): when it changes the structure is rebuilt in the same slot,
+        # so superseded versions are not kept.
+        guardado = self._derivados.get(nombre)
+        if guardado is None or guardado[0] != firma:
+            guardado = (firma, construir(self))
+            self._derivados[nombre] = guardado
+        return guardado[1]
+
+    # ----- filters -----
+    def opciones(self, col, mascara=None):
+        tokens, matriz = self.bitmaps[col]
+        matriz = matriz[:, self.vivos]
+        if mascara is not None:
+            matriz = matriz[:, mascara]
+        presentes = matriz.any(axis=1)
+        return sorted(t for t, p in zip(tokens, presentes) if p)
+
+    def mascara(self, col, valores):
+        tokens, matriz = self.bitmaps[col]
+        indice = {t: i for i, t in enumerate(tokens)}
+        filas = [indice[v] for v in valores if v in indice]
+        if not filas:
+            return np.zeros(int(self.vivos.sum()), dtype=bool)
+        return matriz[filas][:, self.vivos].any(axis=0)
+
+    def mascara_claves(self, claves):
+        # Row keys are unique, unlike "Nombre total": look them up by position.
+        mascara = np.zeros(len(self.filas), dtype=bool)
+        mascara[[self.posicion[k] for k in claves if k in self.posicion]] = True
+        return mascara[self.vivos]
+
+    def mascara_filtros(self, filtros):
+        mascara = np.ones(int(self.vivos.sum()), dtype=bool)
+        for col, valores in filtros.items():
+            if col == FILTRO_CLAVES:
+                mascara &= self.mascara_claves(valores)
+            else:
+                mascara &= self.mascara(col, valores)
+        return mascara
+
+    @property
+    def numericos_vivos(self):
+        return self.numericos[self.vivos].reset_index(drop=True)
+
+    def limites(self, prefijo):
+        return self.rangos.limites(prefijo)
+
+    def mascara_rangos(self, rangos):
+        mascara = np.ones(len(self.filas), dtype=bool)
+        for prefijo, (lo, hi) in rangos.items():
+            mascara &= self.rangos.mascara(prefijo, lo, hi)
+        return mascara[self.vivos]
+
+    def buscar_texto(self, consulta):
+        # Every query term must start a word of the names, Propiedades or Observaciones.
+        if self._texto is None:
+            cols = ["Nombre vulgar", "Nombre Científico", "Propiedades", "Observaciones"]
+            self._texto = self.df[cols].astype(str).agg(" ".join, axis=1).map(normalizar_texto)
+        mascara = np.ones(len(self._texto), dtype=bool)
+        for t in terminos(consulta):
+            mascara &= self._texto.str.contains(r"\b" + re.escape(t), regex=True).to_numpy()
+        return mascara
+
+    def buscar_nombres(self, consulta):
+        # Boolean mask over `df` of plants whose "Nombre total" contains the query.
+        encontrados = self.nombres.buscar(consulta)
+        return np.fromiter((k in encontrados for k in self.claves_vivas), dtype=bool,
+                           count=int(self.vivos.sum()))
+
+    # ----- incremental update -----
+    def con_cambios(self, df_nuevo):
+        """Return a new snapshot for `df_nuevo`, reusing every unchanged row's index entries."""
+        df_nuevo = df_nuevo.reset_index(drop=True)
+        if list(df_nuevo.columns) != list(self.filas.columns):
+            return Catalogo(df_nuevo, self.version + 1)
+
+        claves = claves_filas(df_nuevo)
+        hashes = hashes_filas(df_nuevo)
+        nuevas = dict(zip(claves, range(len(claves))))
+        borradas = [k for k in self.claves_vivas if k not in nuevas]
+        cambiadas, agregadas = [], []
+        for k, i in nuevas.items():
+            pos = self.posicion.get(k)
+            if pos is None or not self.vivos[pos]:
+                agregadas.append(k)
+            elif self.hashes[pos] != hashes[i]:
+                cambiadas.append(k)
+
+        n_borrados = int((~self.vivos).sum()) + len(borradas)
+        if n_borrados > MAX_FRACCION_BORRADOS * (len(self.filas) + len(agregadas)):
+            return Catalogo(df_nuevo, self.version + 1)
+
+        nuevo = object.__new__(Catalogo)
+        nuevo.version = self.version + 1
+        nuevo._df = None
+        nuevo._texto = None
+        nuevo._derivados = {}
+        # Revived keys reuse their old slot; genuinely new keys are appended.
+        reusadas = [k for k in agregadas if k in self.posicion]
+        anexadas = [k for k in agregadas if k not in self.posicion]
+        n_viejo = len(self.filas)
+        filas = self.filas.copy()
+        if anexadas:
+            filas = pd.concat([filas, df_nuevo.iloc[[nuevas[k] for k in anexadas]]], ignore_index=True)
+        tocadas = cambiadas + reusadas
+        if tocadas:
+            filas.iloc[[self.posicion[k] for k in tocadas]] = df_nuevo.iloc[[nuevas[k] for k in tocadas]].to_numpy()
+        nuevo.filas = filas
+        nuevo.claves = np.concatenate([self.claves, np.array(anexadas, dtype=object)])
+        nuevo.posicion = dict(self.posicion)
+        nuevo.posicion.update({k: n_viejo + j for j, k in enumerate(anexadas)})
+        nuevo.vivos = np.concatenate([self.vivos, np.ones(len(anexadas), dtype=bool)])
+        nuevo.vivos[[self.posicion[k] for k in borradas]] = False
+        nuevo.vivos[[self.posicion[k] for k in reusadas]] = True
+        nuevo.hashes = np.concatenate([self.hashes, np.zeros(len(anexadas), dtype=self.hashes.dtype)])
+        for k in tocadas + anexadas:
+            nuevo.hashes[nuevo.posicion[k]] = hashes[nuevas[k]]
+
+        escritas = [nuevo.posicion[k] for k in tocadas + anexadas]
+        nuevo.bitmaps = {}
+        for col, (tokens, matriz) in self.bitmaps.items():
+            tokens = list(tokens)
+            indice = {t: i for i, t in enumerate(tokens)}
+            matriz = np.pad(matriz, ((0, 0), (0, len(anexadas))))
+            matriz[:, escritas] = False
+            for pos in escritas:
+                for t in tokens_columna(filas.at[pos, col], COLUMNAS_FILTRO[col]):
+                    if t not in indice:
+                        indice[t] = len(tokens)
+                        tokens.append(t)
+                        matriz = np.vstack([matriz, np.zeros((1, matriz.shape[1]), dtype=bool)])
+                    matriz[indice[t], pos] = True
+            nuevo.bitmaps[col] = (tokens, matriz)
+
+        numericos = pd.concat([self.numericos, parsear_cultivo(filas.iloc[n_viejo:])])
+        if escritas:
+            numericos.iloc[escritas] = parsear_cultivo(filas.iloc[escritas]).to_numpy()
+        # Deleted rows drop out of the range indexes (NaN never matches).
+        numericos.loc[~nuevo.vivos, [c for c in numericos.columns if c.endswith(("_min", "_max"))]] = np.nan
+        nuevo.numericos = numericos.astype(self.numericos.dtypes.to_dict())
+        nuevo.rangos = IndiceRangos(nuevo.numericos)
+
+        nuevo.nombres = self.nombres.con_cambios(
+            agregar={k: filas.at[nuevo.posicion[k], "Nombre total"] for k in tocadas + anexadas},
+            quitar=borradas,
+        )
+        nuevo.cambios = {"agregadas": agregadas, "cambiadas": cambiadas, "borradas": borradas}
+        return nuevo
@@ -0,0 +1,225 @@
+"""Frost and heavy-rain risk of each sowing window, from a local daily climate series.
+
+    python -m aucca.clima [--csv datos/clima_talagante.csv] [--escala 100]
+
+Prints the weekly frost / heavy-rain probabilities grouped by month and the
+time to build them and the per-plant sowing risks (`--escala` replicates the
+catalogue N times).
+
+The series is a `;`-separated CSV with one row per day:
+
+    fecha;t_min;t_max;lluvia_mm;viento_kmh
+    2019-01-01;11.5;32.8;0.0;17.4
+
+The bundled `datos/clima_talagante.csv` is a sample shaped on Talagante's
+climate; a station export with the same columns can replace it while the app
+runs (the reload service picks it up).
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from aucca.catalogo import MESES
+from aucca.cosecha import calendario_cosecha
+from aucca.fichas import ESTILOS
+
+CSV_CLIMA = os.path.join("datos", "clima_talagante.csv")
+COLUMNAS_CLIMA = ["t_min", "t_max", "lluvia_mm", "viento_kmh"]
+OBLIGATORIAS = ["fecha", "t_min", "lluvia_mm"]
+
+HELADA_C = 0.0            # night minimum at or below this is a frost
+LLUVIA_FUERTE_MM = 25.0   # rain over the 7 days after sowing that washes or rots seed
+DIAS_VENTANA = 7
+SEMANAS = 52
+# A sowing week is risky when the chance of its event is at least this.
+UMBRAL_HELADA = 0.25
+UMBRAL_LLUVIA = 0.25
+
+# Sowing window states, per plant and month.
+SIN_SIEMBRA, SEGURA, PARCIAL, RIESGOSA = 0, 1, 2, 3
+FILTRO_SEGURA = "Con semanas de siembra sin riesgo"
+FILTRO_RIESGO = "Solo ventanas con riesgo"
+OPCIONES_FILTRO = ["Todas", FILTRO_SEGURA, FILTRO_RIESGO]
+
+# Week of the year -> month its first day falls in, and that day.
+_INICIOS = pd.Timestamp("2001-01-01") + pd.to_timedelta(np.arange(SEMANAS) * 7, unit="D")
+MES_SEMANA = (_INICIOS.month - 1).to_numpy()
+DIA_SEMANA = _INICIOS.day.to_numpy()
+
+
+def leer_clima(path=CSV_CLIMA):
+    df = pd.read_csv(path, sep=";", encoding="utf-8")
+    df.columns = df.columns.str.strip()
+    faltan = [c for c in OBLIGATORIAS if c not in df.columns]
+    if faltan:
+        raise ValueError(f"{path}: faltan las columnas {', '.join(faltan)}")
+    df["fecha"] = pd.to_datetime(df["fecha"], errors="coerce")
+    for col in COLUMNAS_CLIMA:
+        df[col] = pd.to_numeric(df[col], errors="coerce") if col in df.columns else np.nan
+    df = df.dropna(subset=["fecha"]).drop_duplicates("fecha", keep="last")
+    return df.sort_values("fecha")[["fecha"] + COLUMNAS_CLIMA].reset_index(drop=True)
+
+
+def _por_semana(semana, valores):
+    validos = ~np.isnan(valores)
+    suma = np.bincount(semana[validos], valores[validos], minlength=SEMANAS)
+    n = np.bincount(semana[validos], minlength=SEMANAS)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return suma / n
+
+
+# ======================
+# WEEKLY CLIMATE PROBABILITIES
+# One versioned snapshot per climate file, like the catalogue. The series is
+# put on a gap-free daily index, then every day gets the 7-day window that
+# starts on it (a sowing made that day): any frost in it, total rain in it.
+# Those windows are averaged per week of the year over all years with
+# `np.bincount`, so a frost probability of 0.4 in a week means 40 % of the
+# sowings made that week, in the years on record, saw a frost in their first
+# seven days.
+# ======================
+class Clima:
+    def __init__(self, diario, version=1):
+        self.version = version
+        self.diario = diario
+        serie = diario.set_index("fecha").asfreq("D")
+        self.desde, self.hasta = serie.index[0].date(), serie.index[-1].date()
+        self.anios = serie.index.year.nunique()
+
+        t_min = serie["t_min"]
+        helada = (t_min <= HELADA_C).astype("float64").where(t_min.notna())
+        adelante = DIAS_VENTANA - 1
+        minimo = DIAS_VENTANA // 2 + 1
+        ventanas = pd.DataFrame({
+            "helada": helada.rolling(DIAS_VENTANA, min_periods=minimo).max().shift(-adelante),
+            "lluvia": serie["lluvia_mm"].rolling(DIAS_VENTANA, min_periods=minimo).sum().shift(-adelante),
+        })
+        fuerte = (ventanas["lluvia"] >= LLUVIA_FUERTE_MM).astype("float64").where(ventanas["lluvia"].notna())
+
+        semana = np.minimum((serie.index.dayofyear.to_numpy() - 1) // 7, SEMANAS - 1)
+        self.semanal = pd.DataFrame({
+            "mes": np.array(MESES)[MES_SEMANA],
+            "inicio": DIA_SEMANA,
+            "p_helada": _por_semana(semana, ventanas["helada"].to_numpy()),
+            "p_lluvia": _por_semana(semana, fuerte.to_numpy()),
+            "lluvia_mm": _por_semana(semana, ventanas["lluvia"].to_numpy()),
+            "t_min": _por_semana(semana, t_min.to_numpy()),
+            "t_max": _por_semana(semana, serie["t_max"].to_numpy()),
+            "viento_kmh": _por_semana(semana, serie["viento_kmh"].to_numpy()),
+        })
+        s = self.semanal
+        self.helada = (s["p_helada"] >= UMBRAL_HELADA).to_numpy()
+        self.lluvia = (s["p_lluvia"] >= UMBRAL_LLUVIA).to_numpy()
+        riesgosa = self.helada | self.lluvia
+
+        # Month -> SEGURA (no risky week), PARCIAL (some) or RIESGOSA (all).
+        semanas = np.bincount(MES_SEMANA, minlength=12)
+        riesgosas = np.bincount(MES_SEMANA, riesgosa, minlength=12)
+        self.estado_mes = np.where(riesgosas == 0, SEGURA,
+                                   np.where(riesgosas < semanas, PARCIAL, RIESGOSA)).astype(np.int8)
+
+    def con_datos(self, diario):
+        return Clima(diario, self.version + 1)
+
+    def semanas_de(self, mes):
+        return self.semanal[self.semanal["mes"] == mes]
+
+
+# ======================
+# RISKY SOWING WINDOWS PER PLANT
+# The month states intersected with the Enero…Diciembre sowing matrix of the
+# harvest calendar: estado[planta, mes] is SIN_SIEMBRA where the plant is not
+# sown that month. Cached per (catalogue snapshot, climate version).
+# ======================
+class RiesgoSiembra:
+    def __init__(self, catalogo, clima):
+        self.clima = clima
+        calendario = calendario_cosecha(catalogo)
+        self.claves = catalogo.claves_vivas
+        # Calendar rows are the live rows, in order: row key -> calendar row.
+        self.posicion = {k: i for i, k in enumerate(self.claves)}
+        self.estado = np.where(calendario.siembra, clima.estado_mes[None, :], SIN_SIEMBRA).astype(np.int8)
+        self.con_ventana_segura = ((self.estado == SEGURA) | (self.estado == PARCIAL)).any(axis=1)
+        self.solo_riesgo = calendario.siembra.any(axis=1) & ~self.con_ventana_segura
+
+    def claves_con(self, opcion):
+        mascara = self.con_ventana_segura if opcion == FILTRO_SEGURA else self.solo_riesgo
+        return self.claves[mascara]
+
+    def seccion(self, clave, estilo="inicio"):
+        """Markdown lines of a plant's sowing months with their frost and rain risk, by row key."""
+        i = self.posicion.get(clave)
+        if i is None or not self.estado[i].any():
+            return ""
+        lineas = []
+        for m in np.flatnonzero(self.estado[i]):
+            semanas = self.clima.semanas_de(MESES[m])
+            abrev = MESES[m][:3].lower()
+            detalle = f"mín. media {semanas['t_min'].mean():.1f} °C, {semanas['lluvia_mm'].mean():.0f} mm por semana"
+            if self.estado[i, m] == SEGURA:
+                lineas.append(f"- **{MESES[m]}**: ✅ sin riesgo ({detalle})")
+                continue
+            avisos = []
+            helada = self.clima.helada[MES_SEMANA == m]
+            lluvia = self.clima.lluvia[MES_SEMANA == m]
+            if helada.any():
+                avisos.append(f"❄️ helada hasta {semanas['p_helada'].max():.0%}")
+            if lluvia.any():
+                avisos.append(f"🌧️ lluvia fuerte hasta {semanas['p_lluvia'].max():.0%}")
+            seguras = semanas["inicio"][~(helada | lluvia)].tolist()
+            cuando = (f"mejor la semana del {', '.join(map(str, seguras))} {abrev}" if seguras
+                      else "ninguna semana segura")
+            lineas.append(f"- **{MESES[m]}**: {', '.join(avisos)}; {cuando} ({detalle})")
+        c = self.clima
+        return (f"{'#' * ESTILOS[estilo]['nivel']} 🌦️ Clima de siembra\n\n" + "\n".join(lineas)
+                + f"\n\n_Riesgo en los 7 días tras sembrar, {c.desde:%Y}–{c.hasta:%Y} ({c.anios} años)._")
+
+
+def riesgo_siembra(catalogo, clima):
+    return catalogo.derivado("clima", lambda c: RiesgoSiembra(c, clima), firma=clima.version)
+
+
+# ======================
+# REPORT / BENCHMARK
+# ======================
+def main(argv=None):
+    from aucca.panel import catalogo_escalado
+    from aucca.recarga import ServicioRecarga
+
+    parser = argparse.ArgumentParser(description="Riesgo climático de las ventanas de siembra de AUCCA.")
+    parser.add_argument("--csv", default=CSV_CLIMA)
+    parser.add_argument("--escala", type=int, default=100, help="copias del catálogo")
+    args = parser.parse_args(argv)
+
+    t = time.perf_counter()
+    diario = leer_clima(args.csv)
+    leer = time.perf_counter() - t
+    t = time.perf_counter()
+    clima = Clima(diario)
+    semanal = time.perf_counter() - t
+    print(f"{len(diario)} días ({clima.desde} a {clima.hasta}): lectura {leer * 1000:.1f} ms, "
+          f"probabilidades semanales {semanal * 1000:.1f} ms\n")
+    print(f"{'mes':<11} {'p helada':>9} {'p lluvia':>9} {'mín °C':>7} {'mm/sem':>7}  estado")
+    estados = {SEGURA: "segura", PARCIAL: "parcial", RIESGOSA: "riesgosa"}
+    for m, mes in enumerate(MESES):
+        s = clima.semanas_de(mes)
+        print(f"{mes:<11} {s['p_helada'].max():>9.0%} {s['p_lluvia'].max():>9.0%} "
+              f"{s['t_min'].mean():>7.1f} {s['lluvia_mm'].mean():>7.1f}  {estados[clima.estado_mes[m]]}")
+
+    catalogo = ServicioRecarga().catalogo
+    for escala in sorted({1, args.escala}):
+        grande = catalogo_escalado(catalogo, escala) if escala > 1 else catalogo
+        calendario_cosecha(grande)
+        t = time.perf_counter()
+        riesgo = RiesgoSiembra(grande, clima)
+        ms = (time.perf_counter() - t) * 1000
+        print(f"\nx{escala}: {len(grande.df)} plantas, riesgos {ms:.1f} ms; "
+              f"{int(riesgo.con_ventana_segura.sum())} con semanas seguras, "
+              f"{int(riesgo.solo_riesgo.sum())} solo con ventanas riesgosas")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+import hashlib
+
+from docx import Document
+
+from aucca.indices import IndicePasajes, IndiceTerminos
+
+DOCX_TALLER = "huerta_agroecologica_comunitaria.docx"
+
+
+# ======================
+# KNOWLEDGE BASE: LOAD DOCX CONTENT
+# One pass over the document collects every "Heading 3" section (same rules as
+# the old per-section `extract_text`, which re-read the whole docx each time).
+# ======================
+def extraer_secciones(doc):
+    secciones = {}
+    actual, markdown_output = None, []
+
+    def cerrar():
+        if actual:
+            secciones.setdefault(actual, "\n\n".join(markdown_output))
+
+    for para in doc.paragraphs:
+        text = para.text.strip()
+        style = para.style.name
+
+        if 'Heading 1' in style or 'Heading 2' in style or 'Heading 3' in style:
+            cerrar()
+            actual, markdown_output = (text if 'Heading 3' in style else None), []
+            continue
+
+        if actual:
+            if 'Heading' in style:
+                level = int(''.join(filter(str.isdigit, style)))
+                level = min(level, 6)
+                markdown_output.append(f"{'#' * level} {text}")
+            elif 'Bullet' in style or 'List Paragraph' in style:
+                markdown_output.append(f"- {text}")
+            else:
+                markdown_output.append(text)
+    cerrar()
+    return secciones
+
+
+def leer_secciones(path=DOCX_TALLER):
+    return extraer_secciones(Document(path))
+
+
+def _hash(txt):
+    return hashlib.sha1(txt.encode("utf-8")).hexdigest()
+
+
+# ======================
+# WORKSHOP SNAPSHOT (sections + retrieval index)
+# ======================
+class Conocimiento:
+    def __init__(self, secciones, version=0):
+        self.version = version
+        self.secciones = dict(secciones)
+        self.hashes = {t: _hash(s) for t, s in self.secciones.items()}
+        self.indice = IndiceTerminos({t: f"{t}\n{s}" for t, s in self.secciones.items()})
+        self.pasajes = IndicePasajes(self.secciones)
+        self.cambios = None
+
+    @property
+    def huella(self):
+        return _hash("|".join(f"{t}:{h}" for t, h in sorted(self.hashes.items())))
+
+    def seccion(self, titulo):
+        return self.secciones.get(titulo, "")
+
+    def buscar(self, consulta, n=3):
+        return self.indice.buscar(consulta, n=n)
+
+    def extracto(self, titulo, consulta, n=1):
+        # Best passage(s) of a section for the query instead of the whole text.
+        return self.pasajes.extracto(titulo, consulta, n=n)
+
+    def con_cambios(self, secciones_nuevas):
+        hashes = {t: _hash(s) for t, s in secciones_nuevas.items()}
+        cambiadas = [t for t, h in hashes.items() if self.hashes.get(t) != h]
+        borradas = [t for t in self.secciones if t not in secciones_nuevas]
+        nuevo = object.__new__(Conocimiento)
+        nuevo.version = self.version + 1
+        nuevo.secciones = dict(secciones_nuevas)
+        nuevo.hashes = hashes
+        nuevo.indice = self.indice.con_cambios(
+            agregar={t: f"{t}\n{secciones_nuevas[t]}" for t in cambiadas},
+            quitar=borradas,
+        )
+        nuevo.pasajes = self.pasajes.con_cambios(
+            agregar={t: secciones_nuevas[t] for t in cambiadas},
+            quitar=borradas,
+        )
+        nuevo.cambios = {"cambiadas": cambiadas, "borradas": borradas}
+        return nuevo
+
+
+# ======================
+# "CONCEPTOS CLAVES" OUTLINE
+# Shared by the Streamlit page and the static site:
+# (subheader, [(section title, widget key, optional (image, caption))]).
+# ======================
+TITULO_CONCEPTOS = "LINEAMIENTOS FUNDAMENTALES PARA ABORDAR UNA HUERTA COMUNITARIA AGROECOLÓGICA"
+
+TEMARIO = [
+    ("1) Introducción a las crisis de la agricultura y la sociedad.", [
+        ("Agricultura", "agr", None),
+        ("Revolución verde", "rev", None),
+        ("Modelo de producción de alimentos en Chile", "alim", None),
+        ("Transgénicos", "trans", None),
+    ]),
+    ("2) Diferentes perspectivas y propuestas de solución a la crisis agrícola y social.", [
+        ("Agroecología", "agroecologia_p", None),
+        ("Agricultura urbana", "agricultura_urbana_p", None),
+        ("Permacultura", "permacultura_p", None),
+    ]),
+    ("3) Planificación del huerto", [
+        ("Suelo", "suelo_p", None),
+        ("Sol", "sol_p", ("images/patron_sol_aucca.png", "Patron Sol en Aucca")),
+        ("Tiempo", "tiempo_p", None),
+        ("Agua", "agua_p", ("images/temperatura_viento_lluvia_aucca.png",
+                            "Patron temperatura, lluvias y vientos en Aucca")),
+    ]),
+    ("4) Tipos de Huerto", [
+        ("Camellones y surcos", "camellones_p", None),
+        ("Bancal profundo", "bancal_p", None),
+        ("Cero labranza", "cero_lanbranza_p", None),
+    ]),
+]
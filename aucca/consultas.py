@@ -0,0 +1,64 @@
+import os
+
+from aucca.recarga import obtener_servicio
+
+# "pandas" (default): in-memory bitmaps over the catalogue snapshot.
+# "sqlite": embedded SQLite database with FTS5 indexes (aucca/motor_sql.py).
+MOTOR = os.environ.get("AUCCA_MOTOR", "pandas")
+
+
+# ======================
+# QUERY ENGINE (in-memory)
+# Pages talk to the catalogue through this interface: `filtros` maps a column
+# to the selected options, e.g. {"Categoria": ["frutales"]}; `rangos` maps a
+# numeric cultivation field to (lo, hi), e.g. {"cosecha": (0, 60)}.
+# ======================
+class MotorPandas:
+    def __init__(self, catalogo, conocimiento):
+        self.catalogo = catalogo
+        # A snapshot, or a callable giving it on first use (the docx may still
+        # be loading when the sidebar is built).
+        self._conocimiento = conocimiento
+
+    @property
+    def conocimiento(self):
+        if callable(self._conocimiento):
+            self._conocimiento = self._conocimiento()
+        return self._conocimiento
+
+    def total(self):
+        return len(self.catalogo.df)
+
+    def opciones(self, col, filtros):
+        return self.catalogo.opciones(col, self.catalogo.mascara_filtros(filtros))
+
+    def limites(self, prefijo):
+        return self.catalogo.limites(prefijo)
+
+    def _mascara(self, filtros, nombre=None, texto=None, rangos=None):
+        mascara = self.catalogo.mascara_filtros(filtros)
+        if rangos:
+            mascara &= self.catalogo.mascara_rangos(rangos)
+        if nombre:
+            mascara &= self.catalogo.buscar_nombres(nombre)
+        if texto:
+            mascara &= self.catalogo.buscar_texto(texto)
+        return mascara
+
+    def filtrar(self, filtros, nombre=None, texto=None, rangos=None):
+        return self.catalogo.df[self._mascara(filtros, nombre, texto, rangos)]
+
+    def claves(self, filtros, nombre=None, texto=None, rangos=None):
+        """Row keys of the matching plants, without building their rows."""
+        return self.catalogo.claves_vivas[self._mascara(filtros, nombre, texto, rangos)]
+
+    def buscar_secciones(self, consulta, n=3):
+        return self.conocimiento.buscar(consulta, n=n)
+
+
+def obtener_motor():
+    servicio = obtener_servicio()
+    if MOTOR == "sqlite":
+        from aucca.motor_sql import obtener_motor_sql
+        return obtener_motor_sql(servicio)
+    return MotorPandas(servicio.catalogo, lambda: servicio.conocimiento)
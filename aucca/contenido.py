@@ -0,0 +1,173 @@
+"""Questions, answers and synonym phrases of the Inicio assistant, as data files.
+
+    python -m aucca.contenido [--directorio .]
+
+Validates every file of `datos/contenido` against `_esquema.json`, compiles
+them with the docx sections and prints what the assistant will know (or the
+errors, with exit status 1). Run it before publishing an edit.
+
+One JSON file per topic, read in name order:
+
+    {"temas": ["compost"],
+     "preguntas": [{"pregunta": "qué es la lombricultura",
+                    "respuesta": "Markdown; {{Suelo}} inserts that docx section.",
+                    "sinonimos": ["cómo funciona la lombricultura"]}]}
+
+A phrasing may be listed under several questions, or be a question itself: the
+assistant answers it with that question, else the first one listing it. The
+build step prints where each such phrasing goes.
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+
+from jsonschema import Draft202012Validator
+
+from aucca.texto import normalizar_texto
+
+DIR_CONTENIDO = os.path.join("datos", "contenido")
+ESQUEMA = "_esquema.json"
+SECCION = re.compile(r"\{\{([^{}]+)\}\}")
+
+
+def archivos_contenido(directorio=DIR_CONTENIDO):
+    # Files starting with "_" (the schema) are not content.
+    return sorted(p for p in glob.glob(os.path.join(directorio, "*.json"))
+                  if not os.path.basename(p).startswith("_"))
+
+
+def leer_contenido(directorio=DIR_CONTENIDO):
+    """[(file name, data)] of every content file; ValueError listing every schema error."""
+    with open(os.path.join(directorio, ESQUEMA), encoding="utf-8") as f:
+        validador = Draft202012Validator(json.load(f))
+    archivos, errores = [], []
+    for ruta in archivos_contenido(directorio):
+        nombre = os.path.basename(ruta)
+        try:
+            with open(ruta, encoding="utf-8") as f:
+                datos = json.load(f)
+        except ValueError as e:
+            errores.append(f"{nombre}: JSON inválido ({e})")
+            continue
+        for error in sorted(validador.iter_errors(datos), key=lambda e: list(e.path)):
+            donde = "/".join(str(p) for p in error.path) or "(raíz)"
+            errores.append(f"{nombre} {donde}: {error.message}")
+        archivos.append((nombre, datos))
+    if not errores:
+        errores = _duplicadas(archivos)
+    if errores:
+        raise ValueError("Contenido del asistente inválido:\n" + "\n".join(errores))
+    return archivos
+
+
+def _duplicadas(archivos):
+    errores, vistas = [], {}
+    for nombre, datos in archivos:
+        for entrada in datos["preguntas"]:
+            pregunta = entrada["pregunta"]
+            if pregunta in vistas:
+                errores.append(f"{nombre}: la pregunta {pregunta!r} ya está en {vistas[pregunta]}")
+            vistas.setdefault(pregunta, nombre)
+    return errores
+
+
+# ======================
+# CONTENT SNAPSHOT
+# The parsed files, versioned like the catalogue and the docx: the reload
+# service swaps in a new one when a file changes. The compiled base for the
+# current docx snapshot is built on first use and reused by every rerun, page
+# and API request until either side changes.
+# ======================
+class Contenido:
+    def __init__(self, archivos, version=1):
+        self.version = version
+        self.archivos = archivos
+        self.huella = hashlib.sha1(json.dumps(archivos, ensure_ascii=False, sort_keys=True)
+                                   .encode("utf-8")).hexdigest()
+        self._base = (None, None)
+
+    def con_datos(self, archivos):
+        return Contenido(archivos, self.version + 1)
+
+    def base(self, conocimiento):
+        version, base = self._base
+        if version != conocimiento.version:
+            base = BaseAsistente(self, conocimiento)
+            self._base = (conocimiento.version, base)
+        return base
+
+
+class BaseAsistente:
+    """Compiled content: question -> answer, question -> synonyms, topic -> {question: answer}."""
+
+    def __init__(self, contenido, conocimiento):
+        self.version = (contenido.version, conocimiento.version)
+        self.preguntas, self.sinonimos, self.temas = {}, {}, {}
+        self.faltantes = set()  # {{sections}} not in the docx (left empty, as before)
+
+        def seccion(m):
+            titulo = m.group(1).strip()
+            if titulo not in conocimiento.secciones:
+                self.faltantes.add(titulo)
+            return conocimiento.seccion(titulo)
+
+        for _, datos in contenido.archivos:
+            for entrada in datos["preguntas"]:
+                pregunta = entrada["pregunta"]
+                respuesta = SECCION.sub(seccion, entrada["respuesta"])
+                self.preguntas[pregunta] = respuesta
+                if entrada.get("sinonimos"):
+                    self.sinonimos[pregunta] = list(entrada["sinonimos"])
+                for tema in entrada.get("temas", datos["temas"]):
+                    self.temas.setdefault(tema, {})[pregunta] = respuesta
+
+
+def compartidas(base):
+    """Phrasings listed more than once -> (questions listing them, question they go to)."""
+    listas = {}
+    for pregunta, frases in base.sinonimos.items():
+        for frase in frases:
+            listas.setdefault(normalizar_texto(frase), (frase, []))[1].append(pregunta)
+    preguntas = {normalizar_texto(p): p for p in base.preguntas}
+    return {frase: (en, preguntas.get(norm, en[0]))
+            for norm, (frase, en) in listas.items() if len(en) > 1 or norm in preguntas}
+
+
+def main(argv=None):
+    from aucca.arranque import cargar_conocimiento
+
+    parser = argparse.ArgumentParser(description="Valida y compila el contenido del asistente de AUCCA.")
+    parser.add_argument("--directorio", default=".")
+    args = parser.parse_args(argv)
+    try:
+        archivos = leer_contenido(os.path.join(args.directorio, DIR_CONTENIDO))
+    except ValueError as e:
+        print(e)
+        return 1
+    conocimiento = cargar_conocimiento(args.directorio)
+    t = time.perf_counter()
+    base = Contenido(archivos).base(conocimiento)
+    ms = (time.perf_counter() - t) * 1000
+
+    for nombre, datos in archivos:
+        entradas = datos["preguntas"]
+        print(f"{nombre:<24} {len(entradas):>3} preguntas, "
+              f"{sum(len(e.get('sinonimos', [])) for e in entradas):>3} sinónimos, temas {', '.join(datos['temas'])}")
+    print(f"\n{len(base.preguntas)} preguntas, {sum(map(len, base.sinonimos.values()))} sinónimos; "
+          + ", ".join(f"{t} {len(p)}" for t, p in base.temas.items()) + f"; compilado en {ms:.1f} ms")
+    for frase, (en, destino) in compartidas(base).items():
+        print(f"'{frase}' (en {', '.join(repr(p) for p in en)}) -> '{destino}'")
+    if base.faltantes:
+        print("Secciones que no están en el docx: " + ", ".join(sorted(base.faltantes)))
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+
+from aucca.catalogo import MESES
+
+DIAS_POR_MES = 365.25 / 12
+
+
+# ======================
+# HARVEST CALENDAR PROJECTION
+# One NumPy pass over the whole catalogue builds
+#   proyeccion[planta, mes_siembra, mes_cosecha]
+# from the Enero…Diciembre sowing columns and the parsed "Tiempo para cosechar"
+# (cosecha_min/cosecha_max, days). Crops needing a year or more (trees,
+# perennials) are kept apart in `largo_plazo` instead of wrapping around.
+# ======================
+class CalendarioCosecha:
+    def __init__(self, df, numericos):
+        self.nombres = df["Nombre total"].to_numpy()
+        self.siembra = np.stack(
+            [df[m].astype(str).str.strip().ne("").to_numpy() if m in df.columns
+             else np.zeros(len(df), dtype=bool) for m in MESES], axis=1)
+        dias_min = numericos["cosecha_min"].to_numpy(dtype="float64")
+        dias_max = numericos["cosecha_max"].to_numpy(dtype="float64")
+        con_dato = ~np.isnan(dias_min)
+        off_min = np.where(con_dato, np.rint(np.nan_to_num(dias_min) / DIAS_POR_MES), 0).astype(np.int16)
+        off_max = np.where(con_dato, np.rint(np.nan_to_num(dias_max) / DIAS_POR_MES), 0).astype(np.int16)
+        self.meses_hasta_cosecha = np.stack([off_min, off_max], axis=1)
+        self.largo_plazo = con_dato & (off_min >= 12)
+        dentro_del_anio = con_dato & ~self.largo_plazo
+
+        # distancia[s, c] = months from sowing month s to harvest month c (0..11)
+        meses = np.arange(12)
+        distancia = (meses[None, :] - meses[:, None]) % 12
+        ancho = (off_max - off_min)[:, None, None]
+        en_ventana = (((distancia[None] - off_min[:, None, None]) % 12) <= ancho) | (ancho >= 11)
+        self.proyeccion = (self.siembra[:, :, None] & en_ventana & dentro_del_anio[:, None, None])
+        # Plant x month: harvestable in month c for some allowed sowing month.
+        self.matriz = self.proyeccion.any(axis=1)
+
+    def cosechables(self, mes_cosecha, mes_siembra=None):
+        c = MESES.index(mes_cosecha)
+        if mes_siembra is None:
+            return self.matriz[:, c]
+        return self.proyeccion[:, MESES.index(mes_siembra), c]
+
+    def posiciones(self, nombres):
+        indice = {n: i for i, n in enumerate(self.nombres)}
+        return np.array([indice[n] for n in nombres if n in indice], dtype=np.intp)
+
+    def tabla(self, nombres, mes_siembra=None, marca="🌾"):
+        pos = self.posiciones(nombres)
+        if mes_siembra is None:
+            matriz = self.matriz[pos]
+        else:
+            matriz = self.proyeccion[pos, MESES.index(mes_siembra)]
+        tabla = pd.DataFrame(np.where(matriz, marca, ""), columns=MESES, index=self.nombres[pos])
+        return tabla[matriz.any(axis=1)]
+
+    def perennes(self, nombres):
+        pos = self.posiciones(nombres)
+        pos = pos[self.largo_plazo[pos]]
+        anios = self.meses_hasta_cosecha[pos, 0] / 12
+        return pd.DataFrame({"Planta": self.nombres[pos], "Primera cosecha (años)": np.round(anios, 1)})
+
+
+def calendario_cosecha(catalogo):
+    return catalogo.derivado("calendario", lambda c: CalendarioCosecha(c.df, c.numericos_vivos))
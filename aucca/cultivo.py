@@ -0,0 +1,116 @@
+import numpy as np
+import pandas as pd
+
+# Free-text cultivation fields -> short prefix of their numeric columns and the
+# unit they are normalized to.
+CAMPOS_NUMERICOS = {
+    "Profundidad de Siembra": ("profundidad", "cm"),
+    "Tiempo de germinar": ("germinacion", "días"),
+    "Distancia entre (Plantas)": ("distancia_plantas", "cm"),
+    "Distancia entre (hileras)": ("distancia_hileras", "cm"),
+    "Tiempo para cosechar": ("cosecha", "días"),
+}
+
+ETIQUETAS_RANGO = {
+    "cosecha": "Tiempo para cosechar (días)",
+    "germinacion": "Tiempo de germinar (días)",
+    "distancia_plantas": "Distancia entre plantas (cm)",
+    "distancia_hileras": "Distancia entre hileras (cm)",
+    "profundidad": "Profundidad de siembra (cm)",
+}
+
+FACTORES = {
+    "cm": ("cm", 1.0), "m": ("cm", 100.0), "mt": ("cm", 100.0), "mts": ("cm", 100.0),
+    "dia": ("días", 1.0), "dias": ("días", 1.0), "hora": ("días", 1 / 24), "horas": ("días", 1 / 24),
+    "semana": ("días", 7.0), "semanas": ("días", 7.0), "mes": ("días", 30.0), "meses": ("días", 30.0),
+    "ano": ("días", 365.0), "anos": ("días", 365.0),
+}
+
+# "2 a 3 cm", "0,5 - 1 cm", "50 a 70 días", "24 horas", "8 a 10 meses", "1 mt"
+PATRON = (r"(?P<a>\d+(?:[.,]\d+)?)\s*(?:(?:a|-|–)\s*(?P<b>\d+(?:[.,]\d+)?))?\s*"
+          r"(?P<u>cm|mts?|m|d[ií]as?|horas?|semanas?|mes(?:es)?|a[ñn]os?)?\b")
+
+# Confidence flag of a parsed value.
+ALTA, MEDIA, SIN_DATO = "alta", "media", "sin dato"
+
+
+# ======================
+# NUMERIC PARSING (vectorized, one regex pass per column)
+# ======================
+def _numero(col):
+    return pd.to_numeric(col.str.replace(",", ".", regex=False), errors="coerce")
+
+
+def parsear_campo(serie, unidad_base):
+    """Parse a free-text column into min/max in `unidad_base`, plus unit and confidence."""
+    texto = serie.astype(str).str.strip().str.lower()
+    partes = texto.str.extract(PATRON)
+    a, b = _numero(partes["a"]), _numero(partes["b"])
+    b = b.fillna(a)
+    unidad = (partes["u"].fillna("")
+              .str.replace("í", "i", regex=False).str.replace("ñ", "n", regex=False))
+    factor = unidad.map(lambda u: FACTORES.get(u, (None, np.nan))[1])
+    destino = unidad.map(lambda u: FACTORES.get(u, (None, None))[0])
+    # A number without a unit is read in the field's own unit, with less confidence;
+    # a unit of the wrong kind (e.g. "20 cm" in a time field) is discarded.
+    sin_unidad = unidad.eq("") & a.notna()
+    factor = factor.where(~sin_unidad, 1.0)
+    valido = a.notna() & (sin_unidad | destino.eq(unidad_base))
+    minimo = (np.minimum(a, b) * factor).where(valido)
+    maximo = (np.maximum(a, b) * factor).where(valido)
+    confianza = np.select([valido & ~sin_unidad, valido], [ALTA, MEDIA], SIN_DATO)
+    return pd.DataFrame({
+        "min": minimo.astype("float64"),
+        "max": maximo.astype("float64"),
+        "unidad": np.where(valido, unidad_base, ""),
+        "confianza": confianza,
+    }, index=serie.index)
+
+
+def parsear_cultivo(df):
+    columnas = {}
+    for campo, (prefijo, unidad_base) in CAMPOS_NUMERICOS.items():
+        if campo not in df.columns:
+            continue
+        partes = parsear_campo(df[campo], unidad_base)
+        for sufijo in partes.columns:
+            columnas[f"{prefijo}_{sufijo}"] = partes[sufijo]
+    return pd.DataFrame(columnas, index=df.index)
+
+
+# ======================
+# SORTED INDEXES FOR RANGE FILTERS
+# A plant matches lo..hi when its whole interval fits: min >= lo and max <= hi.
+# Each bound is a binary search over the pre-sorted column.
+# ======================
+class IndiceRangos:
+    def __init__(self, numericos):
+        self.n = len(numericos)
+        self.orden = {}
+        for prefijo, _ in CAMPOS_NUMERICOS.values():
+            for lado in ("min", "max"):
+                col = f"{prefijo}_{lado}"
+                if col not in numericos.columns:
+                    continue
+                valores = numericos[col].to_numpy(dtype="float64")
+                orden = np.argsort(valores, kind="stable")  # NaN sort last
+                self.orden[col] = (orden, valores[orden])
+
+    def limites(self, prefijo):
+        _, mins = self.orden[f"{prefijo}_min"]
+        _, maxs = self.orden[f"{prefijo}_max"]
+        if np.isnan(mins[0]):
+            return None
+        return float(mins[0]), float(maxs[~np.isnan(maxs)][-1])
+
+    def mascara(self, prefijo, lo, hi):
+        mascara = np.zeros(self.n, dtype=bool)
+        orden_min, mins = self.orden[f"{prefijo}_min"]
+        orden_max, maxs = self.orden[f"{prefijo}_max"]
+        desde = np.searchsorted(mins, lo, side="left")
+        hasta_nan = np.searchsorted(mins, np.inf, side="right")
+        mascara[orden_min[desde:hasta_nan]] = True
+        hasta = np.searchsorted(maxs, hi, side="right")
+        segunda = np.zeros(self.n, dtype=bool)
+        segunda[orden_max[:hasta]] = True
+        return mascara & segunda
@@ -0,0 +1,186 @@
+"""Availability history: the catalogue column as the first snapshot, plus nursery updates.
+
+    python -m aucca.disponibilidad registrar actualizacion.csv [--fecha 2025-04-01]
+    python -m aucca.disponibilidad cambios [--desde 2025-03-01] [--hasta 2025-04-01]
+
+An update file is a `;`-separated CSV with the columns "Nombre total" (or
+"Nombre vulgar" + "Nombre Científico") and "Disponible". Only the plants whose
+state changed are appended, as one small Parquet file per date.
+"""
+import argparse
+import glob
+import os
+
+import numpy as np
+import pandas as pd
+
+from aucca.catalogo import Catalogo, claves_filas, leer_plantas, nombre_total
+
+COLUMNA_DISPONIBLE = "Disponible Nov 2024"
+FECHA_BASE = np.datetime64("2024-11-01")  # when the catalogue column was taken
+DIR_DISPONIBILIDAD = os.path.join("datos", "disponibilidad")
+SIN_DATO = -1
+
+
+def diferencias(claves_a, codigos_a, claves_b, codigos_b):
+    """Sorted-key merge of two snapshots (keys sorted, unique).
+
+    Returns (claves, antes, despues) for the keys whose code differs; a key
+    missing on one side has SIN_DATO there.
+    """
+    todas = np.union1d(claves_a, claves_b)
+    antes = np.full(len(todas), SIN_DATO, dtype=np.int8)
+    despues = np.full(len(todas), SIN_DATO, dtype=np.int8)
+    antes[np.searchsorted(todas, claves_a)] = codigos_a
+    despues[np.searchsorted(todas, claves_b)] = codigos_b
+    cambio = antes != despues
+    return todas[cambio], antes[cambio], despues[cambio]
+
+
+# ======================
+# COLUMNAR HISTORY
+# `tabla[planta, fecha]` is the state code as of each snapshot date (updates
+# only carry changes, so columns are forward-filled once at load time). An
+# "as of" lookup is one binary search over `fechas` plus a column read.
+# ======================
+class Disponibilidad:
+    def __init__(self, registros):
+        # registros: [(fecha, claves, estados)] in any order; later dates override.
+        registros = sorted(registros, key=lambda r: r[0])
+        self.estados = sorted({e for _, _, est in registros for e in est if e})
+        codigo = {e: i for i, e in enumerate(self.estados)}
+        self.claves = np.array(sorted({k for _, cl, _ in registros for k in cl}), dtype=object)
+        self.fechas = np.array([f for f, _, _ in registros], dtype="datetime64[D]")
+
+        self.tabla = np.full((len(self.claves), len(registros)), SIN_DATO, dtype=np.int8)
+        actual = np.full(len(self.claves), SIN_DATO, dtype=np.int8)
+        for j, (_, claves, estados) in enumerate(registros):
+            claves = np.asarray(claves, dtype=object)
+            codigos = np.array([codigo.get(e, SIN_DATO) for e in estados], dtype=np.int8)
+            actual[np.searchsorted(self.claves, claves)] = codigos
+            self.tabla[:, j] = actual
+
+    def indice_fecha(self, fecha=None):
+        if fecha is None:
+            return len(self.fechas) - 1
+        return int(np.searchsorted(self.fechas, np.datetime64(fecha, "D"), side="right")) - 1
+
+    def al(self, fecha=None):
+        """Snapshot as of `fecha` (latest when None): sorted keys and their codes."""
+        j = self.indice_fecha(fecha)
+        if j < 0:
+            return self.claves[:0], np.empty(0, dtype=np.int8)
+        columna = self.tabla[:, j]
+        conocidos = columna != SIN_DATO
+        return self.claves[conocidos], columna[conocidos]
+
+    def opciones(self, fecha=None):
+        _, codigos = self.al(fecha)
+        return [self.estados[c] for c in np.unique(codigos)]
+
+    def claves_con(self, estados, fecha=None):
+        claves, codigos = self.al(fecha)
+        buscados = [self.estados.index(e) for e in estados if e in self.estados]
+        return claves[np.isin(codigos, buscados)]
+
+    def cambios(self, desde, hasta=None):
+        a = self.al(desde)
+        b = self.al(hasta)
+        claves, antes, despues = diferencias(a[0], a[1], b[0], b[1])
+        nombre = lambda c: "" if c == SIN_DATO else self.estados[c]
+        return pd.DataFrame({"planta": claves,
+                             "antes": [nombre(c) for c in antes],
+                             "despues": [nombre(c) for c in despues]})
+
+
+# ======================
+# STORAGE (append-only: one Parquet file of changes per update date)
+# ======================
+def _ruta(fecha, directorio):
+    return os.path.join(directorio, f"{np.datetime64(fecha, 'D')}.parquet")
+
+
+def archivos(directorio=DIR_DISPONIBILIDAD):
+    return sorted(glob.glob(os.path.join(directorio, "*.parquet")))
+
+
+def cargar_disponibilidad(catalogo, directorio=DIR_DISPONIBILIDAD):
+    base = catalogo.df[COLUMNA_DISPONIBLE].astype(str).str.strip() if COLUMNA_DISPONIBLE in catalogo.df else None
+    registros = []
+    if base is not None:
+        registros.append((FECHA_BASE, list(catalogo.claves_vivas), list(base)))
+    for ruta in archivos(directorio):
+        delta = pd.read_parquet(ruta)
+        fecha = np.datetime64(os.path.basename(ruta)[:-len(".parquet")], "D")
+        registros.append((fecha, list(delta["planta"]), list(delta["estado"])))
+    return Disponibilidad(registros)
+
+
+def disponibilidad(catalogo, directorio=DIR_DISPONIBILIDAD):
+    # Rebuilt when the catalogue or any update file changes.
+    firma = tuple((r, os.path.getmtime(r)) for r in archivos(directorio))
+    return catalogo.derivado(("disponibilidad", directorio),
+                             lambda c: cargar_disponibilidad(c, directorio), firma=firma)
+
+
+def leer_actualizacion(path):
+    df = pd.read_csv(path, sep=";", encoding="latin1", dtype=str).fillna("")
+    df.columns = [c.strip() for c in df.columns]
+    if "Nombre total" not in df.columns:
+        df["Nombre total"] = nombre_total(df.apply(lambda s: s.str.strip()))
+    estado = df["Disponible"].str.strip()
+    return claves_filas(df), estado.to_numpy(dtype=object)
+
+
+def registrar(historial, fecha, claves, estados, directorio=DIR_DISPONIBILIDAD):
+    """Append the changes of an update; returns how many plants changed."""
+    orden = np.argsort(claves, kind="stable")
+    claves = np.asarray(claves, dtype=object)[orden]
+    estados = np.asarray(estados, dtype=object)[orden]
+    # Codes against the current vocabulary plus any new state names.
+    vocabulario = sorted(set(historial.estados) | set(estados))
+    codigo = {e: i for i, e in enumerate(vocabulario)}
+    previas, codigos_previos = historial.al(fecha)
+    codigos_previos = np.array([codigo[historial.estados[c]] for c in codigos_previos], dtype=np.int8)
+    nuevos = np.array([codigo[e] for e in estados], dtype=np.int8)
+    cambiadas, _, despues = diferencias(previas, codigos_previos, claves, nuevos)
+    presentes = despues != SIN_DATO  # plants missing from the update keep their state
+    delta = pd.DataFrame({"planta": cambiadas[presentes].astype(str),
+                          "estado": [vocabulario[c] for c in despues[presentes]]})
+    if delta.empty:
+        return 0
+    ruta = _ruta(fecha, directorio)
+    if os.path.exists(ruta):
+        # Second update on the same day: fold into that day's file only.
+        delta = pd.concat([pd.read_parquet(ruta), delta]).drop_duplicates("planta", keep="last")
+    os.makedirs(directorio, exist_ok=True)
+    delta.to_parquet(ruta, index=False)
+    return len(delta)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Historial de disponibilidad de plantas.")
+    sub = parser.add_subparsers(dest="orden", required=True)
+    p_reg = sub.add_parser("registrar", help="agrega una actualización del vivero")
+    p_reg.add_argument("archivo")
+    p_reg.add_argument("--fecha", default=str(np.datetime64("today", "D")))
+    p_cam = sub.add_parser("cambios", help="muestra qué cambió entre dos fechas")
+    p_cam.add_argument("--desde", default=None)
+    p_cam.add_argument("--hasta", default=None)
+    args = parser.parse_args(argv)
+
+    historial = cargar_disponibilidad(Catalogo(leer_plantas()))
+    if args.orden == "registrar":
+        claves, estados = leer_actualizacion(args.archivo)
+        n = registrar(historial, args.fecha, claves, estados)
+        print(f"{n} plantas cambiaron de estado el {args.fecha}")
+    else:
+        desde = args.desde
+        if desde is None:
+            j = historial.indice_fecha(args.hasta)
+            desde = historial.fechas[max(j - 1, 0)]
+        print(historial.cambios(desde, args.hasta).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
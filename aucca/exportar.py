@@ -0,0 +1,198 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import io
+import json
+import os
+import re
+import textwrap
+import threading
+import unicodedata
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+import streamlit as st
+
+from aucca.catalogo import MESES
+from aucca.cosecha import calendario_cosecha
+from aucca.fichas import OPCIONALES, SECCIONES
+
+FORMATOS = {
+    "PDF": ("application/pdf", "pdf"),
+    "CSV": ("text/csv", "csv"),
+    "XLSX": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "xlsx"),
+}
+
+TRABAJADORES = 2
+MAX_ARCHIVOS = 16  # finished exports kept in memory
+
+# PDF page: A4 at 100 dpi.
+PAGINA = (827, 1169)
+# Pages rendered and appended to the PDF at a time: memory stays flat with the catalogue size.
+PAGINAS_POR_BLOQUE = 16
+MARGEN = 50
+COLOR_SIEMBRA = (46, 139, 87)
+COLOR_COSECHA = (255, 165, 0)
+# Tried in order; Pillow's bundled font is the fallback (no accents, so text is folded to ASCII).
+FUENTES = ("DejaVuSans.ttf", "LiberationSans-Regular.ttf", "Arial.ttf")
+
+
+def firma_filtros(filtros, **consulta):
+    """Stable signature of the current sidebar selection."""
+    datos = {"filtros": {k: sorted(v) if isinstance(v, (list, set, tuple)) else v
+                         for k, v in filtros.items()},
+             "consulta": consulta}
+    return hashlib.sha1(json.dumps(datos, sort_keys=True, ensure_ascii=False, default=str)
+                        .encode("utf-8")).hexdigest()[:16]
+
+
+# ======================
+# FILE BUILDERS (run in the worker pool)
+# ======================
+def exportar_csv(df):
+    return df.to_csv(index=False, sep=";").encode("utf-8-sig")
+
+
+def exportar_xlsx(df):
+    salida = io.BytesIO()
+    df.to_excel(salida, index=False, sheet_name="Plantas", engine="openpyxl")
+    return salida.getvalue()
+
+
+def _sin_emoji(txt):
+    return re.sub(r"[^\w\s.,;:()/+\-–%°'\"¿?¡!]", "", txt).strip()
+
+
+def _fuentes():
+    for nombre in FUENTES:
+        try:
+            return [ImageFont.truetype(nombre, size) for size in (26, 19, 13)], False
+        except OSError:
+            continue
+    return [ImageFont.load_default(size=size) for size in (26, 19, 13)], True
+
+
+def _ascii(txt):
+    return unicodedata.normalize("NFKD", txt).encode("ascii", "ignore").decode("ascii")
+
+
+def _hoja(planta, fila_calendario, calendario, fuentes, plegar):
+    pagina = Image.new("RGB", PAGINA, "white")
+    dibujo = ImageDraw.Draw(pagina)
+    titulo, subtitulo, normal = fuentes
+
+    def escribir(xy, txt, font, fill="black"):
+        dibujo.text(xy, _ascii(txt) if plegar else txt, fill=fill, font=font)
+
+    ancho_texto = 95
+    y = MARGEN
+    for linea in textwrap.wrap(str(planta.get("Nombre total", "")).replace("\n", " "), 50):
+        escribir((MARGEN, y), linea, titulo)
+        y += 32
+    y += 8
+
+    for seccion, campos in SECCIONES:
+        escribir((MARGEN, y), _sin_emoji(seccion), subtitulo, COLOR_SIEMBRA)
+        y += 26
+        for campo in campos:
+            valor = str(planta.get(campo, "") or "").replace("\n", " ").strip()
+            if campo in OPCIONALES and not valor:
+                continue
+            valor = valor or "-"
+            for linea in textwrap.wrap(f"{campo}: {valor}", ancho_texto)[:4]:
+                escribir((MARGEN, y), linea, normal)
+                y += 17
+        y += 10
+
+    # Sowing / harvest calendar strip
+    escribir((MARGEN, y), "Calendario", subtitulo, COLOR_SIEMBRA)
+    y += 26
+    celda = (PAGINA[0] - 2 * MARGEN) // 12
+    if fila_calendario is None:
+        siembra = cosecha = np.zeros(12, dtype=bool)
+    else:
+        siembra, cosecha = calendario.siembra[fila_calendario], calendario.matriz[fila_calendario]
+    for m, mes in enumerate(MESES):
+        x = MARGEN + m * celda
+        escribir((x + 4, y), mes[:3], normal)
+        for fila, (activo, color) in enumerate([(siembra[m], COLOR_SIEMBRA), (cosecha[m], COLOR_COSECHA)]):
+            caja = (x + 2, y + 20 + fila * 18, x + celda - 2, y + 34 + fila * 18)
+            dibujo.rectangle(caja, fill=color if activo else (235, 235, 235))
+    y += 62
+    dibujo.rectangle((MARGEN, y, MARGEN + 12, y + 12), fill=COLOR_SIEMBRA)
+    escribir((MARGEN + 18, y - 2), "Siembra", normal)
+    dibujo.rectangle((MARGEN + 110, y, MARGEN + 122, y + 12), fill=COLOR_COSECHA)
+    escribir((MARGEN + 128, y - 2), "Cosecha", normal)
+    y += 30
+
+    # Zone map, scaled into what is left of the page
+    ruta = str(planta.get("ruta mapa", "") or "").strip()
+    if ruta and os.path.exists(ruta) and y < PAGINA[1] - MARGEN - 100:
+        with Image.open(ruta) as mapa:
+            mapa = mapa.convert("RGB")
+            mapa.thumbnail((PAGINA[0] - 2 * MARGEN, PAGINA[1] - MARGEN - y))
+            pagina.paste(mapa, (MARGEN, y))
+    return pagina
+
+
+def exportar_pdf(df, catalogo):
+    calendario = calendario_cosecha(catalogo)
+    fuentes, plegar = _fuentes()
+    # Calendar row of every plant, resolved once by row key (names repeat).
+    indice = {clave: i for i, clave in enumerate(catalogo.claves_vivas)}
+    filas = [(fila, indice.get(catalogo.clave_de(fila))) for _, fila in df.iterrows()]
+    salida = io.BytesIO()
+    # Pillow holds every page of one save() call, so pages go out in blocks
+    # appended to the same PDF (an incremental update per block).
+    for inicio in range(0, max(len(filas), 1), PAGINAS_POR_BLOQUE):
+        hojas = [_hoja(fila, pos, calendario, fuentes, plegar)
+                 for fila, pos in filas[inicio:inicio + PAGINAS_POR_BLOQUE]]
+        if not hojas:
+            hojas = [Image.new("RGB", PAGINA, "white")]
+        hojas[0].save(salida, format="PDF", save_all=True, append=inicio > 0,
+                      append_images=hojas[1:], resolution=100)
+        for hoja in hojas:
+            hoja.close()  # frees the pixels now rather than at the next cycle collection
+    return salida.getvalue()
+
+
+def construir(formato, df, catalogo):
+    if formato == "CSV":
+        return exportar_csv(df)
+    if formato == "XLSX":
+        return exportar_xlsx(df)
+    return exportar_pdf(df, catalogo)
+
+
+# ======================
+# BACKGROUND EXPORTER
+# One pool per server. Jobs are keyed by (filter signature, catalogue
+# fingerprint, format): every facilitator asking for the same selection shares
+# the same job and, once done, the same bytes.
+# ======================
+class Exportador:
+    def __init__(self, trabajadores=TRABAJADORES, max_archivos=MAX_ARCHIVOS):
+        self.pool = ThreadPoolExecutor(max_workers=trabajadores, thread_name_prefix="aucca-export")
+        self.trabajos = OrderedDict()
+        self.max_archivos = max_archivos
+        self._lock = threading.Lock()
+
+    def solicitar(self, formato, firma, catalogo, df):
+        llave = (firma, catalogo.huella, formato)
+        with self._lock:
+            futuro = self.trabajos.get(llave)
+            if futuro is None or (futuro.done() and futuro.exception() is not None):
+                futuro = self.pool.submit(construir, formato, df.copy(), catalogo)
+                self.trabajos[llave] = futuro
+            self.trabajos.move_to_end(llave)
+            while len(self.trabajos) > self.max_archivos:
+                viejo = next(iter(self.trabajos))
+                if not self.trabajos[viejo].done():
+                    break
+                del self.trabajos[viejo]
+        return futuro
+
+
+@st.cache_resource
+def obtener_exportador():
+    return Exportador()
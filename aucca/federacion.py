@@ -0,0 +1,260 @@
+"""Catalogue federation: Aucca's plant list plus partner inventories and reference floras.
+
+    python -m aucca.federacion [--fuentes datos/fuentes]
+    python -m aucca.federacion --benchmark 100000
+
+Every file in `datos/fuentes/` (.csv, .xlsx or .parquet) is one source, named
+after the file. Columns are aligned to the Aucca schema by name (see ALIAS),
+rows are joined on the normalized scientific name, and empty fields are filled
+from the following sources in order. The merged rows carry "Fuentes" (sources
+listing the plant) and "Procedencia" (fields taken from another source).
+"""
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import glob
+import os
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from aucca.catalogo import Catalogo, leer_plantas, limpiar_plantas
+from aucca.ingesta import NUMERICAS, leer_xlsx
+from aucca.taxones import nombre_cientifico
+from aucca.texto import normalizar_texto
+
+DIR_FUENTES = os.path.join("datos", "fuentes")
+EXTENSIONES = (".csv", ".xlsx", ".parquet")
+FUENTE_PRINCIPAL = "aucca"
+COLUMNA_FUENTES = "Fuentes"
+COLUMNA_PROCEDENCIA = "Procedencia"
+SIN_FUENTE = -1
+
+# Normalized header -> Aucca column, for sources that name things differently.
+ALIAS = {
+    "nombre comun": "Nombre vulgar",
+    "common name": "Nombre vulgar",
+    "nombre": "Nombre vulgar",
+    "nombre cientifico": "Nombre Científico",
+    "scientific name": "Nombre Científico",
+    "especie": "Nombre Científico",
+    "species": "Nombre Científico",
+    "family": "Familia",
+    "categoria": "Categoria",
+    "category": "Categoria",
+    "uses": "Propiedades",
+    "usos": "Propiedades",
+    "latitud": "lat",
+    "latitude": "lat",
+    "longitud": "lon",
+    "longitude": "lon",
+}
+
+
+def nombre_fuente(path):
+    return "_".join(normalizar_texto(os.path.splitext(os.path.basename(path))[0]).split()) or "fuente"
+
+
+def archivos_fuentes(directorio=DIR_FUENTES):
+    return sorted(p for p in glob.glob(os.path.join(directorio, "*")) if p.lower().endswith(EXTENSIONES))
+
+
+def leer_fuente(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".parquet":
+        return pd.read_parquet(path)
+    if ext == ".xlsx":
+        return leer_xlsx(path)
+    # Partner CSVs come from all sorts of spreadsheets: sniff separator and encoding.
+    try:
+        return pd.read_csv(path, sep=None, engine="python", dtype=str, encoding="utf-8-sig")
+    except UnicodeDecodeError:
+        return pd.read_csv(path, sep=None, engine="python", dtype=str, encoding="latin1")
+
+
+def alinear(df, columnas):
+    """Rename/drop/add columns so `df` has exactly `columnas` (empty cells as "")."""
+    destino = {normalizar_texto(c): c for c in columnas}
+    renombres = {}
+    for col in df.columns:
+        clave = " ".join(normalizar_texto(col).split())
+        nuevo = destino.get(clave) or ALIAS.get(clave)
+        if nuevo in columnas and nuevo not in renombres.values():
+            renombres[col] = nuevo
+    df = df[list(renombres)].rename(columns=renombres)
+    df = df.reindex(columns=columnas)
+    for col in df.columns:
+        if col in NUMERICAS:
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+        else:
+            df[col] = df[col].astype("string").str.strip().fillna("").astype(object)
+    return df.reset_index(drop=True)
+
+
+def clave_union(df):
+    # "Genus epithet" of the first listed name; variety suffixes and synonyms don't split plants.
+    # Names repeat a lot, so each distinct one is normalized once.
+    codigos, distintos = pd.factorize(df["Nombre Científico"].astype(str))
+    claves = np.array([" ".join(nombre_cientifico(v).split()[:2]) for v in distintos], dtype=object)
+    return claves[codigos]
+
+
+def _vacios(df):
+    return np.column_stack([df[c].isna().to_numpy() | (df[c].to_numpy(dtype=object) == "")
+                            for c in df.columns])
+
+
+# ======================
+# HASH JOIN
+# Sources are folded in order. The join key of the merged rows is kept in a
+# pandas Index (a hash table), so each source costs one `get_indexer` lookup
+# plus column-wise fills, never a row-by-row comparison.
+# `procedencia[row, column]` is the index of the source each value came from.
+# ======================
+class Federacion:
+    def __init__(self, fuentes):
+        # fuentes: [(nombre, df aligned to the first one's columns)]
+        self.nombres = [n for n, _ in fuentes]
+        primera = fuentes[0][1]
+        self.columnas = [c for c in primera.columns if c not in (COLUMNA_FUENTES, COLUMNA_PROCEDENCIA)]
+        datos = primera[self.columnas].reset_index(drop=True)
+        claves = clave_union(datos)
+        procedencia = np.where(_vacios(datos), SIN_FUENTE, 0).astype(np.int8)
+        presencia = [np.ones(len(datos), dtype=bool)]
+        valores = {c: datos[c].to_numpy(dtype=object, copy=True) for c in self.columnas}
+
+        for s, (_, df) in enumerate(fuentes[1:], start=1):
+            df = df[self.columnas].reset_index(drop=True)
+            claves_df = clave_union(df)
+            # Each key joins once; the first row of a source wins for that key.
+            indice = pd.Index(claves_df)
+            primeras = ~indice.duplicated()
+            unicas = pd.Index(claves_df[primeras])
+            filas_fuente = np.flatnonzero(primeras)
+            pos = unicas.get_indexer(claves)
+            pos[claves == ""] = -1
+            encontrada = pos >= 0
+            origen = filas_fuente[pos[encontrada]]
+            vacios_df = _vacios(df)
+            for j, col in enumerate(self.columnas):
+                nuevos = df[col].to_numpy(dtype=object)
+                llenar = np.zeros(len(claves), dtype=bool)
+                llenar[encontrada] = (procedencia[encontrada, j] == SIN_FUENTE) & ~vacios_df[origen, j]
+                destino = np.flatnonzero(llenar)
+                valores[col][destino] = nuevos[filas_fuente[pos[destino]]]
+                procedencia[destino, j] = s
+
+            # Plants this source adds: key unknown so far (or no scientific name at all).
+            nuevas = ~pd.Index(claves_df).isin(claves[claves != ""]) | (claves_df == "")
+            k = int(nuevas.sum())
+            for col in self.columnas:
+                valores[col] = np.concatenate([valores[col], df.loc[nuevas, col].to_numpy(dtype=object)])
+            procedencia = np.vstack([procedencia, np.where(vacios_df[nuevas], SIN_FUENTE, s).astype(np.int8)])
+            claves = np.concatenate([claves, claves_df[nuevas]])
+            presencia = [np.concatenate([p, np.zeros(k, dtype=bool)]) for p in presencia]
+            presencia.append(np.concatenate([encontrada, np.ones(k, dtype=bool)]))
+
+        self.claves = claves
+        self.procedencia = procedencia
+        self.presencia = np.column_stack(presencia)
+        self.datos = pd.DataFrame(valores, columns=self.columnas)
+
+    def fuentes_fila(self):
+        nombres = np.array(self.nombres, dtype=object)
+        return [", ".join(nombres[fila]) for fila in self.presencia]
+
+    def procedencia_fila(self):
+        # Only fields that came from a source other than the row's first one.
+        nombres = self.nombres
+        primera = self.presencia.argmax(axis=1)
+        otras = (self.procedencia != SIN_FUENTE) & (self.procedencia != primera[:, None])
+        salida = np.full(len(self.claves), "", dtype=object)
+        for i in np.flatnonzero(otras.any(axis=1)):
+            salida[i] = "; ".join(f"{self.columnas[j]}: {nombres[self.procedencia[i, j]]}"
+                                  for j in np.flatnonzero(otras[i]))
+        return salida
+
+    def df(self):
+        df = self.datos.copy()
+        df[COLUMNA_FUENTES] = self.fuentes_fila()
+        df[COLUMNA_PROCEDENCIA] = self.procedencia_fila()
+        return df
+
+
+def cargar_fuentes(paths, columnas, trabajadores=4):
+    """Read and align the sources in parallel (file reads and parsing overlap)."""
+    def cargar(path):
+        return nombre_fuente(path), alinear(leer_fuente(path), columnas)
+
+    if not paths:
+        return []
+    with ThreadPoolExecutor(max_workers=min(trabajadores, len(paths)),
+                            thread_name_prefix="aucca-fuentes") as pool:
+        return list(pool.map(cargar, paths))
+
+
+def leer_catalogo(ruta_plantas=None, directorio=DIR_FUENTES):
+    """The app's plant table: Aucca's list, federated with any partner sources."""
+    principal = leer_plantas(ruta_plantas)
+    paths = archivos_fuentes(directorio)
+    if not paths:
+        return principal
+    columnas = [c for c in principal.columns if c != "Nombre total"]
+    fuentes = [(FUENTE_PRINCIPAL, principal[columnas])] + cargar_fuentes(paths, columnas)
+    return limpiar_plantas(Federacion(fuentes).df())
+
+
+# ======================
+# BENCHMARK
+# Synthetic sources with a known overlap, merged the way the app does it.
+# ======================
+def fuentes_sinteticas(catalogo, total, n_fuentes=3, semilla=0):
+    rng = np.random.default_rng(semilla)
+    base = catalogo.df.drop(columns=["Nombre total"])
+    por_fuente = total // n_fuentes
+    especies = np.array([f"Genus{g} species{e}" for g in range(por_fuente // 10 + 1) for e in range(10)])
+    fuentes = []
+    for s in range(n_fuentes):
+        # Half of each source overlaps the previous ones, half is new.
+        elegidas = np.concatenate([especies[rng.integers(0, por_fuente // 2 + 1, por_fuente // 2)],
+                                   especies[rng.integers(0, len(especies), por_fuente - por_fuente // 2)]])
+        df = base.iloc[rng.integers(0, len(base), por_fuente)].reset_index(drop=True)
+        df["Nombre Científico"] = elegidas
+        vaciar = rng.random(df.shape) < 0.3
+        df = df.mask(vaciar & ~df.columns.isin(["Nombre Científico"]), "")
+        fuentes.append((f"fuente_{s}", alinear(df, list(base.columns))))
+    return fuentes
+
+
+def benchmark(total):
+    fuentes = fuentes_sinteticas(Catalogo(leer_plantas()), total)
+    inicio = time.perf_counter()
+    df = Federacion(fuentes).df()
+    segundos = time.perf_counter() - inicio
+    # Second run under tracemalloc, which slows Python down too much to time it.
+    tracemalloc.start()
+    Federacion(fuentes).df()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{total} filas de entrada en {len(fuentes)} fuentes -> {len(df)} plantas")
+    print(f"unión: {segundos:.2f} s, memoria pico: {pico / 2**20:.1f} MiB")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Une el catálogo de Aucca con otras fuentes.")
+    parser.add_argument("--fuentes", default=DIR_FUENTES, help="carpeta con las fuentes adicionales")
+    parser.add_argument("--benchmark", type=int, default=None, metavar="FILAS",
+                        help="mide la unión con fuentes sintéticas de FILAS filas en total")
+    args = parser.parse_args(argv)
+    if args.benchmark:
+        benchmark(args.benchmark)
+        return
+    df = leer_catalogo(directorio=args.fuentes)
+    print(f"{len(df)} plantas")
+    if COLUMNA_FUENTES in df.columns:
+        print(df[COLUMNA_FUENTES].value_counts().to_string())
+
+
+if __name__ == "__main__":
+    main()
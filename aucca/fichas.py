@@ -0,0 +1,104 @@
+import pandas as pd
+
+from aucca.taxones import taxones
+
+SECCIONES = [
+    ("🌿 Identificación", ["Nombre vulgar", "Nombre Científico", "Familia", "Categoria",
+                           "Fuentes", "Procedencia"]),
+    ("🌱 Características y Servicios Ecosistémicos",
+     ["Fijador de Nitrógeno", "Acumulador Dinámico", "Minerales", "Propiedades"]),
+    ("📚 Guía para Cultivo",
+     ["Época de siembra (CHILE)", "Método", "Profundidad de Siembra", "Tiempo de germinar",
+      "Transplante", "Distancia entre (Plantas)", "Distancia entre (hileras)",
+      "Tiempo para cosechar", "Observaciones"]),
+]
+
+_SIN_INFORMACION = ["Familia", "Fijador de Nitrógeno", "Acumulador Dinámico", "Minerales",
+                    "Propiedades", "Observaciones"]
+
+# Only shown when filled (set when partner catalogues are merged in).
+OPCIONALES = {"Fuentes", "Procedencia"}
+
+# How each page shows a card: heading level and the text for empty fields.
+ESTILOS = {
+    "inicio": {"nivel": 3, "vacio": "", "vacios": {}},
+    "explorador": {"nivel": 2, "vacio": "No disponible",
+                   "vacios": {c: "Sin información" for c in _SIN_INFORMACION}},
+}
+
+
+def _valor(fila, campo):
+    v = fila.get(campo, "")
+    if v is None or (not isinstance(v, str) and pd.isna(v)):
+        return ""
+    return str(v).strip()
+
+
+def linea_taxon(tx, fila, estilo="inicio"):
+    """Canonical taxon of the plant in live row `fila` and the other records filed under it."""
+    id_ = tx.ids[fila]
+    if not id_.startswith("taxon:"):
+        return ""
+    linea = f"{'#' * ESTILOS[estilo]['nivel']} 🧬 Taxón\n\n**{tx.nombres[id_].capitalize()}** (`{id_}`)"
+    otras = [n.replace("\n", " ") for n in tx.miembros(id_) if n != tx.nombre_total[fila]]
+    if otras:
+        linea += f"\n\n**También registrada como:** {', '.join(otras)}"
+    return linea
+
+
+def renderizar_ficha(fila, estilo="inicio"):
+    """Whole detail card of one plant as a single markdown fragment."""
+    e = ESTILOS[estilo]
+    partes = []
+    for titulo, campos in SECCIONES:
+        partes.append(f"{'#' * e['nivel']} {titulo}")
+        for campo in campos:
+            if campo in OPCIONALES and not _valor(fila, campo):
+                continue
+            valor = _valor(fila, campo) or e["vacios"].get(campo, e["vacio"])
+            partes.append(f"**{campo}:** {valor}")
+    return "\n\n".join(partes)
+
+
+# ======================
+# PRE-RENDERED DETAIL CARDS
+# Built for every live plant when a catalogue snapshot is first used and looked
+# up by row key ("Nombre total" repeats). Fragments are kept per (plant key,
+# row hash), so after a reload only the rows whose content changed are
+# rendered again. The taxon line depends on the other rows,
+# so it is added per snapshot rather than cached with the fragment.
+# ======================
+_FRAGMENTOS = {estilo: {} for estilo in ESTILOS}
+
+
+class Fichas:
+    def __init__(self, catalogo, estilo):
+        anteriores = _FRAGMENTOS[estilo]
+        vivos = catalogo.vivos
+        df = catalogo.df
+        claves = catalogo.claves[vivos]
+        hashes = catalogo.hashes[vivos]
+        tx = taxones(catalogo)
+        actuales, self.por_clave = {}, {}
+        for i, (clave, h) in enumerate(zip(claves, hashes)):
+            llave = (clave, int(h))
+            fragmento = anteriores.get(llave)
+            if fragmento is None:
+                fragmento = renderizar_ficha(df.iloc[i], estilo)
+            actuales[llave] = fragmento
+            taxon = linea_taxon(tx, i, estilo)
+            self.por_clave[clave] = fragmento + "\n\n" + taxon if taxon else fragmento
+        _FRAGMENTOS[estilo] = actuales
+
+    def get(self, clave, default=None):
+        return self.por_clave.get(clave, default)
+
+
+def fichas(catalogo, estilo="inicio"):
+    return catalogo.derivado(f"fichas:{estilo}", lambda c: Fichas(c, estilo))
+
+
+def ficha(catalogo, planta, estilo="inicio"):
+    # A plant dropped by a reload while still on screen is rendered on the fly.
+    fragmento = fichas(catalogo, estilo).get(catalogo.clave_de(planta))
+    return fragmento if fragmento is not None else renderizar_ficha(planta, estilo)
@@ -0,0 +1,143 @@
+import re
+
+import numpy as np
+
+from aucca.texto import normalizar_texto
+
+# Weights of each companion rule in the pair score.
+PESO_FIJADOR = 1.0        # nitrogen fixer next to a heavy feeder
+PESO_ACUMULADOR = 0.5     # dynamic accumulator next to a heavy feeder
+PESO_MINERALES = 0.5      # accumulators of complementary minerals
+PESO_MISMA_FAMILIA = -1.0  # same family: shared pests, rotation conflict
+
+# Categories treated as heavy feeders (the ones harvested every season).
+CATEGORIAS_EXIGENTES = ("hortalizas", "frutales", "legumbres")
+
+SIN_MINERALES = {"", "no aplica", "no informacion"}
+# Plant part annotations in the Minerales cells ("Hojas: Mg-K").
+PARTES_PLANTA = {"hojas", "semillas", "raices", "flores", "frutos", "tallos"}
+SEPARADORES_MINERALES = re.compile(r"[-\n:;,]")
+SIMBOLO = re.compile(r"[A-Z][a-z]?")
+SIMBOLOS_JUNTOS = re.compile(r"(?:[A-Z][a-z]?)+")
+
+VECINOS = 5
+BLOQUE_FILAS = 512  # rows scored at a time (peak memory: 512 x n float32 temporaries)
+
+
+def _si(serie):
+    return serie.map(normalizar_texto).str.strip().eq("si").to_numpy()
+
+
+def _simbolos_minerales(valor):
+    # Split before normalizing: normalizar_texto drops the "-" separators.
+    if not isinstance(valor, str) or normalizar_texto(valor).strip() in SIN_MINERALES:
+        return set()
+    simbolos = set()
+    for parte in SEPARADORES_MINERALES.split(valor):
+        parte = parte.strip()
+        if not parte or normalizar_texto(parte) in PARTES_PLANTA:
+            continue
+        # Run-together symbols ("KMn") are split on their capitals.
+        juntos = SIMBOLO.findall(parte) if SIMBOLOS_JUNTOS.fullmatch(parte) else [parte]
+        simbolos.update(normalizar_texto(m).upper() for m in juntos)
+    return simbolos
+
+
+def _minerales(serie):
+    listas = [sorted(_simbolos_minerales(v)) for v in serie]
+    simbolos = sorted({m for l in listas for m in l})
+    matriz = np.zeros((len(listas), len(simbolos)), dtype=np.uint8)
+    columna = {m: j for j, m in enumerate(simbolos)}
+    for i, l in enumerate(listas):
+        matriz[i, [columna[m] for m in l]] = 1
+    return simbolos, matriz
+
+
+# ======================
+# GUILD COMPATIBILITY MATRIX
+# Every rule is a boolean/integer outer product over the catalogue, so the
+# whole plant x plant score is a handful of NumPy operations. Only the float16
+# matrix and the top-k neighbours of each plant are kept.
+# ======================
+class Gremios:
+    def __init__(self, df, k=VECINOS):
+        self.nombres = df["Nombre total"].to_numpy()
+        self.posicion = {n: i for i, n in enumerate(self.nombres)}
+        n = len(df)
+
+        familia = df["Familia"].map(normalizar_texto).str.strip()
+        self.familia = np.unique(familia.to_numpy(), return_inverse=True)[1]
+        self.con_familia = familia.ne("").to_numpy()
+        self.fijador = _si(df["Fijador de Nitrógeno"])
+        self.acumulador = _si(df["Acumulador Dinámico"])
+        categoria = df["Categoria"].map(normalizar_texto)
+        self.exigente = categoria.str.contains("|".join(CATEGORIAS_EXIGENTES)).to_numpy() & ~self.fijador
+        self.simbolos, self.minerales = _minerales(df["Minerales"])
+
+        # Score rows in blocks: only one block of float32 temporaries is alive at a time.
+        self.matriz = np.empty((n, n), dtype=np.float16)
+        k = max(0, min(k, n - 1))
+        self.vecinos = np.empty((n, k), dtype=np.int32)
+        m = self.minerales.astype(np.float32)
+        cuenta = m.sum(axis=1)
+        for inicio in range(0, n, BLOQUE_FILAS):
+            b = slice(inicio, min(inicio + BLOQUE_FILAS, n))
+            puntaje = self._bloque(b, m, cuenta)
+            self.matriz[b] = puntaje
+            if k:
+                orden = np.nan_to_num(puntaje, nan=-np.inf)
+                top = np.argpartition(-orden, k - 1, axis=1)[:, :k]
+                filas = np.arange(len(orden))[:, None]
+                self.vecinos[b] = top[filas, np.argsort(-orden[filas, top], axis=1, kind="stable")]
+
+    def _bloque(self, b, m, cuenta):
+        """float32 scores of rows `b` (a slice) against every plant, NaN on the diagonal."""
+        familia, con_familia = self.familia, self.con_familia
+        fijador, exigente, acumulador = self.fijador, self.exigente, self.acumulador
+        misma_familia = ((familia[b, None] == familia[None, :])
+                         & con_familia[b, None] & con_familia[None, :])
+        fija = (fijador[b, None] & exigente[None, :]) | (exigente[b, None] & fijador[None, :])
+        acumula = (acumulador[b, None] & exigente[None, :]) | (exigente[b, None] & acumulador[None, :])
+        # Complementary minerals: share of the pair's minerals that only one of them brings.
+        comunes = m[b] @ m.T
+        union = cuenta[b, None] + cuenta[None, :] - comunes
+        ambos = (cuenta[b, None] > 0) & (cuenta[None, :] > 0)
+        complemento = np.divide(union - comunes, union, out=np.zeros_like(union), where=ambos)
+
+        puntaje = PESO_MINERALES * complemento  # float32 throughout
+        puntaje += np.float32(PESO_FIJADOR) * fija
+        puntaje += np.float32(PESO_ACUMULADOR) * acumula
+        puntaje += np.float32(PESO_MISMA_FAMILIA) * misma_familia
+        filas = np.arange(b.start, b.stop)
+        puntaje[filas - b.start, filas] = np.nan
+        return puntaje
+
+    def razones(self, i, j):
+        razones = []
+        if (self.fijador[i] and self.exigente[j]) or (self.exigente[i] and self.fijador[j]):
+            razones.append("fija nitrógeno para la otra")
+        if (self.acumulador[i] and self.exigente[j]) or (self.exigente[i] and self.acumulador[j]):
+            razones.append("acumulador dinámico que nutre a la otra")
+        distintos = self.minerales[i] ^ self.minerales[j]
+        if distintos.any() and self.minerales[i].any() and self.minerales[j].any():
+            razones.append("minerales complementarios (" +
+                           ", ".join(s for s, d in zip(self.simbolos, distintos) if d) + ")")
+        if self.con_familia[i] and self.familia[i] == self.familia[j]:
+            razones.append("misma familia: conviene rotarlas")
+        return razones
+
+    def companeras(self, nombre):
+        """Best companions of `nombre` as (name, score, reasons), only positive scores."""
+        i = self.posicion.get(nombre)
+        if i is None:
+            return []
+        salida = []
+        for j in self.vecinos[i]:
+            puntaje = float(self.matriz[i, j])
+            if puntaje > 0:
+                salida.append((self.nombres[j], puntaje, self.razones(i, j)))
+        return salida
+
+
+def gremios(catalogo):
+    return catalogo.derivado("gremios", lambda c: Gremios(c.df))
@@ -0,0 +1,350 @@
+from collections import Counter
+import math
+import re
+
+from rapidfuzz.distance import DamerauLevenshtein
+
+from aucca.texto import normalizar_texto, terminos
+
+
+# ======================
+# SUBSTRING INDEX (trigrams)
+# Answers `norm_q in normalizar_texto(name)` without scanning every row.
+# Updates are copy-on-write: `con_cambios` returns a new index and leaves the
+# current one untouched, so readers of the old version never see a half update.
+# ======================
+def _trigramas(txt):
+    return {txt[i:i + 3] for i in range(len(txt) - 2)}
+
+
+class IndiceSubcadenas:
+    def __init__(self, textos=None):
+        self.textos = {}
+        self.postings = {}
+        for doc_id, txt in (textos or {}).items():
+            self._agregar(doc_id, txt)
+
+    def _agregar(self, doc_id, txt):
+        txt = normalizar_texto(txt)
+        self.textos[doc_id] = txt
+        for tri in _trigramas(txt):
+            self.postings.setdefault(tri, set()).add(doc_id)
+
+    def con_cambios(self, agregar=None, quitar=()):
+        nuevo = IndiceSubcadenas()
+        nuevo.textos = dict(self.textos)
+        nuevo.postings = dict(self.postings)
+        tocados = set()
+
+        def posting(tri):
+            if tri not in tocados:
+                nuevo.postings[tri] = set(nuevo.postings.get(tri, ()))
+                tocados.add(tri)
+            return nuevo.postings[tri]
+
+        for doc_id in list(quitar) + list((agregar or {}).keys()):
+            viejo = nuevo.textos.pop(doc_id, None)
+            if viejo is None:
+                continue
+            for tri in _trigramas(viejo):
+                posting(tri).discard(doc_id)
+        for doc_id, txt in (agregar or {}).items():
+            txt = normalizar_texto(txt)
+            nuevo.textos[doc_id] = txt
+            for tri in _trigramas(txt):
+                posting(tri).add(doc_id)
+        for tri in tocados:
+            if not nuevo.postings[tri]:
+                del nuevo.postings[tri]
+        return nuevo
+
+    def buscar(self, consulta):
+        q = normalizar_texto(consulta)
+        if not q:
+            return set()
+        tris = _trigramas(q)
+        if not tris:
+            return {d for d, txt in self.textos.items() if q in txt}
+        candidatos = None
+        for tri in sorted(tris, key=lambda t: len(self.postings.get(t, ()))):
+            post = self.postings.get(tri)
+            if not post:
+                return set()
+            candidatos = set(post) if candidatos is None else candidatos & post
+            if not candidatos:
+                return set()
+        return {d for d in candidatos if q in self.textos[d]}
+
+
+# ======================
+# TERM INDEX (retrieval over longer texts, e.g. docx sections)
+# ======================
+class IndiceTerminos:
+    def __init__(self, textos=None):
+        self.frecuencias = {}
+        self.postings = {}
+        for doc_id, txt in (textos or {}).items():
+            self._agregar(doc_id, txt)
+
+    def _agregar(self, doc_id, txt):
+        tf = Counter(terminos(txt))
+        self.frecuencias[doc_id] = tf
+        for t in tf:
+            self.postings.setdefault(t, set()).add(doc_id)
+
+    def con_cambios(self, agregar=None, quitar=()):
+        nuevo = IndiceTerminos()
+        nuevo.frecuencias = dict(self.frecuencias)
+        nuevo.postings = dict(self.postings)
+        tocados = set()
+
+        def posting(t):
+            if t not in tocados:
+                nuevo.postings[t] = set(nuevo.postings.get(t, ()))
+                tocados.add(t)
+            return nuevo.postings[t]
+
+        for doc_id in list(quitar) + list((agregar or {}).keys()):
+            tf = nuevo.frecuencias.pop(doc_id, None)
+            for t in tf or ():
+                posting(t).discard(doc_id)
+        for doc_id, txt in (agregar or {}).items():
+            tf = Counter(terminos(txt))
+            nuevo.frecuencias[doc_id] = tf
+            for t in tf:
+                posting(t).add(doc_id)
+        for t in tocados:
+            if not nuevo.postings[t]:
+                del nuevo.postings[t]
+        return nuevo
+
+    def buscar(self, consulta, n=3, k1=1.2, b=0.75):
+        # BM25; ties broken by id so the answer does not depend on set order.
+        n_docs = len(self.frecuencias) or 1
+        largos = {d: sum(tf.values()) for d, tf in self.frecuencias.items()}
+        promedio = (sum(largos.values()) / n_docs) or 1
+        puntajes = Counter()
+        for t in set(terminos(consulta)):
+            docs = self.postings.get(t)
+            if not docs:
+                continue
+            idf = math.log(1 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+            for d in docs:
+                tf = self.frecuencias[d][t]
+                puntajes[d] += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * largos[d] / promedio))
+        return [d for d, _ in sorted(puntajes.items(), key=lambda x: (-x[1], str(x[0])))[:n]]
+
+
+# ======================
+# SPELLING CORRECTION (symmetric delete, as in SymSpell)
+# Every vocabulary word is stored under all the strings obtained by deleting up
+# to `max_distancia` letters from its first `prefijo` letters. A typo shares one
+# of those delete strings with the intended word, so a lookup only generates
+# the deletes of the typed token (a fixed number for a given length) and checks
+# the few words filed under them, whatever the size of the vocabulary.
+# ======================
+def _borrados(palabra, max_distancia):
+    salida = {palabra}
+    frontera = {palabra}
+    for _ in range(max_distancia):
+        frontera = {w[:i] + w[i + 1:] for w in frontera if len(w) > 1 for i in range(len(w))}
+        salida |= frontera
+    return salida
+
+
+def _fonetica(palabra):
+    # Spanish spelling mix-ups that sound the same: b/v, s/z/c, y/ll, j/g, silent h.
+    palabra = re.sub(r"c([ei])", r"s\1", palabra)
+    palabra = re.sub(r"g([ei])", r"j\1", palabra)
+    return palabra.replace("v", "b").replace("z", "s").replace("ll", "y").replace("h", "")
+
+
+class IndiceOrtografico:
+    def __init__(self, textos=(), preferidos=(), max_distancia=2, prefijo=7, largo_minimo=4):
+        self.max_distancia = max_distancia
+        self.prefijo = prefijo
+        self.largo_minimo = largo_minimo
+        self.frecuencia = Counter()
+        formas = {}
+        for txt in textos:
+            for palabra in self._palabras(txt):
+                norm = normalizar_texto(palabra)
+                self.frecuencia[norm] += 1
+                formas.setdefault(norm, Counter())[palabra] += 1
+        # Words of `preferidos` (e.g. plant names) win ties against prose words.
+        self.preferidas = {normalizar_texto(p) for txt in preferidos for p in self._palabras(txt)}
+        # Corrections are shown with the accents the content uses ("baño", not "bano").
+        self.forma = {n: c.most_common(1)[0][0] for n, c in formas.items()}
+        self.borrados = {}
+        for norm in self.frecuencia:
+            for b in _borrados(norm[:prefijo], max_distancia):
+                self.borrados.setdefault(b, []).append(norm)
+
+    def _palabras(self, txt):
+        for palabra in re.findall(r"\w+", str(txt).lower()):
+            norm = normalizar_texto(palabra)
+            if len(norm) >= self.largo_minimo and norm.isalpha():
+                yield palabra
+
+    def sugerir(self, palabra):
+        """Closest vocabulary word (normalized) within `max_distancia`, or None."""
+        norm = normalizar_texto(palabra)
+        if norm in self.frecuencia:
+            return norm
+        if len(norm) < self.largo_minimo:
+            return None
+        # One edit at most for short words: "seco" must not become "suelo".
+        limite = 1 if len(norm) <= 5 else self.max_distancia
+        candidatos = set()
+        for b in _borrados(norm[:self.prefijo], limite):
+            candidatos.update(self.borrados.get(b, ()))
+        mejor, clave_mejor = None, None
+        for c in candidatos:
+            if abs(len(c) - len(norm)) > limite:
+                continue
+            d = DamerauLevenshtein.distance(norm, c, score_cutoff=limite)
+            if d > limite:
+                continue
+            # Same distance: a same-sounding word first, then a preferred one, then the most frequent.
+            clave = (d, _fonetica(c) != _fonetica(norm), c not in self.preferidas, -self.frecuencia[c], c)
+            if clave_mejor is None or clave < clave_mejor:
+                mejor, clave_mejor = c, clave
+        return mejor
+
+    def corregir(self, texto):
+        """`texto` with each unknown word replaced by its correction."""
+        def reemplazo(m):
+            palabra = m.group(0)
+            norm = normalizar_texto(palabra)
+            if len(norm) < self.largo_minimo or not norm.isalpha() or norm in self.frecuencia:
+                return palabra
+            sugerida = self.sugerir(norm)
+            return self.forma[sugerida] if sugerida else palabra
+        return re.sub(r"\w+", reemplazo, texto)
+
+
+# ======================
+# PASSAGES (answer snippets)
+# Texts are cut into passages of whole paragraphs at build time. Each passage
+# keeps its character offsets in the text and, per term, the offsets of every
+# word that produced it, so picking and highlighting a snippet never scans the
+# text again. Copy-on-write like the other indexes.
+# ======================
+MIN_PASAJE = 280  # characters; shorter paragraphs are joined with the next
+COMUN = 0.2  # terms in more than this share of passages are not highlighted
+
+
+def _palabras(txt, inicio, fin):
+    # (term, start, end) of every indexed word, same rule as `terminos`.
+    for m in re.finditer(r"\w+", txt[inicio:fin]):
+        t = normalizar_texto(m.group(0))
+        if len(t) > 2:
+            yield t, inicio + m.start(), inicio + m.end()
+
+
+def cortar_pasajes(txt, minimo=MIN_PASAJE):
+    pasajes = []
+    inicio = None
+    for m in re.finditer(r"\S(?:.*?\S)?(?=\n\s*\n|\s*\Z)", txt, flags=re.S):
+        if inicio is None:
+            inicio = m.start()
+        if m.end() - inicio >= minimo:
+            pasajes.append((inicio, m.end()))
+            inicio = None
+    if inicio is not None:
+        if pasajes and m.end() - inicio < minimo // 2:
+            pasajes[-1] = (pasajes[-1][0], m.end())
+        else:
+            pasajes.append((inicio, m.end()))
+    return pasajes
+
+
+def _construir_pasajes(txt):
+    salida = []
+    for inicio, fin in cortar_pasajes(txt):
+        posiciones = {}
+        n = 0
+        for t, a, b in _palabras(txt, inicio, fin):
+            posiciones.setdefault(t, []).append((a, b))
+            n += 1
+        salida.append((inicio, fin, n, posiciones))
+    return salida
+
+
+class IndicePasajes:
+    def __init__(self, textos=None):
+        self.textos = {}
+        self.pasajes = {}  # doc_id -> [(inicio, fin, n_palabras, {term: [(a, b)]})]
+        self.df = Counter()  # term -> passages containing it
+        self.n_pasajes = 0
+        self.palabras = 0  # words over all passages, for the average length
+        for doc_id, txt in (textos or {}).items():
+            self._agregar(doc_id, txt)
+
+    @property
+    def promedio(self):
+        return (self.palabras / self.n_pasajes if self.n_pasajes else 0) or 1
+
+    def _agregar(self, doc_id, txt):
+        self.textos[doc_id] = txt
+        self.pasajes[doc_id] = _construir_pasajes(txt)
+        for _, _, largo, posiciones in self.pasajes[doc_id]:
+            self.df.update(posiciones.keys())
+            self.n_pasajes += 1
+            self.palabras += largo
+
+    def con_cambios(self, agregar=None, quitar=()):
+        nuevo = IndicePasajes()
+        nuevo.textos = dict(self.textos)
+        nuevo.pasajes = dict(self.pasajes)
+        nuevo.df = Counter(self.df)
+        nuevo.n_pasajes, nuevo.palabras = self.n_pasajes, self.palabras
+        for doc_id in list(quitar) + list((agregar or {}).keys()):
+            nuevo.textos.pop(doc_id, None)
+            for _, _, largo, posiciones in nuevo.pasajes.pop(doc_id, ()):
+                nuevo.df.subtract(posiciones.keys())
+                nuevo.n_pasajes -= 1
+                nuevo.palabras -= largo
+        nuevo.df = +nuevo.df
+        for doc_id, txt in (agregar or {}).items():
+            nuevo._agregar(doc_id, txt)
+        return nuevo
+
+    def mejores(self, doc_id, consulta, n=1, k1=1.2, b=0.75):
+        """Indexes of the `n` best passages of `doc_id` for the query, in text order."""
+        pasajes = self.pasajes.get(doc_id, [])
+        n_pasajes, promedio = self.n_pasajes or 1, self.promedio
+        puntajes = []
+        for i, (_, _, largo, posiciones) in enumerate(pasajes):
+            puntaje = 0.0
+            for t in set(terminos(consulta)):
+                tf = len(posiciones.get(t, ()))
+                if tf:
+                    idf = math.log(1 + (n_pasajes - self.df[t] + 0.5) / (self.df[t] + 0.5))
+                    puntaje += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * largo / promedio))
+            puntajes.append((-puntaje, i))
+        elegidos = [i for p, i in sorted(puntajes)[:n] if p < 0]
+        # No term of the query in this text: its opening passage is the summary.
+        return sorted(elegidos) or ([0] if pasajes else [])
+
+    def extracto(self, doc_id, consulta, n=1, resaltar=True):
+        """Best passages of `doc_id` as markdown, query terms in bold."""
+        txt = self.textos.get(doc_id, "")
+        pasajes = self.pasajes.get(doc_id, [])
+        buscados = {t for t in terminos(consulta) if self.df[t] <= COMUN * self.n_pasajes}
+        partes = []
+        for i in self.mejores(doc_id, consulta, n):
+            inicio, fin, _, posiciones = pasajes[i]
+            spans = sorted(s for t in buscados for s in posiciones.get(t, ()))
+            if not resaltar or "**" in txt[inicio:fin]:
+                spans = []
+            trozos, cursor = [], inicio
+            for a, b in spans:
+                trozos += [txt[cursor:a], "**", txt[a:b], "**"]
+                cursor = b
+            trozos.append(txt[cursor:fin])
+            partes.append("".join(trozos))
+        extracto = "\n\n…\n\n".join(partes)
+        if pasajes and len(partes) < len(pasajes):
+            extracto += " …"
+        return extracto
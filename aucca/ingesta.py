@@ -0,0 +1,149 @@
+"""Build the typed plant snapshot straight from the source spreadsheet.
+
+    python -m aucca.ingesta planilla.xlsx [--hoja Hoja1] [--salida datos/plantas.parquet]
+
+Only rows whose content changed since the previous snapshot are cleaned again;
+the running app picks the new snapshot up through the live-reload watcher.
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+from aucca.catalogo import RENOMBRES, SNAPSHOT_PLANTAS, nombre_total
+
+# Typed columns of the snapshot; everything else is stripped text.
+NUMERICAS = {"N° (original)": "Int64", "lat": "float64", "lon": "float64"}
+RANGO_COORDENADAS = {"lat": (-90.0, 90.0), "lon": (-180.0, 180.0)}
+REQUERIDAS = ["Nombre vulgar", "Nombre Científico"]
+
+# Bookkeeping columns ("_" prefix, dropped when the app loads the snapshot).
+COLUMNA_HASH = "_hash"
+
+
+# ======================
+# READ (openpyxl read-only: rows are streamed, the sheet is never held as cells)
+# ======================
+def leer_xlsx(path, hoja=None):
+    libro = load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = libro[hoja] if hoja else libro.active
+        filas = ws.iter_rows(values_only=True)
+        encabezado = next(filas, None)
+        if encabezado is None:
+            return pd.DataFrame()
+        columnas = [str(c).strip() if c is not None else "" for c in encabezado]
+        datos = [fila[:len(columnas)] for fila in filas]
+    finally:
+        libro.close()
+    df = pd.DataFrame(datos, columns=columnas, dtype=object)
+    return df.loc[:, [c for c in columnas if c]]
+
+
+def leer_fuente(path, hoja=None):
+    if path.lower().endswith(".csv"):
+        return pd.read_csv(path, sep=";", encoding="latin1", dtype=object)
+    return leer_xlsx(path, hoja)
+
+
+def hashes_fuente(raw):
+    # The header is mixed in, so a renamed or reordered column invalidates every row.
+    encabezado = pd.util.hash_array(np.array(["|".join(raw.columns)], dtype=object))[0]
+    return pd.util.hash_pandas_object(raw.astype(str), index=False).to_numpy() ^ encabezado
+
+
+# ======================
+# VALIDATE AND CLEAN (column-wise over the changed rows)
+# ======================
+def limpiar_filas(raw):
+    """Clean raw rows into snapshot rows. Returns (df, problemas, kept-row mask)."""
+    problemas = []
+    faltan = [c for c in REQUERIDAS if c not in raw.columns]
+    if faltan:
+        raise ValueError(f"Faltan columnas obligatorias: {', '.join(faltan)}")
+
+    df = pd.DataFrame(index=raw.index)
+    for col in raw.columns:
+        serie = raw[col]
+        if col in NUMERICAS:
+            texto = serie.astype("string").str.strip().str.replace(",", ".", regex=False)
+            numero = pd.to_numeric(texto, errors="coerce")
+            malos = numero.isna() & texto.fillna("").ne("")
+            if col in RANGO_COORDENADAS:
+                lo, hi = RANGO_COORDENADAS[col]
+                fuera = numero.notna() & ~numero.between(lo, hi)
+                malos |= fuera
+                numero = numero.mask(fuera)
+            for i in raw.index[malos.to_numpy()]:
+                problemas.append((i, col, f"valor no numérico o fuera de rango: {serie[i]!r}"))
+            df[col] = numero.astype(NUMERICAS[col])
+        else:
+            # Strip also drops stray newlines inside quoted cells ("Bambu\n").
+            df[col] = serie.astype("string").str.strip().fillna("").astype(object)
+
+    vacias = df[REQUERIDAS].eq("").all(axis=1)  # blank spreadsheet rows
+    df = df[~vacias].rename(columns=RENOMBRES).reset_index(drop=True)
+    df["Nombre total"] = nombre_total(df)
+    # Multi-value cells stay as text: the catalogue splits them once per row into
+    # its filter bitmaps, and only for rows that changed.
+    return df, problemas, ~vacias.to_numpy()
+
+
+# ======================
+# INCREMENTAL BUILD
+# Rows are matched to the previous snapshot by the hash of their raw content;
+# unchanged rows are copied over and only new/edited ones go through cleaning.
+# ======================
+def construir_snapshot(raw, anterior=None):
+    hashes = hashes_fuente(raw)
+    reusables = {}
+    if anterior is not None and COLUMNA_HASH in anterior.columns:
+        reusables = {int(h): i for i, h in enumerate(anterior[COLUMNA_HASH].to_numpy())}
+    reusar = np.array([int(h) in reusables for h in hashes], dtype=bool)
+
+    nuevas, problemas, conservadas = limpiar_filas(raw[~reusar])
+    nuevas[COLUMNA_HASH] = hashes[~reusar][conservadas]
+    partes = [nuevas]
+    if reusar.any():
+        previas = anterior.iloc[[reusables[int(h)] for h in hashes[reusar]]].reset_index(drop=True)
+        partes.append(previas)
+    # Back to source order: position of each kept row in the spreadsheet.
+    orden = np.concatenate([np.flatnonzero(~reusar)[conservadas], np.flatnonzero(reusar)])
+    snapshot = pd.concat(partes, ignore_index=True)
+    snapshot = snapshot.iloc[np.argsort(orden, kind="stable")].reset_index(drop=True)
+    snapshot = snapshot.reindex(columns=nuevas.columns)
+    tipos = {c: t for c, t in NUMERICAS.items() if c in snapshot.columns}
+    snapshot = snapshot.astype({**tipos, COLUMNA_HASH: "uint64"})
+    resumen = {"filas": len(snapshot), "reusadas": int(reusar.sum()),
+               "procesadas": int((~reusar).sum()), "problemas": problemas}
+    return snapshot, resumen
+
+
+def ingerir(fuente, salida=SNAPSHOT_PLANTAS, hoja=None):
+    raw = leer_fuente(fuente, hoja)
+    anterior = pd.read_parquet(salida) if os.path.exists(salida) else None
+    snapshot, resumen = construir_snapshot(raw, anterior)
+    os.makedirs(os.path.dirname(salida) or ".", exist_ok=True)
+    temporal = salida + ".tmp"
+    snapshot.to_parquet(temporal, index=False)
+    os.replace(temporal, salida)  # the watcher never sees a half-written file
+    return resumen
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera el catálogo de plantas desde la planilla.")
+    parser.add_argument("fuente", help="planilla .xlsx (o .csv exportado)")
+    parser.add_argument("--hoja", default=None, help="hoja a leer (por defecto, la activa)")
+    parser.add_argument("--salida", default=SNAPSHOT_PLANTAS)
+    args = parser.parse_args(argv)
+    resumen = ingerir(args.fuente, args.salida, args.hoja)
+    print(f"{resumen['filas']} plantas: {resumen['procesadas']} procesadas, "
+          f"{resumen['reusadas']} sin cambios")
+    for fila, col, msg in resumen["problemas"]:
+        print(f"  fila {fila + 2}, {col}: {msg}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+import json
+import os
+import sqlite3
+import threading
+
+import pandas as pd
+import streamlit as st
+
+from aucca.catalogo import COLUMNAS_FILTRO, FILTRO_CLAVES, tokens_columna
+from aucca.cultivo import CAMPOS_NUMERICOS
+from aucca.texto import normalizar_texto, terminos
+
+RUTA_SQLITE = os.environ.get("AUCCA_SQLITE", os.path.join("datos", "aucca.sqlite"))
+
+# Free-text (FTS5) columns of the plant table, by catalogue column.
+COLUMNAS_TEXTO = {
+    "nombres": ["Nombre vulgar", "Nombre Científico"],
+    "propiedades": ["Propiedades"],
+    "observaciones": ["Observaciones"],
+}
+
+COLUMNAS_NUMERICAS = [f"{prefijo}_{lado}" for prefijo, _ in CAMPOS_NUMERICOS.values()
+                      for lado in ("min", "max")]
+
+# Bumped when the tables change shape: a database on disk from an older one is rebuilt.
+VERSION_ESQUEMA = "2"
+
+ESQUEMA = """
+CREATE TABLE meta (clave TEXT PRIMARY KEY, valor TEXT);
+CREATE TABLE plantas_valores (planta_id INTEGER NOT NULL, columna TEXT NOT NULL, valor TEXT NOT NULL);
+CREATE INDEX plantas_valores_idx ON plantas_valores (columna, valor, planta_id);
+CREATE INDEX plantas_valores_planta ON plantas_valores (planta_id);
+CREATE VIRTUAL TABLE nombres_fts USING fts5(nombre, tokenize='trigram');
+CREATE VIRTUAL TABLE plantas_fts USING fts5(nombres, propiedades, observaciones, tokenize='unicode61 remove_diacritics 2');
+CREATE TABLE secciones (id INTEGER PRIMARY KEY, titulo TEXT UNIQUE NOT NULL, texto TEXT NOT NULL);
+CREATE VIRTUAL TABLE secciones_fts USING fts5(titulo, texto, tokenize='unicode61 remove_diacritics 2');
+CREATE TABLE plantas_num (planta_id INTEGER PRIMARY KEY, {columnas_num});
+""".format(columnas_num=", ".join(f"{c} REAL" for c in COLUMNAS_NUMERICAS))
+# B-tree indexes over the parsed min/max columns back the range filters.
+ESQUEMA += "".join(f"CREATE INDEX plantas_num_{c} ON plantas_num ({c});\n" for c in COLUMNAS_NUMERICAS)
+
+
+def _ident(col):
+    return '"' + col.replace('"', '""') + '"'
+
+
+def _valor(v):
+    # Numbers stay numbers (lat/lon come back as floats, as from MotorPandas).
+    return v if isinstance(v, (int, float)) and not isinstance(v, bool) else str(v)
+
+
+def _consulta_fts(texto):
+    # Every term must match (as a prefix): `"agua"* "riego"*`.
+    return " ".join(f'"{t}"*' for t in terminos(texto))
+
+
+# ======================
+# EMBEDDED SQLITE ENGINE (optional, AUCCA_MOTOR=sqlite)
+# Same interface as MotorPandas. Filters compile to a fixed SQL shape per set of
+# filtered columns with the value lists bound through json_each(?), so sqlite3's
+# per-connection statement cache reuses the prepared statements across reruns.
+# ======================
+class MotorSQL:
+    def __init__(self, ruta=RUTA_SQLITE):
+        if ruta != ":memory:":
+            os.makedirs(os.path.dirname(ruta) or ".", exist_ok=True)
+        self.ruta = ruta
+        self._con = sqlite3.connect(ruta, check_same_thread=False, cached_statements=256)
+        self._con.execute("PRAGMA journal_mode=WAL")
+        self._lock = threading.Lock()
+        self._sincronizando = threading.Lock()
+        self.columnas = []
+        self.version_catalogo = None
+        self.version_conocimiento = None
+
+    def _leer(self, sql, params=()):
+        with self._lock:
+            return self._con.execute(sql, params).fetchall()
+
+    def _meta(self, clave):
+        try:
+            fila = self._leer("SELECT valor FROM meta WHERE clave = ?", (clave,))
+        except sqlite3.OperationalError:
+            return None
+        return fila[0][0] if fila else None
+
+    # ----- ingest -----
+    def sincronizar(self, servicio):
+        with self._sincronizando:
+            self._sincronizar_catalogo(servicio.catalogo)
+            # At startup the docx may still be parsing: `seguir` ingests it when ready.
+            if servicio.listo("conocimiento"):
+                self._sincronizar_conocimiento(servicio.conocimiento)
+
+    def seguir(self, servicio):
+        """Sync now and after every reload of `servicio` (and when its docx finishes loading)."""
+        self.sincronizar(servicio)
+        servicio.suscriptores.append(self.sincronizar)
+        if self.version_conocimiento is None:
+            servicio.arranque.futuros["conocimiento"].add_done_callback(
+                lambda futuro: futuro.exception() is None and self.sincronizar(servicio))
+        return self
+
+    def _sincronizar_catalogo(self, catalogo):
+        if (self.version_catalogo is None and self._meta("huella_catalogo") == catalogo.huella
+                and self._meta("version_esquema") == VERSION_ESQUEMA):
+            # Same content as the database on disk: reuse it as is.
+            self.columnas = json.loads(self._meta("columnas"))
+        elif (self.version_catalogo is not None and catalogo.cambios is not None
+              and catalogo.version == self.version_catalogo + 1):
+            self._aplicar_cambios(catalogo)
+        elif self.version_catalogo != catalogo.version:
+            self._ingestar_catalogo(catalogo)
+        self.version_catalogo = catalogo.version
+
+    def _sincronizar_conocimiento(self, conocimiento):
+        if self.version_conocimiento is None and self._meta("huella_conocimiento") == conocimiento.huella:
+            pass
+        elif self.version_conocimiento != conocimiento.version:
+            self._ingestar_secciones(conocimiento)
+        self.version_conocimiento = conocimiento.version
+
+    def _filas_planta(self, clave, orden, fila):
+        planta = (clave, orden, *[_valor(fila[c]) for c in self.columnas])
+        valores = [(col, v) for col, modo in COLUMNAS_FILTRO.items() if col in fila
+                   for v in tokens_columna(fila[col], modo)]
+        textos = [" ".join(str(fila[c]) for c in cols if c in fila) for cols in COLUMNAS_TEXTO.values()]
+        return planta, valores, normalizar_texto(fila["Nombre total"]), textos
+
+    def _insertar_planta(self, cur, clave, orden, fila, numeros):
+        planta, valores, nombre, textos = self._filas_planta(clave, orden, fila)
+        marcas = ", ".join("?" * len(planta))
+        cur.execute(f"INSERT INTO plantas VALUES (NULL, {marcas})", planta)
+        pid = cur.lastrowid
+        cur.executemany("INSERT INTO plantas_valores VALUES (?, ?, ?)", [(pid, c, v) for c, v in valores])
+        cur.execute("INSERT INTO nombres_fts (rowid, nombre) VALUES (?, ?)", (pid, nombre))
+        cur.execute("INSERT INTO plantas_fts (rowid, nombres, propiedades, observaciones) VALUES (?, ?, ?, ?)",
+                    (pid, *textos))
+        marcas = ", ".join("?" * (len(COLUMNAS_NUMERICAS) + 1))
+        cur.execute(f"INSERT INTO plantas_num VALUES ({marcas})",
+                    (pid, *[None if pd.isna(numeros[c]) else float(numeros[c]) for c in COLUMNAS_NUMERICAS]))
+
+    def _borrar_planta(self, cur, clave):
+        fila = cur.execute("SELECT id, orden FROM plantas WHERE clave = ?", (clave,)).fetchone()
+        if fila is None:
+            return None
+        pid, orden = fila
+        for tabla, col in (("plantas", "id"), ("plantas_valores", "planta_id"),
+                           ("nombres_fts", "rowid"), ("plantas_fts", "rowid"),
+                           ("plantas_num", "planta_id")):
+            cur.execute(f"DELETE FROM {tabla} WHERE {col} = ?", (pid,))
+        return orden
+
+    def _ingestar_catalogo(self, catalogo):
+        df = catalogo.df
+        self.columnas = list(df.columns)
+        with self._lock, self._con:
+            cur = self._con.cursor()
+            cur.execute("BEGIN")
+            for tabla in ("meta", "plantas", "plantas_valores", "nombres_fts", "plantas_fts",
+                          "secciones", "secciones_fts", "plantas_num"):
+                cur.execute(f"DROP TABLE IF EXISTS {tabla}")
+            for sentencia in ESQUEMA.strip().rstrip(";").split(";\n"):
+                cur.execute(sentencia)
+            # No declared type: SQLite keeps each value's own type instead of casting to TEXT.
+            columnas = ", ".join(_ident(c) for c in self.columnas)
+            cur.execute(f"CREATE TABLE plantas (id INTEGER PRIMARY KEY, clave TEXT UNIQUE NOT NULL, "
+                        f"orden INTEGER NOT NULL, {columnas})")
+            numericos = catalogo.numericos_vivos.to_dict(orient="records")
+            filas = zip(catalogo.claves_vivas, df.to_dict(orient="records"), numericos)
+            for orden, (clave, fila, numeros) in enumerate(filas):
+                self._insertar_planta(cur, clave, orden, fila, numeros)
+            cur.executemany("INSERT INTO meta VALUES (?, ?)", [
+                ("huella_catalogo", catalogo.huella),
+                ("version_esquema", VERSION_ESQUEMA),
+                ("columnas", json.dumps(self.columnas, ensure_ascii=False)),
+            ])
+        self.version_conocimiento = None
+
+    def _aplicar_cambios(self, catalogo):
+        cambios = catalogo.cambios
+        with self._lock, self._con:
+            cur = self._con.cursor()
+            siguiente = cur.execute("SELECT COALESCE(MAX(orden), -1) + 1 FROM plantas").fetchone()[0]
+            for clave in cambios["borradas"]:
+                self._borrar_planta(cur, clave)
+            for clave in cambios["cambiadas"] + cambios["agregadas"]:
+                orden = self._borrar_planta(cur, clave)
+                if orden is None:
+                    orden, siguiente = siguiente, siguiente + 1
+                pos = catalogo.posicion[clave]
+                self._insertar_planta(cur, clave, orden, catalogo.filas.iloc[pos].to_dict(),
+                                      catalogo.numericos.iloc[pos].to_dict())
+            cur.execute("INSERT OR REPLACE INTO meta VALUES ('huella_catalogo', ?)", (catalogo.huella,))
+
+    def _ingestar_secciones(self, conocimiento):
+        with self._lock, self._con:
+            cur = self._con.cursor()
+            cur.execute("DELETE FROM secciones")
+            cur.execute("DELETE FROM secciones_fts")
+            for titulo, texto in conocimiento.secciones.items():
+                cur.execute("INSERT INTO secciones (titulo, texto) VALUES (?, ?)", (titulo, texto))
+                cur.execute("INSERT INTO secciones_fts (rowid, titulo, texto) VALUES (?, ?, ?)",
+                            (cur.lastrowid, titulo, texto))
+            cur.execute("INSERT OR REPLACE INTO meta VALUES ('huella_conocimiento', ?)", (conocimiento.huella,))
+
+    # ----- queries -----
+    def _where(self, filtros, nombre=None, texto=None, rangos=None):
+        clausulas, params = [], []
+        for col in sorted(filtros):
+            if col == FILTRO_CLAVES:
+                clausulas.append("p.clave IN (SELECT value FROM json_each(?))")
+                params.append(json.dumps(list(filtros[col]), ensure_ascii=False))
+                continue
+            clausulas.append("p.id IN (SELECT planta_id FROM plantas_valores WHERE columna = ? "
+                             "AND valor IN (SELECT value FROM json_each(?)))")
+            params += [col, json.dumps(list(filtros[col]), ensure_ascii=False)]
+        if nombre:
+            q = normalizar_texto(nombre).replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            clausulas.append("p.id IN (SELECT rowid FROM nombres_fts WHERE nombre LIKE ? ESCAPE '\\')")
+            params.append(f"%{q}%")
+        if texto and _consulta_fts(texto):
+            clausulas.append("p.id IN (SELECT rowid FROM plantas_fts WHERE plantas_fts MATCH ?)")
+            params.append(_consulta_fts(texto))
+        for prefijo in sorted(rangos or {}):
+            if f"{prefijo}_min" not in COLUMNAS_NUMERICAS:
+                continue
+            clausulas.append(f"p.id IN (SELECT planta_id FROM plantas_num WHERE {prefijo}_min >= ? "
+                             f"AND {prefijo}_max <= ?)")
+            params += list(rangos[prefijo])
+        return (" WHERE " + " AND ".join(clausulas)) if clausulas else "", params
+
+    def total(self):
+        return self._leer("SELECT COUNT(*) FROM plantas")[0][0]
+
+    def opciones(self, col, filtros):
+        where, params = self._where(filtros)
+        sql = (f"SELECT DISTINCT v.valor FROM plantas_valores v JOIN plantas p ON p.id = v.planta_id"
+               f"{where}{' AND' if where else ' WHERE'} v.columna = ?")
+        return sorted(v for (v,) in self._leer(sql, params + [col]))
+
+    def limites(self, prefijo):
+        if f"{prefijo}_min" not in COLUMNAS_NUMERICAS:
+            return None
+        lo, hi = self._leer(f"SELECT MIN({prefijo}_min), MAX({prefijo}_max) FROM plantas_num")[0]
+        return None if lo is None else (lo, hi)
+
+    def filtrar(self, filtros, nombre=None, texto=None, rangos=None):
+        where, params = self._where(filtros, nombre, texto, rangos)
+        columnas = ", ".join(f"p.{_ident(c)}" for c in self.columnas)
+        sql = f"SELECT {columnas} FROM plantas p{where} ORDER BY p.orden"
+        filas = self._leer(sql, params)
+        return pd.DataFrame(filas, columns=self.columnas)
+
+    def claves(self, filtros, nombre=None, texto=None, rangos=None):
+        where, params = self._where(filtros, nombre, texto, rangos)
+        return [c for (c,) in self._leer(f"SELECT p.clave FROM plantas p{where}", params)]
+
+    def buscar_secciones(self, consulta, n=3):
+        q = " OR ".join(f'"{t}"' for t in terminos(consulta))
+        if not q:
+            return []
+        sql = ("SELECT s.titulo FROM secciones_fts f JOIN secciones s ON s.id = f.rowid "
+               "WHERE secciones_fts MATCH ? ORDER BY bm25(secciones_fts) LIMIT ?")
+        return [t for (t,) in self._leer(sql, (q, n))]
+
+
+@st.cache_resource
+def obtener_motor_sql(_servicio):
+    return MotorSQL().seguir(_servicio)
@@ -0,0 +1,148 @@
+"""Per-zone composition aggregates for the "Panel por Zona" page.
+
+    python -m aucca.panel --escala 100
+
+`--escala` replicates the catalogue N times and times the aggregate build and
+a chart query on it, with the number of rows a chart would receive.
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from aucca.catalogo import MESES, Catalogo
+from aucca.cosecha import calendario_cosecha
+
+SIN_ZONA = "Sin zona"
+SIN_DATO = "Sin dato"
+# Chart name -> bitmap column whose tokens are counted per zone.
+COLUMNAS_PANEL = {
+    "Categoría": "Categoria",
+    "Fijador de nitrógeno": "Fijador de Nitrógeno",
+    "Propiedades medicinales": "Propiedades",
+}
+MES_SIEMBRA = "Mes de siembra"
+
+
+def _codigos(serie, vacio):
+    valores = serie.astype(str).str.strip().replace("", vacio)
+    codigos, etiquetas = pd.factorize(valores, sort=True)
+    return codigos.astype(np.int64), list(etiquetas)
+
+
+# ======================
+# ZONE AGGREGATES
+# Built once per catalogue snapshot (`catalogo.derivado`). Every chart table
+# is a long (Zona, Disponible, valor, plantas) frame with only non-zero cells,
+# counted with one `np.bincount` over (row, value) pairs: a plant in several
+# categories counts once in each. Availability stays a dimension, so the
+# page's availability filter is a group-by over these few hundred rows, never
+# a pass over the catalogue.
+# ======================
+class PanelZonas:
+    def __init__(self, catalogo):
+        df = catalogo.df
+        self.zona, self.zonas = _codigos(df["Zona"], SIN_ZONA)
+        self.disponible, self.disponibles = _codigos(df["Disponible Nov 2024"], SIN_DATO)
+
+        self.tablas = {}
+        for nombre, col in COLUMNAS_PANEL.items():
+            if col not in catalogo.bitmaps:
+                continue
+            tokens, matriz = catalogo.bitmaps[col]
+            valor, fila = np.nonzero(matriz[:, catalogo.vivos])
+            self.tablas[nombre] = self._contar(fila, valor, tokens)
+        fila, mes = np.nonzero(calendario_cosecha(catalogo).siembra)
+        self.tablas[MES_SIEMBRA] = self._contar(fila, mes, MESES)
+
+        con_ubicacion = (df["lat"].astype(str).str.strip().ne("")
+                         & df["lon"].astype(str).str.strip().ne("")).to_numpy()
+        celdas = self.zona * len(self.disponibles) + self.disponible
+        n = len(self.zonas) * len(self.disponibles)
+        total = np.bincount(celdas, minlength=n).reshape(len(self.zonas), -1)
+        ubicadas = np.bincount(celdas[con_ubicacion], minlength=n).reshape(len(self.zonas), -1)
+        z, d = np.nonzero(total)
+        self.resumen = pd.DataFrame({"Zona": np.array(self.zonas, dtype=object)[z],
+                                     "Disponible": np.array(self.disponibles, dtype=object)[d],
+                                     "plantas": total[z, d], "con ubicación": ubicadas[z, d]})
+
+    def _contar(self, fila, valor, etiquetas):
+        nz, nd, nv = len(self.zonas), len(self.disponibles), len(etiquetas)
+        codigos = (self.zona[fila] * nd + self.disponible[fila]) * nv + valor
+        conteo = np.bincount(codigos, minlength=nz * nd * nv)
+        celdas = np.flatnonzero(conteo)
+        z, resto = np.divmod(celdas, nd * nv)
+        d, v = np.divmod(resto, nv)
+        return pd.DataFrame({"Zona": np.array(self.zonas, dtype=object)[z],
+                             "Disponible": np.array(self.disponibles, dtype=object)[d],
+                             "valor": np.array(etiquetas, dtype=object)[v],
+                             "plantas": conteo[celdas]})
+
+    @staticmethod
+    def _seleccion(df, zonas=None, disponibles=None):
+        if zonas:
+            df = df[df["Zona"].isin(zonas)]
+        if disponibles:
+            df = df[df["Disponible"].isin(disponibles)]
+        return df
+
+    def tabla(self, nombre, zonas=None, disponibles=None, top=None):
+        """Chart rows (Zona, valor, plantas); `top` keeps the most frequent values per zone."""
+        df = self._seleccion(self.tablas[nombre], zonas, disponibles)
+        df = df.groupby(["Zona", "valor"], as_index=False, sort=False)["plantas"].sum()
+        if top:
+            df = df.sort_values(["Zona", "plantas"], ascending=[True, False]).groupby("Zona").head(top)
+        return df.reset_index(drop=True)
+
+    def totales(self, zonas=None, disponibles=None):
+        df = self._seleccion(self.resumen, zonas, disponibles)
+        return df.groupby("Zona", as_index=False)[["plantas", "con ubicación"]].sum()
+
+
+def panel_zonas(catalogo):
+    return catalogo.derivado("panel_zonas", PanelZonas)
+
+
+# ======================
+# BENCHMARK
+# ======================
+def catalogo_escalado(catalogo, escala):
+    copias = []
+    for i in range(escala):
+        copia = catalogo.df.copy()
+        if i:
+            copia["Nombre vulgar"] = copia["Nombre vulgar"] + f" {i}"
+            copia["Nombre total"] = copia["Nombre total"] + f" {i}"
+        copias.append(copia)
+    return Catalogo(pd.concat(copias, ignore_index=True))
+
+
+def benchmark(catalogo, escala):
+    grande = catalogo_escalado(catalogo, escala)
+    t = time.perf_counter()
+    panel = PanelZonas(grande)
+    construir = time.perf_counter() - t
+    t = time.perf_counter()
+    filas = sum(len(panel.tabla(nombre, top=15 if nombre == "Propiedades medicinales" else None))
+                for nombre in panel.tablas) + len(panel.totales())
+    consultar = time.perf_counter() - t
+    agregadas = sum(len(df) for df in panel.tablas.values())
+    return {"plantas": len(grande.df), "construir ms": round(construir * 1000, 1),
+            "filas agregadas": agregadas, "consulta del panel ms": round(consultar * 1000, 1),
+            "filas a los gráficos": filas}
+
+
+def main(argv=None):
+    from aucca.recarga import ServicioRecarga
+
+    parser = argparse.ArgumentParser(description="Agregados por zona del catálogo de AUCCA.")
+    parser.add_argument("--escala", type=int, default=100, help="copias del catálogo")
+    args = parser.parse_args(argv)
+    catalogo = ServicioRecarga().catalogo
+    for escala in sorted({1, args.escala}):
+        print(f"x{escala}: " + ", ".join(f"{k} {v}" for k, v in benchmark(catalogo, escala).items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+import fnmatch
+import logging
+import os
+import threading
+
+import streamlit as st
+from watchdog.events import FileSystemEventHandler
+from watchdog.observers import Observer
+
+from aucca.arranque import RECURSOS_DATOS, Arranque, obtener_arranque
+from aucca.catalogo import PATRON_CSV_PLANTAS, SNAPSHOT_PLANTAS, fuente_plantas
+from aucca.clima import CSV_CLIMA, Clima, leer_clima
+from aucca.conocimiento import DOCX_TALLER, leer_secciones
+from aucca.contenido import DIR_CONTENIDO, leer_contenido
+from aucca.federacion import DIR_FUENTES, EXTENSIONES, leer_catalogo
+
+log = logging.getLogger(__name__)
+
+# Editors (Excel, LibreOffice, Word) fire several events per save.
+ESPERA_SEGUNDOS = 1.0
+
+
+# ======================
+# LIVE RELOAD SERVICE
+# Holds the current catalogue/knowledge/assistant content/climate snapshots.
+# The watcher thread builds the next version incrementally and swaps the
+# reference; a rerun reads `servicio.catalogo` once and keeps that snapshot
+# until it finishes.
+# The first snapshots come from the startup loader: reading `catalogo` waits
+# only for the CSV, `conocimiento` only for the docx.
+# ======================
+class ServicioRecarga(FileSystemEventHandler):
+    def __init__(self, directorio=".", arranque=None):
+        self.directorio = os.path.abspath(directorio)
+        self.ruta_plantas = fuente_plantas(self.directorio)
+        self.ruta_docx = os.path.join(self.directorio, DOCX_TALLER)
+        self.dir_contenido = os.path.join(self.directorio, DIR_CONTENIDO)
+        self.ruta_clima = os.path.join(self.directorio, CSV_CLIMA)
+        self.dir_fuentes = os.path.join(self.directorio, DIR_FUENTES)
+        self.arranque = arranque or Arranque(self.directorio, RECURSOS_DATOS)
+        self._catalogo = None
+        self._conocimiento = None
+        self._contenido = None
+        self._clima = None
+        self._lock = threading.Lock()
+        self._recargando = threading.Lock()
+        self._pendientes = {}
+        self._observer = None
+        # Called on the reload thread with the service after every swap.
+        self.suscriptores = []
+
+    @property
+    def catalogo(self):
+        if self._catalogo is None:
+            self._catalogo = self.arranque.obtener("catalogo")
+        return self._catalogo
+
+    @catalogo.setter
+    def catalogo(self, valor):
+        self._catalogo = valor
+
+    @property
+    def conocimiento(self):
+        if self._conocimiento is None:
+            self._conocimiento = self.arranque.obtener("conocimiento")
+        return self._conocimiento
+
+    @conocimiento.setter
+    def conocimiento(self, valor):
+        self._conocimiento = valor
+
+    @property
+    def contenido(self):
+        if self._contenido is None:
+            self._contenido = self.arranque.obtener("contenido")
+        return self._contenido
+
+    @contenido.setter
+    def contenido(self, valor):
+        self._contenido = valor
+
+    @property
+    def clima(self):
+        # None while there is no climate file.
+        if self._clima is None:
+            self._clima = self.arranque.obtener("clima")
+        return self._clima
+
+    @clima.setter
+    def clima(self, valor):
+        self._clima = valor
+
+    def listo(self, recurso):
+        return getattr(self, "_" + recurso) is not None or self.arranque.listo(recurso)
+
+    def iniciar(self):
+        if self._observer is None:
+            self._observer = Observer()
+            self._observer.daemon = True
+            self._observer.schedule(self, self.directorio, recursive=False)
+            # The ingest snapshot and the partner sources live in their own folders.
+            datos = os.path.dirname(os.path.join(self.directorio, SNAPSHOT_PLANTAS))
+            os.makedirs(datos, exist_ok=True)
+            self._observer.schedule(self, datos, recursive=True)
+            self._observer.start()
+        return self
+
+    def detener(self):
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer = None
+
+    # ----- watchdog callbacks -----
+    def on_any_event(self, event):
+        if event.is_directory or event.event_type not in ("created", "modified", "moved"):
+            return
+        path = getattr(event, "dest_path", "") or event.src_path
+        nombre = os.path.basename(path)
+        fuente = (os.path.dirname(os.path.abspath(path)) == self.dir_fuentes
+                  and nombre.lower().endswith(EXTENSIONES))
+        if fnmatch.fnmatch(nombre, PATRON_CSV_PLANTAS) or nombre == os.path.basename(SNAPSHOT_PLANTAS) or fuente:
+            self._programar("catalogo", self.recargar_catalogo)
+        elif nombre == DOCX_TALLER:
+            self._programar("conocimiento", self.recargar_conocimiento)
+        elif os.path.dirname(os.path.abspath(path)) == self.dir_contenido and nombre.endswith(".json"):
+            self._programar("contenido", self.recargar_contenido)
+        elif nombre == os.path.basename(CSV_CLIMA):
+            self._programar("clima", self.recargar_clima)
+
+    def _programar(self, nombre, funcion):
+        with self._lock:
+            previo = self._pendientes.get(nombre)
+            if previo is not None:
+                previo.cancel()
+            timer = threading.Timer(ESPERA_SEGUNDOS, funcion)
+            timer.daemon = True
+            self._pendientes[nombre] = timer
+            timer.start()
+
+    # ----- reloads (run on the timer thread, never in a rerun) -----
+    def recargar_catalogo(self):
+        with self._recargando:
+            self._recargar_catalogo()
+
+    def _recargar_catalogo(self):
+        try:
+            ruta = fuente_plantas(self.directorio)
+            nuevo = self.catalogo.con_cambios(leer_catalogo(ruta, self.dir_fuentes))
+        except Exception:
+            # Half-written file or bad edit: keep serving the previous version.
+            log.exception("No se pudo recargar el catálogo de plantas")
+            return
+        self.ruta_plantas = ruta
+        self.catalogo = nuevo
+        log.info("Catálogo v%s cargado desde %s: %s", nuevo.version, ruta, nuevo.cambios)
+        self._notificar()
+
+    def recargar_conocimiento(self):
+        with self._recargando:
+            self._recargar_conocimiento()
+
+    def _recargar_conocimiento(self):
+        try:
+            nuevo = self.conocimiento.con_cambios(leer_secciones(self.ruta_docx))
+        except Exception:
+            log.exception("No se pudo recargar el documento del taller")
+            return
+        self.conocimiento = nuevo
+        log.info("Conocimiento v%s cargado: %s", nuevo.version, nuevo.cambios)
+        self._notificar()
+
+    def recargar_contenido(self):
+        with self._recargando:
+            self._recargar_contenido()
+
+    def _recargar_contenido(self):
+        try:
+            archivos = leer_contenido(self.dir_contenido)
+        except Exception:
+            # Invalid edit: the assistant keeps answering with the previous content.
+            log.exception("No se pudo recargar el contenido del asistente")
+            return
+        self.contenido = self.contenido.con_datos(archivos)
+        log.info("Contenido v%s cargado: %s archivos", self.contenido.version, len(archivos))
+        self._notificar()
+
+    def recargar_clima(self):
+        with self._recargando:
+            self._recargar_clima()
+
+    def _recargar_clima(self):
+        try:
+            diario = leer_clima(self.ruta_clima)
+        except Exception:
+            log.exception("No se pudo recargar la serie de clima")
+            return
+        anterior = self.clima
+        self.clima = anterior.con_datos(diario) if anterior is not None else Clima(diario)
+        log.info("Clima v%s cargado: %s días", self.clima.version, len(diario))
+        self._notificar()
+
+    def _notificar(self):
+        for suscriptor in list(self.suscriptores):
+            try:
+                suscriptor(self)
+            except Exception:
+                log.exception("Error al propagar la recarga a %r", suscriptor)
+
+
+@st.cache_resource
+def obtener_servicio():
+    return ServicioRecarga(arranque=obtener_arranque()).iniciar()
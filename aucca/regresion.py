@@ -0,0 +1,169 @@
+"""Golden queries for the assistant router, with a latency budget.
+
+    python -m aucca.regresion [--p99-ms 5] [--grupo sinonimos] [--mostrar 20]
+
+Runs what "Enviar" does on the Inicio page (spelling correction, then the
+router) outside Streamlit, with the default sidebar and no answer cache, for:
+
+    preguntas   every question of the knowledge base, as listed
+    sinonimos   every synonym phrasing -> its question (a phrasing that is
+                a question itself, or is listed under several, -> the one
+                the router picks: the question, else the first listed)
+    plantas     every common name -> that plant among the results
+    erratas     two typo variants of every common name -> plant or suggestion
+    meses       "qué sembrar en <mes>" -> exactly the plants sown that month
+
+Exits with status 1 if any answer is wrong or a group's p99 latency is over
+budget, so it can gate a change to the routing code or to the data.
+"""
+import argparse
+import re
+import sys
+import time
+
+import numpy as np
+from rapidfuzz.distance import DamerauLevenshtein
+
+from aucca.asistente import (MESES_CONSULTA, corrector, enrutar, frases_conocidas, frases_respuestas,
+                             pasajes_respuestas)
+from aucca.consultas import MOTOR, MotorPandas
+from aucca.recarga import ServicioRecarga
+from aucca.texto import normalizar_texto
+
+PRESUPUESTO_P99_MS = 5.0
+SIN_FILTROS = {"texto": None, "rangos": {}}
+GRUPOS = ["preguntas", "sinonimos", "plantas", "erratas", "meses"]
+
+
+def erratas(nombre, otras=()):
+    """One dropped and one swapped letter in the middle of the longest word.
+
+    A variant as close (or closer) to a word of another plant name in `otras`
+    is left out: which plant was meant is a coin toss, not a regression.
+    """
+    w = max(re.findall(r"\w+", nombre), key=len)
+    if len(w) < 5:
+        return []
+    m = len(w) // 2
+    salida = []
+    for v in (w[:m] + w[m + 1:], w[:m] + w[m + 1] + w[m] + w[m + 2:]):
+        nv, nw = normalizar_texto(v), normalizar_texto(w)
+        if v == w or nv in otras:
+            continue
+        d = DamerauLevenshtein.distance(nv, nw)
+        if any(o != nw and DamerauLevenshtein.distance(nv, o, score_cutoff=d) <= d for o in otras):
+            continue
+        salida.append(nombre.replace(w, v, 1))
+    return salida
+
+
+# ======================
+# GOLDEN CASES
+# Each case is (grupo, consulta, descripción de lo esperado, verificar(respuesta)).
+# ======================
+def _nombres(respuesta):
+    return [p if isinstance(p, str) else p["Nombre total"] for p in respuesta["plantas"]]
+
+
+def casos(motor, base_conocimiento, sinonimos):
+    salida = []
+    for clave in base_conocimiento:
+        salida.append(("preguntas", clave, clave, lambda r, c=clave: r["clave"] == c))
+    destino = frases_conocidas(base_conocimiento, sinonimos)
+    for pregunta, frases in sinonimos.items():
+        for frase in (frases if isinstance(frases, (list, tuple)) else [frases]):
+            clave = destino.get(normalizar_texto(frase), pregunta)
+            salida.append(("sinonimos", frase, clave, lambda r, c=clave: r["clave"] == c))
+
+    df = motor.filtrar({}, **SIN_FILTROS)
+    palabras = {normalizar_texto(w) for n in df["Nombre total"] for w in re.findall(r"\w+", n) if len(w) >= 4}
+    for vulgar, total in zip(df["Nombre vulgar"].astype(str).str.strip(), df["Nombre total"]):
+        if not vulgar:
+            continue
+        salida.append(("plantas", vulgar, total,
+                       lambda r, t=total: r["tipo"] in ("planta", "plantas") and t in _nombres(r)))
+        for variante in erratas(vulgar, palabras):
+            salida.append(("erratas", variante, total,
+                           lambda r, t=total: r["tipo"] != "ninguno" and t in _nombres(r)))
+
+    for mes in MESES_CONSULTA:
+        esperadas = set(motor.filtrar({"Meses Siembra (Chile)": [mes]}, **SIN_FILTROS)["Nombre total"])
+        salida.append(("meses", f"qué sembrar en {mes}", f"{len(esperadas)} plantas de {mes}",
+                       lambda r, e=esperadas: r["etapa"] == "mes" and set(_nombres(r)) == e))
+    return salida
+
+
+def preparar(directorio="."):
+    servicio = ServicioRecarga(directorio)
+    catalogo, conocimiento = servicio.catalogo, servicio.conocimiento
+    if MOTOR == "sqlite":
+        from aucca.motor_sql import MotorSQL
+
+        motor = MotorSQL()
+        motor.sincronizar(servicio)
+    else:
+        motor = MotorPandas(catalogo, conocimiento)
+    base = servicio.contenido.base(conocimiento)
+    return servicio, motor, base.preguntas, base.temas, base.sinonimos
+
+
+def ejecutar(grupos=GRUPOS, directorio="."):
+    servicio, motor, base_conocimiento, knowledge, sinonimos = preparar(directorio)
+    correccion = corrector(servicio, base_conocimiento, sinonimos)
+    pasajes = pasajes_respuestas(servicio, base_conocimiento)
+    frases = frases_respuestas(servicio, base_conocimiento, sinonimos)
+    resultados = []
+    for grupo, q, esperado, verificar in casos(motor, base_conocimiento, sinonimos):
+        if grupo not in grupos:
+            continue
+        # Same steps as "Enviar", minus the answer cache (every query is a miss here).
+        t = time.perf_counter()
+        corregida = correccion.corregir(q)
+        respuesta = enrutar(corregida, motor, {}, SIN_FILTROS, base_conocimiento, knowledge,
+                            servicio.conocimiento, pasajes, frases)
+        ms = (time.perf_counter() - t) * 1000
+        resultados.append((grupo, q, esperado, verificar(respuesta), ms, corregida, respuesta))
+    return resultados
+
+
+def informe(resultados, presupuesto=PRESUPUESTO_P99_MS, mostrar=20):
+    ok = True
+    print(f"motor {MOTOR}, presupuesto p99 {presupuesto:g} ms\n")
+    print(f"{'grupo':<10} {'casos':>6} {'fallos':>7} {'p50 ms':>8} {'p99 ms':>8} {'máx ms':>8}")
+    for grupo in GRUPOS:
+        filas = [r for r in resultados if r[0] == grupo]
+        if not filas:
+            continue
+        ms = np.array([r[4] for r in filas])
+        fallos = sum(not r[3] for r in filas)
+        p99 = float(np.percentile(ms, 99))
+        lento = p99 > presupuesto
+        ok &= not fallos and not lento
+        print(f"{grupo:<10} {len(filas):>6} {fallos:>7} {np.percentile(ms, 50):>8.2f} {p99:>8.2f} "
+              f"{ms.max():>8.2f}" + ("  <-- sobre presupuesto" if lento else ""))
+
+    fallidos = [r for r in resultados if not r[3]]
+    if fallidos:
+        print(f"\n{len(fallidos)} respuestas incorrectas (primeras {min(mostrar, len(fallidos))}):")
+        for grupo, q, esperado, _, _, corregida, r in fallidos[:mostrar]:
+            obtenido = r["clave"] or ", ".join(_nombres(r)[:3]) or r["tipo"]
+            vista = q if corregida == q else f"{q} -> {corregida}"
+            print(f"  [{grupo}] {vista!r}: esperado {esperado!r}, obtenido {r['etapa']}: {obtenido!r}")
+    lentos = sorted(resultados, key=lambda r: -r[4])[:5]
+    print("\nMás lentas: " + ", ".join(f"{r[1]!r} {r[4]:.1f} ms" for r in lentos))
+    return ok
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Consultas de referencia del asistente de AUCCA.")
+    parser.add_argument("--p99-ms", type=float, default=PRESUPUESTO_P99_MS)
+    parser.add_argument("--grupo", action="append", choices=GRUPOS, help="repetible; por defecto todos")
+    parser.add_argument("--mostrar", type=int, default=20, help="fallos a listar")
+    args = parser.parse_args(argv)
+    ok = informe(ejecutar(args.grupo or GRUPOS), args.p99_ms, args.mostrar)
+    print("\nOK" if ok else "\nFALLA")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,252 @@
+"""Multi-season crop rotation over garden beds.
+
+    python -m aucca.rotacion [--camas 40] [--temporadas 4] [--inicio Primavera]
+
+Plans the rotation for the whole catalogue's seasonal crops and prints the
+time it took, the plan's score and the rules it could not meet.
+"""
+import argparse
+import hashlib
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from aucca.catalogo import MESES
+from aucca.cosecha import calendario_cosecha
+from aucca.gremios import gremios
+from aucca.texto import normalizar_texto
+
+ESTACIONES = [
+    ("Primavera", ["Septiembre", "Octubre", "Noviembre"]),
+    ("Verano", ["Diciembre", "Enero", "Febrero"]),
+    ("Otoño", ["Marzo", "Abril", "Mayo"]),
+    ("Invierno", ["Junio", "Julio", "Agosto"]),
+]
+DESCANSO = "Descanso (abono verde)"
+# Categories grown in beds (the rest are trees, shrubs, ornamentals...).
+CATEGORIAS_ROTACION = ("hortalizas", "legumbres")
+
+# Weights of each rotation rule in the plan score.
+PESO_FAMILIA = 3.0     # same family in the bed the season before
+PESO_FAMILIA_2 = 1.5   # same family two seasons before
+PESO_FIJADOR = 2.0     # nitrogen fixer the season before a heavy feeder
+PESO_EXIGENTES = 1.0   # heavy feeder right after another
+PESO_REPETIDA = 0.5    # same crop in another bed the same season, per fair share of beds
+PESO_DESCANSO = 1.0    # bed left fallow
+
+ANCHO_HAZ = 16
+MAX_PASADAS = 20
+
+
+def temporadas_desde(inicio, temporadas):
+    """Labels and sowing months of `temporadas` consecutive seasons from `inicio`."""
+    primera = [e for e, _ in ESTACIONES].index(inicio)
+    salida = []
+    for k in range(temporadas):
+        nombre, meses = ESTACIONES[(primera + k) % len(ESTACIONES)]
+        salida.append((f"{nombre} {k // len(ESTACIONES) + 1}", meses))
+    return salida
+
+
+# ======================
+# ROTATION PLANNER
+# Crops are integer-encoded (family code, fixer and heavy-feeder flags from
+# the guild matrix, sowing months from the harvest calendar); fallow is one
+# more code. The rules become two crop x crop transition matrices, so a plan
+# is scored with table lookups only:
+#   score = sum of transicion[previous, next] along every bed
+#         + sum of transicion_2[two before, next]
+#         - repeated crops within a season, - fallow cells;
+#   a crop repeated in its fair share of the beds (beds / crops sowable that
+#   season) costs PESO_REPETIDA, so big gardens are not pushed into fallow.
+#   a crop can only go into a season holding one of its sowing months.
+# Beds are filled one at a time by beam search over the seasons (crops
+# already used that season cost more), then a local search revisits every
+# cell, putting in the best crop given its neighbours, until nothing
+# improves.
+# ======================
+class PlanRotacion:
+    def __init__(self, catalogo, nombres, camas=40, temporadas=4, inicio="Primavera"):
+        g = gremios(catalogo)
+        calendario = calendario_cosecha(catalogo)
+        self.temporadas = temporadas_desde(inicio, temporadas)
+        self.camas = int(camas)
+
+        # Seasonal bed crops only: trees and perennials stay in place.
+        categoria = catalogo.df["Categoria"].map(normalizar_texto)
+        de_cama = categoria.str.contains("|".join(CATEGORIAS_ROTACION)).to_numpy()
+        pos = np.array(sorted({g.posicion[n] for n in nombres if n in g.posicion}), dtype=np.intp)
+        pos = pos[de_cama[pos] & ~calendario.largo_plazo[pos] & calendario.siembra[pos].any(axis=1)]
+        self.nombres = list(g.nombres[pos]) + [DESCANSO]
+        c = len(pos)  # code of fallow
+        self.descanso = c
+
+        familia = np.append(g.familia[pos], -1)
+        con_familia = np.append(g.con_familia[pos], False)
+        self.fijador = np.append(g.fijador[pos], False)
+        self.exigente = np.append(g.exigente[pos], False)
+        codigos = np.arange(c + 1)
+        self.misma = (((familia[:, None] == familia[None, :]) & con_familia[:, None] & con_familia[None, :])
+                      | ((codigos[:, None] == codigos[None, :]) & (codigos[:, None] < c)))
+        self.transicion = (PESO_FIJADOR * (self.fijador[:, None] & self.exigente[None, :])
+                           - PESO_EXIGENTES * (self.exigente[:, None] & self.exigente[None, :])
+                           - PESO_FAMILIA * self.misma)
+        self.transicion_2 = -PESO_FAMILIA_2 * self.misma
+
+        meses = [[MESES.index(m) for m in ms] for _, ms in self.temporadas]
+        apto = np.stack([calendario.siembra[pos][:, m].any(axis=1) for m in meses], axis=1)
+        self.celda = np.vstack([np.where(apto, 0.0, -np.inf),
+                                np.full((1, len(meses)), -PESO_DESCANSO)])
+        self.repetida = PESO_REPETIDA / np.maximum(1.0, self.camas / np.maximum(1, apto.sum(axis=0)))
+
+        self.plan = self._haz()
+        self.pasadas = self._mejorar()
+
+    # ----- search -----
+    def _haz(self):
+        k, c = len(self.temporadas), self.descanso
+        plan = np.full((self.camas, k), c, dtype=np.int32)
+        uso = np.zeros((k, c + 1))
+        for cama in range(self.camas):
+            secuencias = np.zeros((1, 0), dtype=np.int32)
+            puntajes = np.zeros(1)
+            for s in range(k):
+                total = puntajes[:, None] + self.celda[:, s][None, :] - self.repetida[s] * uso[s][None, :]
+                if s >= 1:
+                    total = total + self.transicion[secuencias[:, -1]]
+                if s >= 2:
+                    total = total + self.transicion_2[secuencias[:, -2]]
+                plano = total.ravel()
+                ancho = min(ANCHO_HAZ, plano.size)
+                mejores = np.argpartition(-plano, ancho - 1)[:ancho]
+                mejores = mejores[np.argsort(-plano[mejores], kind="stable")]
+                origen, cultivo = np.divmod(mejores, c + 1)
+                secuencias = np.hstack([secuencias[origen], cultivo[:, None].astype(np.int32)])
+                puntajes = plano[mejores]
+            plan[cama] = secuencias[0]
+            uso[np.arange(k), secuencias[0]] += 1
+        uso[:, c] = 0
+        return plan
+
+    def _ganancia(self, plan, uso, cama, s):
+        """Score of every crop in (cama, s), the rest of the plan fixed."""
+        k, fila = len(self.temporadas), plan[cama]
+        otros = uso[s].copy()
+        otros[fila[s]] -= 1
+        g = self.celda[:, s] - self.repetida[s] * otros
+        g[self.descanso] = self.celda[self.descanso, s]
+        if s >= 1:
+            g = g + self.transicion[fila[s - 1]]
+        if s + 1 < k:
+            g = g + self.transicion[:, fila[s + 1]]
+        if s >= 2:
+            g = g + self.transicion_2[fila[s - 2]]
+        if s + 2 < k:
+            g = g + self.transicion_2[:, fila[s + 2]]
+        return g
+
+    def _mejorar(self):
+        plan, k = self.plan, len(self.temporadas)
+        uso = np.zeros((k, self.descanso + 1))
+        for s in range(k):
+            uso[s] = np.bincount(plan[:, s], minlength=self.descanso + 1)
+        uso[:, self.descanso] = 0
+        for pasada in range(1, MAX_PASADAS + 1):
+            cambios = 0
+            for cama in range(self.camas):
+                for s in range(k):
+                    g = self._ganancia(plan, uso, cama, s)
+                    actual, mejor = plan[cama, s], int(np.argmax(g))
+                    if g[mejor] > g[actual] + 1e-9:
+                        if actual != self.descanso:
+                            uso[s, actual] -= 1
+                        if mejor != self.descanso:
+                            uso[s, mejor] += 1
+                        plan[cama, s] = mejor
+                        cambios += 1
+            if not cambios:
+                return pasada
+        return MAX_PASADAS
+
+    # ----- results -----
+    def puntaje(self):
+        p, k = self.plan, len(self.temporadas)
+        total = self.celda[p, np.arange(k)[None, :]].sum()
+        total += self.transicion[p[:, :-1], p[:, 1:]].sum() + self.transicion_2[p[:, :-2], p[:, 2:]].sum()
+        for s in range(k):
+            uso = np.bincount(p[:, s], minlength=self.descanso + 1)[:self.descanso]
+            total -= self.repetida[s] * (uso * (uso - 1) / 2).sum()
+        return float(total)
+
+    def tabla(self):
+        nombres = np.array(self.nombres, dtype=object)
+        return pd.DataFrame(nombres[self.plan], index=[f"Cama {c + 1}" for c in range(self.camas)],
+                            columns=[t for t, _ in self.temporadas])
+
+    def resumen(self):
+        p = self.plan
+        antes, despues = p[:, :-1], p[:, 1:]
+        return {
+            "fijadoras antes de exigentes": int((self.fijador[antes] & self.exigente[despues]).sum()),
+            "misma familia seguida": int(self.misma[antes, despues].sum()),
+            "exigentes seguidas": int((self.exigente[antes] & self.exigente[despues]).sum()),
+            "camas en descanso": int((p == self.descanso).sum()),
+            "cultivos distintos": int(len(np.unique(p[p != self.descanso]))),
+        }
+
+    def avisos(self):
+        """Beds where a crop follows one of its own family."""
+        salida = []
+        etiquetas = [t for t, _ in self.temporadas]
+        for cama, s in zip(*np.nonzero(self.misma[self.plan[:, :-1], self.plan[:, 1:]])):
+            a, b = self.plan[cama, s], self.plan[cama, s + 1]
+            salida.append(f"Cama {cama + 1}: {self.nombres[a]} ({etiquetas[s]}) → "
+                          f"{self.nombres[b]} ({etiquetas[s + 1]}), misma familia")
+        return salida
+
+
+def firma_rotacion(nombres, camas, temporadas, inicio):
+    datos = json.dumps([sorted(set(nombres)), int(camas), int(temporadas), inicio], ensure_ascii=False)
+    return hashlib.sha1(datos.encode("utf-8")).hexdigest()[:16]
+
+
+def planificar_rotacion(catalogo, nombres, camas=40, temporadas=4, inicio="Primavera"):
+    # One slot: a different selection replaces the plan instead of piling up on the snapshot.
+    nombres = list(nombres)
+    return catalogo.derivado("rotacion", lambda c: PlanRotacion(c, nombres, camas, temporadas, inicio),
+                             firma=firma_rotacion(nombres, camas, temporadas, inicio))
+
+
+# ======================
+# BENCHMARK
+# ======================
+def main(argv=None):
+    from aucca.recarga import ServicioRecarga
+
+    parser = argparse.ArgumentParser(description="Rotación de cultivos en las camas de AUCCA.")
+    parser.add_argument("--camas", type=int, default=40)
+    parser.add_argument("--temporadas", type=int, default=4)
+    parser.add_argument("--inicio", default="Primavera", choices=[e for e, _ in ESTACIONES])
+    parser.add_argument("--mostrar", type=int, default=8, help="camas del plan a imprimir")
+    args = parser.parse_args(argv)
+    catalogo = ServicioRecarga().catalogo
+    gremios(catalogo)
+    calendario_cosecha(catalogo)
+
+    t = time.perf_counter()
+    plan = PlanRotacion(catalogo, catalogo.df["Nombre total"], args.camas, args.temporadas, args.inicio)
+    ms = (time.perf_counter() - t) * 1000
+    print(f"{args.camas} camas x {args.temporadas} temporadas, {len(plan.nombres) - 1} cultivos de temporada: "
+          f"{ms:.0f} ms ({plan.pasadas} pasadas de búsqueda local), puntaje {plan.puntaje():.1f}")
+    print(", ".join(f"{k} {v}" for k, v in plan.resumen().items()) + "\n")
+    if args.mostrar:
+        with pd.option_context("display.width", 200, "display.max_colwidth", 30):
+            print(plan.tabla().head(args.mostrar).to_string())
+    for aviso in plan.avisos()[:10]:
+        print(aviso)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""Static offline snapshot of the catalogue and the workshop text.
+
+    python -m aucca.sitio [--salida sitio]
+
+Writes plain HTML pages plus a `.gz` twin of every text file (serve with
+`gzip_static on` or any server that honours pre-compressed files) and a JSON
+search index for the client-side search box.
+"""
+import argparse
+import gzip
+import html
+import json
+import os
+import re
+import shutil
+
+from aucca.catalogo import Catalogo, leer_plantas
+from aucca.conocimiento import TEMARIO, TITULO_CONCEPTOS, Conocimiento, leer_secciones
+from aucca.fichas import renderizar_ficha
+from aucca.texto import normalizar_texto
+
+SALIDA = "sitio"
+COMPRIMIR = (".html", ".json", ".css", ".js")
+
+CSS = """body{font-family:system-ui,sans-serif;max-width:52rem;margin:auto;padding:1rem;line-height:1.5;color:#222}
+a{color:#2e8b57}header{display:flex;gap:1rem;align-items:center}header img{height:3rem}
+input{width:100%;padding:.6rem;font-size:1rem;box-sizing:border-box}
+ul.resultados li{margin:.2rem 0}details{margin:.4rem 0}summary{cursor:pointer;font-weight:600}
+img{max-width:100%}small{color:#666}"""
+
+# Same normalization as aucca.texto.normalizar_texto, on the client.
+JS = """function normalizar(t){return t.toLowerCase().trim().normalize('NFKD')
+.replace(/[^\\x00-\\x7f]/g,'').replace(/[^\\w\\s]/g,'');}
+fetch('buscar.json').then(r=>r.json()).then(indice=>{
+ const caja=document.getElementById('q'),lista=document.getElementById('res');
+ caja.addEventListener('input',()=>{const q=normalizar(caja.value);lista.innerHTML='';
+  if(!q)return;indice.filter(e=>e.n.includes(q)).slice(0,50).forEach(e=>{
+   const li=document.createElement('li'),a=document.createElement('a');
+   a.href=e.u;a.textContent=e.t;li.appendChild(a);li.append(' ');
+   const s=document.createElement('small');s.textContent=e.k;li.appendChild(s);lista.appendChild(li);});});});"""
+
+
+def slug(txt):
+    return re.sub(r"[^a-z0-9]+", "-", normalizar_texto(txt)).strip("-") or "x"
+
+
+def markdown_a_html(md):
+    """The small markdown subset used by the cards and the docx sections."""
+    bloques, lista = [], []
+
+    def en_linea(txt):
+        return re.sub(r"\*\*(.+?)\*\*", r"<strong>\1</strong>", html.escape(txt))
+
+    def cerrar_lista():
+        if lista:
+            bloques.append("<ul>" + "".join(f"<li>{i}</li>" for i in lista) + "</ul>")
+            lista.clear()
+
+    for bloque in re.split(r"\n\s*\n", md.strip()):
+        for linea in bloque.splitlines():
+            linea = linea.strip()
+            if not linea:
+                continue
+            titulo = re.match(r"(#{1,6})\s+(.*)", linea)
+            if linea.startswith("- "):
+                lista.append(en_linea(linea[2:]))
+                continue
+            cerrar_lista()
+            if titulo:
+                n = len(titulo.group(1))
+                bloques.append(f"<h{n}>{en_linea(titulo.group(2))}</h{n}>")
+            else:
+                bloques.append(f"<p>{en_linea(linea)}</p>")
+    cerrar_lista()
+    return "\n".join(bloques)
+
+
+def pagina(titulo, cuerpo, raiz=""):
+    return (f"<!doctype html><html lang=\"es\"><head><meta charset=\"utf-8\">"
+            f"<meta name=\"viewport\" content=\"width=device-width,initial-scale=1\">"
+            f"<title>{html.escape(titulo)}</title><link rel=\"stylesheet\" href=\"{raiz}estilo.css\"></head>"
+            f"<body><header><a href=\"{raiz}index.html\"><img src=\"{raiz}images/logo_aucca.png\" alt=\"Aucca\"></a>"
+            f"<a href=\"{raiz}index.html\">Inicio</a><a href=\"{raiz}conceptos.html\">Conceptos claves</a></header>"
+            f"<main>{cuerpo}</main></body></html>")
+
+
+def _escribir(ruta, contenido):
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    datos = contenido.encode("utf-8")
+    with open(ruta, "wb") as f:
+        f.write(datos)
+    if ruta.endswith(COMPRIMIR):
+        # mtime=0 keeps the .gz byte-identical between builds of the same content.
+        with open(ruta + ".gz", "wb") as f:
+            f.write(gzip.compress(datos, compresslevel=9, mtime=0))
+
+
+# ======================
+# SITE BUILD
+# ======================
+def construir_sitio(catalogo, conocimiento, salida=SALIDA):
+    indice = []
+    paginas = {}
+
+    enlaces = []
+    for _, fila in catalogo.df.iterrows():
+        nombre = fila["Nombre total"].replace("\n", " ")
+        url = f"plantas/{slug(nombre)}.html"
+        while url in paginas:
+            url = url[:-5] + "-2.html"
+        paginas[url] = pagina(nombre, f"<h1>{html.escape(nombre)}</h1>"
+                              + markdown_a_html(renderizar_ficha(fila)), raiz="../")
+        indice.append({"t": nombre, "n": normalizar_texto(nombre), "u": url, "k": "planta"})
+        enlaces.append(f"<li><a href=\"{url}\">{html.escape(nombre)}</a></li>")
+
+    secciones = []
+    for titulo, texto in conocimiento.secciones.items():
+        url = f"secciones/{slug(titulo)}.html"
+        paginas[url] = pagina(titulo, f"<h1>{html.escape(titulo)}</h1>" + markdown_a_html(texto), raiz="../")
+        indice.append({"t": titulo, "n": normalizar_texto(titulo), "u": url, "k": "taller"})
+        secciones.append(f"<li><a href=\"{url}\">{html.escape(titulo)}</a></li>")
+
+    imagenes = {"images/logo_aucca.png"}
+    conceptos = [f"<h1>{html.escape(TITULO_CONCEPTOS)}</h1>"]
+    for subtitulo, temas in TEMARIO:
+        conceptos.append(f"<h2>{html.escape(subtitulo)}</h2>")
+        for titulo, _, imagen in temas:
+            cuerpo = markdown_a_html(conocimiento.seccion(titulo))
+            if imagen:
+                ruta, pie = imagen
+                imagenes.add(ruta)
+                cuerpo += f"<figure><img src=\"{ruta}\" alt=\"{html.escape(pie)}\"><figcaption>{html.escape(pie)}</figcaption></figure>"
+            conceptos.append(f"<details><summary>{html.escape(titulo)}</summary>{cuerpo}</details>")
+    paginas["conceptos.html"] = pagina("Conceptos claves", "".join(conceptos))
+
+    paginas["index.html"] = pagina("Plantas Aucca", (
+        "<h1>Plantas Aucca</h1><input id=\"q\" placeholder=\"Busca una planta o un tema…\" autofocus>"
+        "<ul id=\"res\" class=\"resultados\"></ul><script src=\"buscar.js\"></script>"
+        f"<h2>Plantas ({len(enlaces)})</h2><ul>{''.join(enlaces)}</ul>"
+        f"<h2>Taller de huerta</h2><ul>{''.join(secciones)}</ul>"))
+    paginas["buscar.json"] = json.dumps(indice, ensure_ascii=False, separators=(",", ":"))
+    paginas["buscar.js"] = JS
+    paginas["estilo.css"] = CSS
+
+    for url, contenido in paginas.items():
+        _escribir(os.path.join(salida, url), contenido)
+    for ruta in imagenes:
+        if os.path.exists(ruta):
+            os.makedirs(os.path.join(salida, os.path.dirname(ruta)), exist_ok=True)
+            shutil.copyfile(ruta, os.path.join(salida, ruta))
+    return len(paginas)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera el sitio estático sin conexión de AUCCA.")
+    parser.add_argument("--salida", default=SALIDA, help="carpeta de destino (por defecto: sitio)")
+    args = parser.parse_args(argv)
+    n = construir_sitio(Catalogo(leer_plantas()), Conocimiento(leer_secciones()), args.salida)
+    print(f"{n} archivos escritos en {args.salida}/")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+"""Sun position and direct-sun hours over the year at the garden's geolocated plants and zones.
+
+    python -m aucca.sol [--paso 5] [--escala 100] [--obstaculos datos/obstaculos.csv]
+
+Prints the sun hours per zone and month and the time to build the yearly
+arrays (`--escala` replicates the catalogue N times).
+
+Shade comes from the catalogue's own geolocated trees (default height and
+crown radius per category, `COPAS`) plus the optional obstacles file:
+
+    nombre;lat;lon;alto_m;radio_m
+    Casa;-33.68440;-70.95070;4.5;6
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from aucca.catalogo import MESES
+from aucca.fichas import ESTILOS
+
+DIAS = 365
+PASO_MINUTOS = 5
+SOL_VISIBLE = -0.833     # apparent sunrise/sunset (refraction and solar disc), degrees
+M_POR_GRADO = 111_320.0
+MAX_DISTANCIA_M = 1000   # farther than this from the garden's median point is a data error
+DISTANCIA_MINIMA_M = 0.5  # an obstacle this close is the plant itself
+BLOQUE = 64              # points per vectorized block: 365 x 288 x 64 float32 ~ 27 MB
+
+OBSTACULOS_CSV = os.path.join("datos", "obstaculos.csv")
+# Geolocated plants of these categories shade their neighbours: (height m, crown radius m).
+COPAS = {"Frutales": (4.0, 2.0), "Árboles y Arbustos Ornamentales": (5.0, 2.5)}
+
+CAMPOS = ("horas_sol", "horas_dia", "elevacion_max", "azimut_salida", "azimut_puesta")
+HORAS_SOL, HORAS_DIA, ELEVACION_MAX, AZIMUT_SALIDA, AZIMUT_PUESTA = range(len(CAMPOS))
+# Share of the day's sun hours that reach the point -> exposure.
+EXPOSICIONES = [(0.75, "pleno sol"), (0.4, "media sombra"), (0.0, "sombra")]
+SOLSTICIO_INVIERNO, SOLSTICIO_VERANO = 171, 354  # 21 Jun / 21 Dec (day index, 0-based)
+
+_FECHAS = pd.date_range("2001-01-01", periods=DIAS, freq="D")
+MES_DIA = (_FECHAS.month - 1).to_numpy()
+
+
+def coordenadas(df):
+    """Numeric lat/lon and the rows whose point is plausible (in range and near the garden)."""
+    lat, lon = (pd.to_numeric(df[c], errors="coerce").to_numpy(dtype="float64") if c in df
+                else np.full(len(df), np.nan) for c in ("lat", "lon"))
+    valido = (np.abs(lat) <= 90) & (np.abs(lon) <= 180)
+    if valido.any():
+        lat0, lon0 = np.median(lat[valido]), np.median(lon[valido])
+        valido &= _distancia(lat, lon, lat0, lon0) <= MAX_DISTANCIA_M
+    return lat, lon, valido
+
+
+def _desplazamiento(lat, lon, lat0, lon0):
+    # Local flat-earth metres east/north of (lat0, lon0): fine within a garden.
+    return ((lon - lon0) * M_POR_GRADO * np.cos(np.radians(lat0)), (lat - lat0) * M_POR_GRADO)
+
+
+def _distancia(lat, lon, lat0, lon0):
+    with np.errstate(invalid="ignore"):
+        return np.hypot(*_desplazamiento(lat, lon, lat0, lon0))
+
+
+def leer_obstaculos(path=OBSTACULOS_CSV):
+    if not path or not os.path.exists(path):
+        return pd.DataFrame(columns=["nombre", "lat", "lon", "alto_m", "radio_m"])
+    df = pd.read_csv(path, sep=";", encoding="utf-8")
+    for col in ("lat", "lon", "alto_m", "radio_m"):
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+    return df.dropna(subset=["lat", "lon", "alto_m"]).fillna({"radio_m": 1.0})
+
+
+def obstaculos_catalogo(df, lat, lon, valido):
+    alto = df["Categoria"].astype(str).str.strip().map(lambda c: COPAS.get(c, (np.nan, np.nan)))
+    alto_m, radio_m = np.array(alto.tolist(), dtype="float64").reshape(-1, 2).T
+    arbol = valido & ~np.isnan(alto_m)
+    return pd.DataFrame({"nombre": df["Nombre vulgar"].astype(str).str.strip().to_numpy()[arbol],
+                         "lat": lat[arbol], "lon": lon[arbol], "alto_m": alto_m[arbol], "radio_m": radio_m[arbol]})
+
+
+# ======================
+# SOLAR GEOMETRY
+# Declination per day of the year (Spencer's series) and the hour angle of
+# every `paso` minutes of local solar time. Sun hours do not depend on the
+# clock, so longitude and the equation of time never enter.
+# ======================
+def declinacion(dias):
+    g = 2 * np.pi * (dias - 1) / DIAS
+    return (0.006918 - 0.399912 * np.cos(g) + 0.070257 * np.sin(g) - 0.006758 * np.cos(2 * g)
+            + 0.000907 * np.sin(2 * g) - 0.002697 * np.cos(3 * g) + 0.00148 * np.sin(3 * g))
+
+
+def posicion_solar(lat, dec, angulo_horario):
+    """Sun elevation and azimuth (degrees, clockwise from north), broadcast over the inputs.
+
+    `lat` in degrees, `dec` and `angulo_horario` in radians.
+    """
+    phi = np.radians(lat)
+    sin_phi, cos_phi = np.sin(phi), np.cos(phi)
+    sin_el = sin_phi * np.sin(dec) + cos_phi * np.cos(dec) * np.cos(angulo_horario)
+    elevacion = np.degrees(np.arcsin(np.clip(sin_el, -1, 1)))
+    azimut = np.degrees(np.arctan2(-np.sin(angulo_horario),
+                                   np.tan(dec) * cos_phi - np.cos(angulo_horario) * sin_phi)) % 360
+    return elevacion, azimut
+
+
+def horizonte(lat, lon, obstaculos):
+    """Elevation (degrees) of the skyline seen from each point, per 1° azimuth: float32 [puntos, 360].
+
+    Each obstacle is a cylinder: it blocks the azimuths within its crown's
+    angular half-width, up to the elevation of its top.
+    """
+    perfil = np.full((len(lat), 360), SOL_VISIBLE, dtype=np.float32)
+    if obstaculos.empty:
+        return perfil
+    o_lat, o_lon = obstaculos["lat"].to_numpy(), obstaculos["lon"].to_numpy()
+    alto, radio = obstaculos["alto_m"].to_numpy(), obstaculos["radio_m"].to_numpy()
+    centros = np.arange(360) + 0.5
+    for i in range(0, len(lat), BLOQUE):
+        b = slice(i, i + BLOQUE)
+        este, norte = _desplazamiento(o_lat[None, :], o_lon[None, :], lat[b, None], lon[b, None])
+        d = np.hypot(este, norte)
+        rumbo = np.degrees(np.arctan2(este, norte)) % 360
+        ancho = np.degrees(np.arctan2(radio[None, :], d))
+        cima = np.where(d > DISTANCIA_MINIMA_M, np.degrees(np.arctan2(alto[None, :], d)), SOL_VISIBLE)
+        delta = np.abs((centros[None, None, :] - rumbo[:, :, None] + 180) % 360 - 180)
+        tapa = np.where(delta <= ancho[:, :, None], cima[:, :, None], SOL_VISIBLE)
+        perfil[b] = np.maximum(perfil[b], tapa.max(axis=1))
+    return perfil
+
+
+def sol_anual(lat, lon, obstaculos, paso=PASO_MINUTOS):
+    """Per point and day: CAMPOS as float32 [puntos, DIAS, len(CAMPOS)].
+
+    Computed over a day x minute x point grid, `BLOQUE` points at a time.
+    """
+    dec = declinacion(np.arange(1, DIAS + 1)).astype(np.float32)[:, None, None]
+    minutos = np.arange(0, 24 * 60, paso) + paso / 2
+    angulo = np.radians(minutos / 4 - 180).astype(np.float32)[None, :, None]
+    perfil = horizonte(lat, lon, obstaculos)
+    horas = np.float32(paso / 60)
+    salida = np.empty((len(lat), DIAS, len(CAMPOS)), dtype=np.float32)
+    for i in range(0, len(lat), BLOQUE):
+        b = slice(i, i + BLOQUE)
+        el, az = posicion_solar(lat[b].astype(np.float32)[None, None, :], dec, angulo)
+        dia = el > SOL_VISIBLE
+        grado = az.astype(np.int16) % 360
+        sol = el > perfil[b][np.arange(el.shape[2])[None, None, :], grado]
+        primero = dia.argmax(axis=1)[:, None, :]
+        ultimo = (dia.shape[1] - 1 - dia[:, ::-1].argmax(axis=1))[:, None, :]
+        campos = np.stack([
+            sol.sum(axis=1) * horas,
+            dia.sum(axis=1) * horas,
+            el.max(axis=1),
+            np.take_along_axis(az, primero, axis=1)[:, 0],
+            np.take_along_axis(az, ultimo, axis=1)[:, 0],
+        ], axis=-1)
+        salida[b] = campos.transpose(1, 0, 2)
+    return salida
+
+
+# ======================
+# SUN AT THE GARDEN'S POINTS
+# Built once per catalogue snapshot (and obstacles file) for the distinct
+# plant coordinates plus each zone's centre (mean of its geolocated plants);
+# plants share the rows of their point. Everything the pages show is read off
+# the compact `dias` array.
+# ======================
+class SolHuerta:
+    def __init__(self, catalogo, obstaculos=OBSTACULOS_CSV, paso=PASO_MINUTOS):
+        df = catalogo.df
+        lat, lon, valido = coordenadas(df)
+        puntos, inversa = (np.unique(np.stack([lat[valido], lon[valido]], axis=1), axis=0, return_inverse=True)
+                           if valido.any() else (np.empty((0, 2)), np.empty(0, dtype=np.intp)))
+        self.punto_fila = np.full(len(df), -1, dtype=np.intp)
+        self.punto_fila[valido] = inversa.ravel()
+        self.posicion = {k: i for i, k in enumerate(catalogo.claves_vivas)}  # row key -> live row
+
+        zona = pd.DataFrame({"Zona": df["Zona"].astype(str).str.strip().to_numpy()[valido],
+                             "lat": lat[valido], "lon": lon[valido]})
+        centros = zona.groupby("Zona")[["lat", "lon"]].mean()
+        self.zonas = list(centros.index)
+        self.primera_zona = len(puntos)
+
+        partes = [o for o in (obstaculos_catalogo(df, lat, lon, valido), leer_obstaculos(obstaculos)) if len(o)]
+        self.obstaculos = (pd.concat(partes, ignore_index=True).drop_duplicates(["lat", "lon", "alto_m", "radio_m"])
+                           if partes else leer_obstaculos(None))
+        todos = np.vstack([puntos, centros.to_numpy()]) if len(centros) else puntos
+        self.dias = sol_anual(todos[:, 0], todos[:, 1], self.obstaculos, paso)
+
+    def _punto(self, clave):
+        i = self.posicion.get(clave)
+        return None if i is None or self.punto_fila[i] < 0 else self.punto_fila[i]
+
+    def _resumen(self, p):
+        d = self.dias[p]
+        fraccion = d[:, HORAS_SOL].sum() / d[:, HORAS_DIA].sum()
+        exposicion = next(nombre for umbral, nombre in EXPOSICIONES if fraccion >= umbral)
+        return d, fraccion, exposicion
+
+    def mensual(self, p):
+        return np.bincount(MES_DIA, self.dias[p, :, HORAS_SOL], minlength=12) / np.bincount(MES_DIA, minlength=12)
+
+    def tooltip(self, clave):
+        p = self._punto(clave)
+        if p is None:
+            return ""
+        d, _, exposicion = self._resumen(p)
+        return f"☀️ {d[:, HORAS_SOL].mean():.1f} h de sol al día (media anual), {exposicion}"
+
+    def seccion(self, clave, estilo="inicio"):
+        """Markdown lines with the sun at a plant's point (by row key), or "" if it has no coordinates."""
+        p = self._punto(clave)
+        if p is None:
+            return ""
+        d, fraccion, exposicion = self._resumen(p)
+        inv, ver = d[SOLSTICIO_INVIERNO], d[SOLSTICIO_VERANO]
+        meses = " · ".join(f"{m[:3]} {h:.1f}" for m, h in zip(MESES, self.mensual(p)))
+        return "\n\n".join([
+            f"{'#' * ESTILOS[estilo]['nivel']} ☀️ Sol en su ubicación",
+            f"**Exposición:** {exposicion} ({fraccion:.0%} de las horas de luz reciben sol directo)",
+            f"**Sol directo:** {d[:, HORAS_SOL].mean():.1f} h al día de media; "
+            f"{inv[HORAS_SOL]:.1f} h el 21 de junio y {ver[HORAS_SOL]:.1f} h el 21 de diciembre",
+            f"**Altura del sol a mediodía:** {inv[ELEVACION_MAX]:.0f}° en invierno, {ver[ELEVACION_MAX]:.0f}° en verano",
+            f"**Horas de sol por mes:** {meses}",
+        ])
+
+    def por_zona(self):
+        """Mean daily direct-sun hours per month (rows) and zone centre (columns)."""
+        return pd.DataFrame({z: self.mensual(self.primera_zona + i) for i, z in enumerate(self.zonas)},
+                            index=MESES).round(1)
+
+
+def _firma(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return "-"
+    return f"{st.st_mtime_ns}:{st.st_size}"
+
+
+def sol_huerta(catalogo, obstaculos=OBSTACULOS_CSV):
+    return catalogo.derivado(("sol", obstaculos), lambda c: SolHuerta(c, obstaculos), firma=_firma(obstaculos))
+
+
+# ======================
+# BENCHMARK
+# ======================
+def main(argv=None):
+    from aucca.panel import catalogo_escalado
+    from aucca.recarga import ServicioRecarga
+
+    parser = argparse.ArgumentParser(description="Horas de sol en los puntos de la huerta de AUCCA.")
+    parser.add_argument("--paso", type=int, default=PASO_MINUTOS, help="minutos entre posiciones del sol")
+    parser.add_argument("--escala", type=int, default=100, help="copias del catálogo")
+    parser.add_argument("--obstaculos", default=OBSTACULOS_CSV)
+    args = parser.parse_args(argv)
+    catalogo = ServicioRecarga().catalogo
+
+    t = time.perf_counter()
+    sol = SolHuerta(catalogo, args.obstaculos, args.paso)
+    ms = (time.perf_counter() - t) * 1000
+    print(f"{len(sol.dias)} puntos ({len(sol.zonas)} centros de zona), {len(sol.obstaculos)} obstáculos: "
+          f"{ms:.0f} ms, {sol.dias.nbytes / 1024:.0f} KiB\n")
+    print("Horas de sol directo por día, media de cada mes:")
+    print(sol.por_zona().to_string())
+    for escala in sorted({args.escala} - {1}):
+        grande = catalogo_escalado(catalogo, escala)
+        t = time.perf_counter()
+        SolHuerta(grande, args.obstaculos, args.paso)
+        print(f"\nx{escala}: {len(grande.df)} plantas en {(time.perf_counter() - t) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+import re
+
+import numpy as np
+from rapidfuzz import fuzz
+from rapidfuzz.process import cdist
+
+from aucca.texto import normalizar_texto
+
+# Similarity (0-100, rapidfuzz ratio) to merge two genus names inside a family
+# block, and two full names inside a genus block.
+UMBRAL_GENERO = 85
+UMBRAL_NOMBRE = 90
+
+# Epithets that mean "some species of the genus".
+SIN_EPITETO = {"", "spp", "sp", "ssp"}
+
+_SUFIJO_FAMILIA = re.compile(r"(aceae|aceas|acea|eae|eas|ae|as|s)$")
+
+
+def nombre_cientifico(valor):
+    """Normalized "genus epithet [rest]" of the first name given in the cell."""
+    primero = re.split(r"[\n/]", str(valor).strip())[0]
+    return " ".join(normalizar_texto(primero).split())
+
+
+def familias(valor):
+    # "Leguminosas-Fabaceas" / "Fabaceae" -> {"legumino", "fab"}: spelling variants share a stem.
+    partes = re.split(r"[-\n(]", normalizar_texto(str(valor)).replace(")", ""))
+    return {_SUFIJO_FAMILIA.sub("", p.split()[0]) for p in partes if p.split()}
+
+
+class _Union:
+    def __init__(self, n):
+        self.padre = list(range(n))
+
+    def raiz(self, i):
+        while self.padre[i] != i:
+            self.padre[i] = self.padre[self.padre[i]]
+            i = self.padre[i]
+        return i
+
+    def unir(self, a, b):
+        a, b = self.raiz(a), self.raiz(b)
+        if a != b:
+            self.padre[max(a, b)] = min(a, b)
+
+
+def _pares(textos, umbral):
+    """Index pairs (i < j) with ratio >= umbral; one cdist per block."""
+    if len(textos) < 2:
+        return []
+    matriz = cdist(textos, textos, scorer=fuzz.ratio, score_cutoff=umbral, dtype=np.uint8)
+    i, j = np.nonzero(np.triu(matriz, k=1))
+    return list(zip(i.tolist(), j.tolist()))
+
+
+# ======================
+# CANONICAL TAXA
+# Blocking keeps the fuzzy comparisons small:
+#   1. inside each family block, distinct genus names are compared, so
+#      "Menta"/"Mentha" or "Bambousa"/"Bambusa" end up as one genus;
+#   2. inside each (merged) genus block, distinct full names are compared.
+# A "Genus spp." record joins the species of its genus when there is only one.
+# Rows without a scientific name get a taxon of their own from the common name.
+# ======================
+class Taxones:
+    def __init__(self, df):
+        cientificos = [nombre_cientifico(v) for v in df["Nombre Científico"]]
+        distintos = sorted(set(cientificos) - {""})
+        posicion = {n: i for i, n in enumerate(distintos)}
+        genero = [n.split()[0] for n in distintos]
+        epiteto = [n.split()[1] if len(n.split()) > 1 else "" for n in distintos]
+
+        # 1. genus merge inside family blocks
+        generos = sorted(set(genero))
+        indice_genero = {g: i for i, g in enumerate(generos)}
+        bloques_familia = {}
+        for cientifico, familia in zip(cientificos, df["Familia"]):
+            if cientifico:
+                g = indice_genero[cientifico.split()[0]]
+                for f in familias(familia):
+                    bloques_familia.setdefault(f, set()).add(g)
+        union_generos = _Union(len(generos))
+        for miembros in bloques_familia.values():
+            miembros = sorted(miembros)
+            for a, b in _pares([generos[m] for m in miembros], UMBRAL_GENERO):
+                if generos[miembros[a]][0] == generos[miembros[b]][0]:
+                    union_generos.unir(miembros[a], miembros[b])
+
+        # 2. full-name merge inside genus blocks
+        bloques_genero = {}
+        for i, g in enumerate(genero):
+            bloques_genero.setdefault(union_generos.raiz(indice_genero[g]), []).append(i)
+        union = _Union(len(distintos))
+        for miembros in bloques_genero.values():
+            especificos = [m for m in miembros if epiteto[m] not in SIN_EPITETO]
+            for a, b in _pares([distintos[m] for m in especificos], UMBRAL_NOMBRE):
+                union.unir(especificos[a], especificos[b])
+            raices = {union.raiz(m) for m in especificos}
+            if len(raices) == 1:
+                for m in miembros:
+                    union.unir(m, especificos[0])
+
+        # Representative name of each cluster: most frequent spelling, then alphabetical.
+        frecuencia = {}
+        for c in cientificos:
+            if c:
+                frecuencia[c] = frecuencia.get(c, 0) + 1
+        mejor = {}
+        for i, n in enumerate(distintos):
+            r = union.raiz(i)
+            clave = (-frecuencia[n], epiteto[i] in SIN_EPITETO, n)
+            if r not in mejor or clave < mejor[r][0]:
+                mejor[r] = (clave, n)
+
+        ids, nombres = [], {}
+        for c, vulgar in zip(cientificos, df["Nombre vulgar"]):
+            if c:
+                nombre = mejor[union.raiz(posicion[c])][1]
+                id_ = "taxon:" + nombre.replace(" ", "-")
+            else:
+                nombre = " ".join(normalizar_texto(vulgar).split())
+                id_ = "vulgar:" + nombre.replace(" ", "-")
+            nombres[id_] = nombre
+            ids.append(id_)
+        self.ids = np.array(ids, dtype=object)
+        self.nombres = nombres
+        self.nombre_total = df["Nombre total"].to_numpy()
+        # Rows of each taxon, in row order: one grouping, then O(1) per lookup.
+        self._miembros = {}
+        for n, id_ in zip(self.nombre_total, self.ids):
+            self._miembros.setdefault(id_, []).append(n)
+        self._registro = {}
+        for n, id_, vulgar in zip(self.nombre_total, self.ids, df["Nombre vulgar"]):
+            # Same taxon and same common name: one record entered twice.
+            self._registro.setdefault(n, (id_, " ".join(normalizar_texto(vulgar).split())))
+
+    def miembros(self, id_):
+        return list(self._miembros.get(id_, ()))
+
+    def agrupar(self, nombres):
+        """Drop duplicate records (same taxon and common name), in the given order.
+
+        Cultivars of one taxon ("Cebolla" / "Cebolla tardía", "Acelga" /
+        "Betarragas") keep their own entry: their sowing data differ.
+        """
+        vistos, salida = set(), []
+        for n in nombres:
+            registro = self._registro.get(n, n)
+            if registro not in vistos:
+                vistos.add(registro)
+                salida.append(n)
+        return salida
+
+
+def taxones(catalogo):
+    return catalogo.derivado("taxones", lambda c: Taxones(c.df))
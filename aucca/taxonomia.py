@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+
+from aucca.taxones import taxones
+
+
+# ======================
+# BROWSE INDEX: Categoria -> Familia -> especie
+# Built once per catalogue snapshot as integer codes per live row (a plant can
+# sit in several categories, so those are kept as (categoria, fila) pairs).
+# Counts under any filter mask are then a `np.bincount` over the codes of the
+# rows left in the mask; nothing is split or grouped as strings per rerun.
+# ======================
+class Taxonomia:
+    def __init__(self, catalogo):
+        df = catalogo.df
+        tokens, matriz = catalogo.bitmaps.get("Categoria", ([], np.zeros((0, len(catalogo.filas)), dtype=bool)))
+        categoria, fila = np.nonzero(matriz[:, catalogo.vivos])
+        self.categorias = list(tokens)
+        self.par_categoria = categoria.astype(np.int32)
+        self.par_fila = fila.astype(np.int32)
+
+        familias = df["Familia"].astype(str).str.strip().to_numpy(dtype=object)
+        self.familia, self.familias = pd.factorize(familias, sort=True)
+        self.familias = list(self.familias)
+        if "" in self.familias:
+            # Plants with no family are counted in their category only.
+            vacia = self.familias.index("")
+            self.familia = np.where(self.familia == vacia, -1, self.familia - (self.familia > vacia))
+            del self.familias[vacia]
+        self.familia = self.familia.astype(np.int32)
+
+        tx = taxones(catalogo)
+        self.especie, ids = pd.factorize(tx.ids, sort=True)
+        self.especie = self.especie.astype(np.int32)
+        self.especies = [tx.nombres[i].capitalize() for i in ids]
+        self.n_filas = len(df)
+        self._pos_categoria = {c: i for i, c in enumerate(self.categorias)}
+        self._pos_familia = {f: i for i, f in enumerate(self.familias)}
+
+    def filas(self, mascara=None, categoria=None, familia=None):
+        """Boolean mask over the live rows of a node, within `mascara`."""
+        sel = np.ones(self.n_filas, dtype=bool) if mascara is None else np.asarray(mascara, dtype=bool).copy()
+        if categoria is not None:
+            en_categoria = np.zeros(self.n_filas, dtype=bool)
+            c = self._pos_categoria.get(categoria, -1)
+            en_categoria[self.par_fila[self.par_categoria == c]] = True
+            sel &= en_categoria
+        if familia is not None:
+            f = self._pos_familia.get(familia, -2)
+            sel &= self.familia == f
+        return sel
+
+    def conteo_categorias(self, mascara=None):
+        dentro = self.filas(mascara)[self.par_fila]
+        conteo = np.bincount(self.par_categoria[dentro], minlength=len(self.categorias))
+        return {self.categorias[i]: int(conteo[i]) for i in np.flatnonzero(conteo)}
+
+    def conteo_familias(self, mascara=None, categoria=None):
+        codigos = self.familia[self.filas(mascara, categoria)]
+        conteo = np.bincount(codigos[codigos >= 0], minlength=len(self.familias))
+        return {self.familias[i]: int(conteo[i]) for i in np.flatnonzero(conteo)}
+
+    def conteo_especies(self, mascara=None, categoria=None, familia=None):
+        codigos = self.especie[self.filas(mascara, categoria, familia)]
+        conteo = np.bincount(codigos, minlength=len(self.especies))
+        orden = np.flatnonzero(conteo)
+        orden = orden[np.argsort(-conteo[orden], kind="stable")]
+        return {self.especies[i]: int(conteo[i]) for i in orden}
+
+
+def taxonomia(catalogo):
+    return catalogo.derivado("taxonomia", Taxonomia)
@@ -0,0 +1,29 @@
+import re
+import unicodedata
+
+# ======================
+# NORMALIZE TEXT FUNCTION
+# ======================
+def normalizar_texto(txt):
+    if not isinstance(txt, str):
+        txt = str(txt)
+    txt = txt.lower().strip()
+    txt = unicodedata.normalize("NFKD", txt).encode("ascii", "ignore").decode("utf-8")
+    txt = re.sub(r"[^\w\s]", "", txt)
+    return txt
+
+
+# Same splitting rule the sidebars use for multi-value columns ("a-b; c, d").
+def dividir_valores(valor):
+    if not isinstance(valor, str) or not valor:
+        return []
+    out = []
+    for piece in re.split(r"[,\-;]", valor):
+        w = piece.strip().lower()
+        if w and w not in out:
+            out.append(w)
+    return out
+
+
+def terminos(txt):
+    return [t for t in normalizar_texto(txt).split() if len(t) > 2]
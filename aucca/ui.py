@@ -0,0 +1,155 @@
+import streamlit as st
+
+from aucca.catalogo import FILTRO_CLAVES
+from aucca.clima import OPCIONES_FILTRO, riesgo_siembra
+from aucca.cultivo import ETIQUETAS_RANGO
+from aucca.disponibilidad import disponibilidad
+from aucca.exportar import FORMATOS, firma_filtros, obtener_exportador
+from aucca.federacion import COLUMNA_FUENTES
+from aucca.recarga import obtener_servicio
+from aucca.taxonomia import taxonomia
+
+
+# ======================
+# SIDEBAR: AVAILABILITY AS OF A SNAPSHOT DATE
+# Adds the matching plant keys to `filtros`, so later options cascade from it.
+# ======================
+def filtro_disponibilidad(filtros, contenedor=None):
+    contenedor = contenedor or st.sidebar
+    historial = disponibilidad(obtener_servicio().catalogo)
+    fechas = [str(f) for f in historial.fechas[::-1]]  # ISO dates, latest first
+    fecha = contenedor.selectbox("Fecha de disponibilidad", fechas)
+    estado = contenedor.selectbox("Disponibilidad en Aucca", ["Todas"] + historial.opciones(fecha))
+    if estado != "Todas":
+        filtros[FILTRO_CLAVES] = historial.claves_con([estado], fecha).tolist()
+    return estado
+
+
+# ======================
+# SIDEBAR: CATALOGUE SOURCES (only when partner catalogues are merged in)
+# ======================
+def filtro_fuentes(filtros, contenedor=None):
+    contenedor = contenedor or st.sidebar
+    catalogo = obtener_servicio().catalogo
+    if COLUMNA_FUENTES not in catalogo.bitmaps:
+        return []
+    seleccion = contenedor.multiselect("Fuentes del catálogo", catalogo.opciones(COLUMNA_FUENTES),
+                                       help="Vacío: busca en todas las fuentes.")
+    if seleccion:
+        filtros[COLUMNA_FUENTES] = seleccion
+    return seleccion
+
+
+# ======================
+# SIDEBAR: FROST / HEAVY-RAIN RISK OF THE SOWING WINDOWS (only with a climate file)
+# ======================
+def filtro_clima(filtros, contenedor=None):
+    contenedor = contenedor or st.sidebar
+    servicio = obtener_servicio()
+    if servicio.clima is None:
+        return "Todas"
+    opcion = contenedor.selectbox("Clima de siembra", OPCIONES_FILTRO,
+                                  help="Heladas y lluvia fuerte en los 7 días tras sembrar, "
+                                       "según la serie de clima local.")
+    if opcion != "Todas":
+        claves = set(riesgo_siembra(servicio.catalogo, servicio.clima).claves_con(opcion).tolist())
+        if FILTRO_CLAVES in filtros:
+            claves &= set(filtros[FILTRO_CLAVES])
+        filtros[FILTRO_CLAVES] = sorted(claves)
+    return opcion
+
+
+# ======================
+# SIDEBAR: TAXONOMY DRILL-DOWN (Categoria -> Familia -> especie)
+# Counts are taken under the filters chosen above it; picking a node narrows
+# `filtros` to its plants through the row-key pseudo filter.
+# ======================
+def navegador_taxonomico(motor, filtros, consulta, contenedor=None, max_especies=30):
+    contenedor = contenedor or st.sidebar
+    catalogo = obtener_servicio().catalogo
+    arbol = taxonomia(catalogo)
+    mascara = catalogo.mascara_claves(motor.claves(filtros, **consulta))
+
+    with contenedor.expander("🌳 Categoría → Familia → especie"):
+        por_categoria = arbol.conteo_categorias(mascara)
+        categoria = st.selectbox("Categoría", ["Todas"] + sorted(por_categoria), key="taxo_categoria",
+                                 format_func=lambda c: c if c == "Todas" else f"{c} ({por_categoria.get(c, 0)})")
+        categoria = None if categoria == "Todas" else categoria
+        por_familia = arbol.conteo_familias(mascara, categoria)
+        familia = st.selectbox("Familia", ["Todas"] + sorted(por_familia), key="taxo_familia",
+                               format_func=lambda f: f if f == "Todas" else f"{f} ({por_familia.get(f, 0)})")
+        familia = None if familia == "Todas" else familia
+
+        especies = arbol.conteo_especies(mascara, categoria, familia)
+        lista = [f"- {nombre} ({n})" for nombre, n in list(especies.items())[:max_especies]]
+        if len(especies) > max_especies:
+            lista.append(f"- … y {len(especies) - max_especies} más")
+        st.markdown(f"**{len(especies)} especies**\n\n" + "\n".join(lista))
+
+    if categoria is not None or familia is not None:
+        claves = set(catalogo.claves_vivas[arbol.filas(mascara, categoria, familia)])
+        if FILTRO_CLAVES in filtros:
+            claves &= set(filtros[FILTRO_CLAVES])
+        filtros[FILTRO_CLAVES] = sorted(claves)
+    return categoria, familia
+
+
+# ======================
+# SIDEBAR: RANGE FILTERS ON PARSED CULTIVATION FIELDS
+# ======================
+def filtros_rangos(motor, contenedor=None):
+    contenedor = contenedor or st.sidebar
+    rangos = {}
+    with contenedor.expander("📏 Rangos de cultivo"):
+        st.caption("Solo se incluyen plantas cuyo valor completo cae dentro del rango.")
+        for prefijo, etiqueta in ETIQUETAS_RANGO.items():
+            limites = motor.limites(prefijo)
+            if limites is None:
+                continue
+            lo, hi = limites
+            paso = 0.1 if hi <= 20 else 1.0
+            lo, hi = float(lo), float(hi)
+            # Bounds in the key: a reload that changes them starts a fresh slider.
+            sel = st.slider(etiqueta, min_value=lo, max_value=hi, value=(lo, hi), step=paso,
+                            key=f"rango_{prefijo}_{lo}_{hi}")
+            if sel != (lo, hi):
+                rangos[prefijo] = sel
+    return rangos
+
+
+# ======================
+# SIDEBAR: EXPORT OF THE CURRENT SELECTION
+# The file is built in the background pool; while it is not ready a small
+# fragment polls it, so the rest of the page reruns without waiting.
+# ======================
+def exportar_seleccion(df, filtros, consulta, contenedor=None):
+    contenedor = contenedor or st.sidebar
+    firma = firma_filtros(filtros, **consulta)
+    with contenedor.expander("📥 Exportar selección"):
+        formato = st.radio("Formato", list(FORMATOS), horizontal=True, key="exportar_formato")
+        pedido = (formato, firma)
+        if st.button(f"Preparar {formato} ({len(df)} plantas)", key="exportar_preparar"):
+            st.session_state.exportar_pedido = pedido
+        if st.session_state.get("exportar_pedido") != pedido:
+            return
+        futuro = obtener_exportador().solicitar(formato, firma, obtener_servicio().catalogo, df)
+        if futuro.done():
+            _boton_descarga(futuro, formato, firma)
+        else:
+            _esperar_exportacion(futuro)
+
+
+def _boton_descarga(futuro, formato, firma):
+    if futuro.exception() is not None:
+        st.error(f"No se pudo generar el archivo: {futuro.exception()}")
+        return
+    mime, extension = FORMATOS[formato]
+    st.download_button(f"Descargar {formato}", data=futuro.result(), mime=mime,
+                       file_name=f"plantas_aucca_{firma[:8]}.{extension}", key="exportar_descargar")
+
+
+@st.fragment(run_every=1)
+def _esperar_exportacion(futuro):
+    if futuro.done():
+        st.rerun()
+    st.caption("⏳ Preparando archivo…")